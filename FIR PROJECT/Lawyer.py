@@ -1,139 +1,52 @@
 import tkinter as tk
-from tkinter import messagebox, scrolledtext
+from tkinter import filedialog, messagebox, scrolledtext
 from tkinter import ttk  # Import themed Tkinter widgets
-import re
 import random
-import json
-import os
 import datetime
 
+from fir_backends import JsonFileBackend, SQLiteBackend
+from fir_laws import laws # Expanded Pakistan Laws Dictionary
+from fir_jobs import BackgroundJobs
+from fir_logging import configure_logging, get_logger, shutdown_logging
+from fir_metrics import metrics
+from fir_service import FIRInput, FIRService, SearchQuery
+from fir_stats import export_stats
+from fir_store import FIRStore
+from fir_validation import canonical_section, is_valid_cnic, is_valid_fir_number, is_valid_fir_date # Validation Functions
+
 # --- Configuration ---
 FIR_DATA_FILE = 'fir_data.json'    # File path for saving/loading FIR data
+FIR_JOURNAL_FILE = 'fir_data.journal'  # Append-only log of FIR changes made since the last snapshot
+FIR_SEQUENCE_FILE = 'fir_sequence.json'  # Last FIR sequence number used per year and district
+STORAGE_MODE = 'journal'           # 'journal' appends each change; 'snapshot' rewrites FIR_DATA_FILE on every change
+JOURNAL_COMPACTION_THRESHOLD = 1000  # Journal records after which the data is compacted into a new snapshot
+SNAPSHOT_GENERATIONS = 3           # Previous snapshots kept as fir_data.json.1 ... .N for crash recovery
+STORAGE_BACKEND = 'json'           # 'json' (FIR_DATA_FILE + journal) or 'sqlite' (FIR_DATABASE_FILE)
+FIR_DATABASE_FILE = 'fir_data.db'  # SQLite database used by the 'sqlite' backend
+COMPACT_RECORDS = False            # Hold FIRs as compact read-only records (fir_records.py) to save memory on large datasets
+SNAPSHOT_FORMAT = 'pretty'         # How FIR_DATA_FILE is written: 'pretty', 'compact', 'gzip', 'bz2', 'xz' or 'binary' (fir_storage.py); any is read.
+                                   # 'pretty' keeps the checked-in fir_data.json readable and its diffs small
 INITIAL_DUMMY_CNICS = 50           # Reduced for faster dummy data generation
 MAX_RANDOM_FIRS_PER_CNIC = 3       # Max FIR sections to assign randomly
-
-# --- Expanded Pakistan Laws Dictionary (as provided) ---
-laws = {
-    # --- Pakistan Penal Code (PPC) ---
-    "302": {"act": "PPC", "title": "Murder", "punishment": "Death, life imprisonment, and fine"},
-    "324": {"act": "PPC", "title": "Attempt to Murder", "punishment": "Up to 10 years or life imprisonment, and/or fine"},
-    "337A": {"act": "PPC", "title": "Hurt (Simple)", "punishment": "Up to 1 year imprisonment or fine"},
-    "337L(2)": {"act": "PPC", "title": "Rash or Negligent Act Causing Hurt", "punishment": "Up to 2 years imprisonment or fine"},
-    "382": {"act": "PPC", "title": "Theft after preparation for causing death/hurt/restraint", "punishment": "Up to 10 years and fine"},
-    "392": {"act": "PPC", "title": "Robbery", "punishment": "Up to 10 years and fine; if committed on highway, up to 14 years and fine"},
-    "406": {"act": "PPC", "title": "Criminal Breach of Trust", "punishment": "Up to 7 years and fine"},
-    "420": {"act": "PPC", "title": "Cheating and dishonestly inducing delivery of property", "punishment": "Up to 7 years and fine"},
-    "447": {"act": "PPC", "title": "Criminal Trespass", "punishment": "Up to 3 months or fine"},
-    "452": {"act": "PPC", "title": "House-trespass after preparation for hurt, assault or wrongful restraint", "punishment": "Up to 10 years and fine"},
-    "506": {"act": "PPC", "title": "Criminal Intimidation", "punishment": "Up to 2 years or fine"},
-    "186": {"act": "PPC", "title": "Obstructing Public Servant", "punishment": "Up to 3 months or fine up to PKR 50,000"},
-    "147": {"act": "PPC", "title": "Rioting", "punishment": "Up to 2 years or fine"},
-    "109": {"act": "PPC", "title": "Abetment", "punishment": "Same as for the main offence, and fine"},
-    "295C": {"act": "PPC", "title": "Blasphemy (Defiling Holy Prophet)", "punishment": "Death or life imprisonment, and fine"},
-    "295A": {"act": "PPC", "title": "Deliberate and malicious acts intended to outrage religious feelings", "punishment": "Up to 10 years or fine"},
-    "298C": {"act": "PPC", "title": "Qadiani/Ahmadi posing as Muslim", "punishment": "Imprisonment up to 3 years and fine"},
-    "365": {"act": "PPC", "title": "Kidnapping or abducting with intent secretly and wrongfully to confine person", "punishment": "Up to 7 years and fine"},
-    "376": {"act": "PPC", "title": "Rape", "punishment": "Death or imprisonment for life or rigorous imprisonment up to 25 years, and fine"},
-
-    # --- Anti-Terrorism Act (ATA) ---
-    "6ATA": {"act": "ATA", "title": "Definition of Terrorism", "punishment": "Varies by act; includes death, life imprisonment, and confiscation of property"},
-    "7ATA": {"act": "ATA", "title": "Punishment for Terrorist Act", "punishment": "Death, life imprisonment or confiscation, and fine"},
-    "11EATA": {"act": "ATA", "title": "Proscription of organizations", "punishment": "Strict penalties for membership/support, and fine"},
-    "11WATA": {"act": "ATA", "title": "Hate Speech", "punishment": "Up to 7 years, fine, and forfeiture of property"},
-    "21ATA": {"act": "ATA", "title": "Collection of funds for terrorist purposes", "punishment": "Up to 14 years and fine"},
-
-    # --- Prevention of Electronic Crimes Act (PECA) ---
-    "3PECA": {"act": "PECA", "title": "Unauthorized Access (Hacking)", "punishment": "Up to 3 years or fine or both"},
-    "4PECA": {"act": "PECA", "title": "Unauthorized Copying or Transmission of Data", "punishment": "Up to 2 years or fine or both"},
-    "11PECA": {"act": "PECA", "title": "Cyberstalking", "punishment": "3 years imprisonment and/or fine"},
-    "14PECA": {"act": "PECA", "title": "Electronic Fraud", "punishment": "Up to 7 years imprisonment or fine or both"},
-    "20PECA": {"act": "PECA", "title": "Offences against dignity of a natural person (Defamation)", "punishment": "3 years + 1 million fine"},
-    "21PECA": {"act": "PECA", "title": "Offences against modesty of a natural person and minor", "punishment": "Up to 7 years, fine, and confiscation"},
-    "24PECA": {"act": "PECA", "title": "Spoofing (SMS/Email)", "punishment": "Up to 3 years or fine or both"},
-    "37PECA": {"act": "PECA", "title": "Unlawful Online Content", "punishment": "Removal, blocking, and potential legal action, and fine"},
-
-    # --- Code of Criminal Procedure (CrPC) ---
-    "54CrPC": {"act": "CrPC", "title": "Arrest without warrant (Cognizable Offence)", "punishment": "Procedure for arrest, not a crime in itself"},
-    "61CrPC": {"act": "CrPC", "title": "Detention Limit", "punishment": "Cannot detain beyond 24 hrs without magistrate's order"},
-    "154CrPC": {"act": "CrPC", "title": "Recording of FIR", "punishment": "Police must record FIR for cognizable offense"},
-    "164CrPC": {"act": "CrPC", "title": "Recording of Confession/Statement", "punishment": "Procedure for recording evidence"},
-    "173CrPC": {"act": "CrPC", "title": "Police Report (Challan)", "punishment": "Procedure for submitting investigation report"},
-
-    # --- Control of Narcotic Substances Act (CNSA) ---
-    "6CNSA": {"act": "CNSA", "title": "Prohibition of possession of narcotic drugs, etc.", "punishment": "Varies significantly by quantity/type, from 2 years to death, and heavy fine"},
-    "9CNSA": {"act": "CNSA", "title": "Drug Possession (General)", "punishment": "Imprisonment up to lifetime + fine, varies by quantity"},
-    "8CNSA": {"act": "CNSA", "title": "Trafficking or financing trafficking of narcotic substances", "punishment": "Minimum 2 years to death depending on quantity, and heavy fine"},
-
-    # --- Foreigners Act (FA) ---
-    "3FA": {"act": "Foreigners Act", "title": "Restriction of entry, stay and departure", "punishment": "Deportation, imprisonment, and fine"},
-    "14FA": {"act": "Foreigners Act", "title": "Illegal Entry/Overstay", "punishment": "Deportation or 3 years jail and/or fine up to PKR 10,000"},
-
-    # --- NAB Ordinance (National Accountability Ordinance) ---
-    "9NAB": {"act": "NAB Ordinance", "title": "Corruption & Corrupt Practices (General)", "punishment": "Up to 14 years max + fine, and disqualification from public office"},
-    "10NAB": {"act": "NAB Ordinance", "title": "Reference for investigation/trial", "punishment": "Procedure, not a punishment itself"},
-
-    # --- Motor Vehicle Ordinance (MVO) ---
-    "279MVO": {"act": "MVO", "title": "Rash Driving or Riding on a Public Way", "punishment": "Up to 2 years + fine"},
-    "99MVO": {"act": "MVO", "title": "Driving without License", "punishment": "Fine up to PKR 5000 and/or short imprisonment"},
-    "116MVO": {"act": "MVO", "title": "Disobedience of orders", "punishment": "Fine and/or short imprisonment"},
-
-    # --- Arms Ordinance (AO) ---
-    "13AO": {"act": "Arms Ordinance", "title": "Possession of illicit arms", "punishment": "Up to 7 years imprisonment or fine or both"},
-    "13AOA": {"act": "Arms Ordinance", "title": "Prohibition of automatic weapons", "punishment": "Strict penalties, and fine"},
-
-    #  Maintenance of Public Order (MPO) ---
-    "3MPO": {"act": "MPO", "title": "Power to arrest and detain suspected persons", "punishment": "Up to 3 months detention (extendable)"},
-    "16MPO": {"act": "MPO", "title": "Disobedience to order duly promulgated by public servant", "punishment": "Up to 6 months or fine"},
-
-    #  Prevention of Corruption Act (PCA) ---
-    "5PCA": {"act": "PCA", "title": "Criminal misconduct by public servant", "punishment": "Up to 7 years and/or fine"},
-
-    #  Qanun-e-Shahadat Order (QSO - Law of Evidence) ---
-    "3QSO": {"act": "QSO", "title": "Competency of Witnesses", "punishment": "Admissibility of evidence, not a crime"},
-    "129QSO": {"act": "QSO", "title": "Estoppel", "punishment": "Legal principle, not a crime"},
-    "163QSO": {"act": "QSO", "title": "Electronic Evidence", "punishment": "Admissibility of electronic records"},
-
-    # Customs Act (CA)
-    "156CA": {"act": "Customs Act", "title": "Offences and Penalties (Smuggling)", "punishment": "Imprisonment, fine, and confiscation of goods"},
-
-    #  Anti-Money Laundering Act (AMLA)
-    "3AMLA": {"act": "AMLA", "title": "Offence of Money Laundering", "punishment": "3 to 10 years imprisonment and fine up to 100 million rupees"},
-}
+VIEW_ALL_PAGE_SIZE = 50            # FIRs rendered at a time by "View All FIRs"; more are fetched on scroll
+SEARCH_DEBOUNCE_MS = 300           # Pause in typing after which the search fields are searched automatically
+SEARCH_CACHE_SIZE = 64             # Recent search results kept for repeated and refined searches
+WATCH_INTERVAL = 2.0               # Seconds between checks for changes other users made to the shared data files
+METRICS_ENABLED = True             # Record operation timings and counts for the debug panel (fir_metrics.py)
+LOG_LEVEL = 'INFO'                 # Least severe messages logged: 'DEBUG', 'INFO', 'WARNING' or 'ERROR' (fir_logging.py)
+LOG_FILE = 'fir_app.log'           # Log file (JSON Lines); None to log to the console only
+LOG_MAX_BYTES = 1_000_000          # Size at which LOG_FILE is rotated
+LOG_BACKUPS = 5                    # Rotated log files kept as fir_app.log.1 ... .N
+
+log = get_logger('app')
 
 # --- Data Persistence Functions ---
-def load_fir_data():
-    """Loads FIR data from the JSON file."""
-    if os.path.exists(FIR_DATA_FILE):
-        try:
-            with open(FIR_DATA_FILE, 'r') as f:
-                data = json.load(f)
-                # Ensure the loaded data matches the new structure (dict of lists of dicts)
-                if isinstance(data, dict) and all(isinstance(v, list) and all(isinstance(item, dict) for item in v) for v in data.values()):
-                    print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Loaded {sum(len(v) for v in data.values())} FIRs across {len(data)} CNIC entries from {FIR_DATA_FILE}.")
-                    return data
-                else:
-                    print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Warning: {FIR_DATA_FILE} content is invalid or old format. Starting with empty data.")
-                    return {}
-        except json.JSONDecodeError as e:
-            print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Error decoding {FIR_DATA_FILE}: {e}. Starting with empty data.")
-            return {}
-        except Exception as e:
-            print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] An unexpected error occurred while loading {FIR_DATA_FILE}: {e}. Starting with empty data.")
-            return {}
-    print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] {FIR_DATA_FILE} not found. Starting with empty data.")
-    return {}
-
-def save_fir_data(data):
-    """Saves FIR data to the JSON file."""
-    try:
-        with open(FIR_DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
-        print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Data successfully saved to {FIR_DATA_FILE}.")
-    except Exception as e:
-        print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Error saving data to {FIR_DATA_FILE}: {e}")
-
-# --- Initial Load of FIR Data ---
-fir_data = load_fir_data()
+def open_fir_backend():
+    """Creates the configured storage backend (see fir_backends.py)."""
+    if STORAGE_BACKEND == 'sqlite':
+        return SQLiteBackend(FIR_DATABASE_FILE)
+    return JsonFileBackend(FIR_DATA_FILE, FIR_JOURNAL_FILE, FIR_SEQUENCE_FILE, STORAGE_MODE,
+                           JOURNAL_COMPACTION_THRESHOLD, SNAPSHOT_GENERATIONS, COMPACT_RECORDS, SNAPSHOT_FORMAT)
 
 # --- Utility Functions ---
 def generate_random_cnic():
@@ -143,26 +56,10 @@ def generate_random_cnic():
     part3 = str(random.randint(0, 7))
     return f"{part1}-{part2}-{part3}"
 
-def generate_fir_number():
-    """Generates a unique FIR number (e.g., Year/District/Sequence)."""
-    year = datetime.datetime.now().year
-    # This is a very basic sequential number; in a real system, it would be much more robust
-    # and likely come from a database sequence. For now, find the highest existing.
-    max_seq = 0
-    for cnic_firs in fir_data.values():
-        for fir_detail in cnic_firs:
-            fir_num = fir_detail.get('fir_number', '')
-            match = re.match(r'^\d{4}/[A-Z]{3}/(\d+)$', fir_num) # e.g., 2024/LHR/0001
-            if match:
-                max_seq = max(max_seq, int(match.group(1)))
-    new_seq = max_seq + 1
-    # Example District Code, could be user input later
-    district_code = "LHR"
-    return f"{year}/{district_code}/{new_seq:04d}" # Pad with leading zeros to 4 digits
-
-# --- Generate Dummy FIR Data if file is empty or in old format ---
-if not fir_data:
-    print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Generating initial dummy FIR data with new structure...")
+# --- Dummy FIR Data for a fresh installation ---
+def generate_dummy_fir_data(backend):
+    """Fills an empty backend with random FIRs so the application has something to show."""
+    log.info("Generating initial dummy FIR data with new structure...")
     all_sections = list(laws.keys())
     dummy_names = ["Ali", "Sara", "Ahmed", "Fatima", "Usman", "Ayesha", "Bilal", "Zainab"]
     dummy_father_names = ["Muhammad", "Akram", "Hussain", "Javed", "Iqbal"]
@@ -178,16 +75,18 @@ if not fir_data:
     bail_statuses = ["Granted", "Denied", "Pending", "N/A"]
     punishments = ["Case ongoing", "Acquitted", "Sentenced to 1 year imprisonment", "Fine imposed", "Community service ordered", "Case dismissed"]
 
+    dummy_cnics = set()
+    dummy_entries = []
     for _ in range(INITIAL_DUMMY_CNICS):
         cnic = generate_random_cnic()
-        while cnic in fir_data: # Ensure unique CNIC for dummy data
+        while cnic in dummy_cnics: # Ensure unique CNIC for dummy data
             cnic = generate_random_cnic()
+        dummy_cnics.add(cnic)
 
         num_firs_for_cnic = random.randint(0, MAX_RANDOM_FIRS_PER_CNIC)
-        fir_data[cnic] = [] # Initialize list for FIRs for this CNIC
 
         for _ in range(num_firs_for_cnic):
-            fir_num = generate_fir_number() # Generate a new FIR number
+            fir_num = backend.next_fir_number(datetime.datetime.now().year, "LHR") # Generate a new FIR number
             complainant = random.choice(dummy_names)
             complainant_father = random.choice(dummy_father_names)
             accused_name = random.choice(dummy_names) # Assign a dummy accused name
@@ -212,19 +111,23 @@ if not fir_data:
                 "bail_status": bail_status,
                 "punishment": punishment
             }
-            fir_data[cnic].append(fir_entry)
-    save_fir_data(fir_data)
-    print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Generated and saved {sum(len(v) for v in fir_data.values())} dummy FIR entries.")
+            dummy_entries.append((cnic, fir_entry))
+    backend.put_many(dummy_entries)
+    backend.save()
+    log.info("Generated and saved %s dummy FIR entries.", len(dummy_entries))
 
+# --- Application Store ---
+# Nothing is loaded at import time; the store opens the backend on first use.
+fir_store = FIRStore(open_fir_backend, seed=generate_dummy_fir_data, search_cache_size=SEARCH_CACHE_SIZE)
+metrics.enabled = METRICS_ENABLED
+fir_service = FIRService(fir_store) # What the GUI calls; see fir_service.py
 
-# --- Validation Functions ---
-def is_valid_cnic(cnic):
-    """Checks if the CNIC format is valid (XXXXX-XXXXXXX-X)."""
-    return re.fullmatch(r'\d{5}-\d{7}-\d{1}', cnic)
+def __getattr__(name):
+    # Lazily expose the loaded backend as Lawyer.fir_backend for scripts that use it directly
+    if name == 'fir_backend':
+        return fir_store.backend
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def is_valid_fir_number(fir_num):
-    """Checks if the FIR number format is valid (YYYY/DDD/NNNN)."""
-    return re.fullmatch(r'\d{4}/[A-Z]{3}/\d{4,}', fir_num) # Allows for more than 4 digits for sequence
 
 # --- GUI Application Class ---
 class FIRApp:
@@ -282,7 +185,7 @@ class FIRApp:
         # Configure grid for search_frame
         self.search_frame.columnconfigure(1, weight=1) # CNIC Entry expands
         self.search_frame.columnconfigure(3, weight=1) # FIR Number Entry expands
-        self.search_frame.rowconfigure(3, weight=1)    # Output area expands
+        self.search_frame.rowconfigure(7, weight=1)    # Output area expands
 
         # Configure grid for add_update_frame
         # Make some columns expandable for better layout
@@ -319,24 +222,93 @@ class FIRApp:
         self.search_accused_father_placeholder = "e.g. Muhammad Iqbal"
         self._set_placeholder(self.search_accused_father_entry, self.search_accused_father_placeholder)
 
+        # Search by Complainant Name
+        ttk.Label(self.search_frame, text="Complainant Name:").grid(row=2, column=0, padx=5, pady=2, sticky="w")
+        self.search_complainant_name_entry = ttk.Entry(self.search_frame, font=('Arial', 12))
+        self.search_complainant_name_entry.grid(row=2, column=1, padx=5, pady=2, sticky="ew")
+        self.search_complainant_name_placeholder = "e.g. Complainant Name"
+        self._set_placeholder(self.search_complainant_name_entry, self.search_complainant_name_placeholder)
+
+        # Search by Complainant Father's Name
+        ttk.Label(self.search_frame, text="Complainant Father's Name:").grid(row=2, column=2, padx=5, pady=2, sticky="w")
+        self.search_complainant_father_entry = ttk.Entry(self.search_frame, font=('Arial', 12))
+        self.search_complainant_father_entry.grid(row=2, column=3, padx=5, pady=2, sticky="ew")
+        self.search_complainant_father_placeholder = "e.g. Ahmed Khan"
+        self._set_placeholder(self.search_complainant_father_entry, self.search_complainant_father_placeholder)
+
+        # Search by Law Section
+        ttk.Label(self.search_frame, text="Law Section:").grid(row=3, column=0, padx=5, pady=2, sticky="w")
+        self.search_section_entry = ttk.Entry(self.search_frame, font=('Arial', 12))
+        self.search_section_entry.grid(row=3, column=1, padx=5, pady=2, sticky="ew")
+        self.search_section_placeholder = "e.g. 302"
+        self._set_placeholder(self.search_section_entry, self.search_section_placeholder)
+
+        # Search by Act (any of the FIR's sections belongs to it)
+        ttk.Label(self.search_frame, text="Act:").grid(row=3, column=2, padx=5, pady=2, sticky="w")
+        self.search_act_combobox = ttk.Combobox(self.search_frame, state='readonly',
+                                                values=[""] + sorted({info['act'] for info in laws.values()}))
+        self.search_act_combobox.grid(row=3, column=3, padx=5, pady=2, sticky="ew")
+
+        # Search by Bail Status
+        ttk.Label(self.search_frame, text="Bail Status:").grid(row=4, column=0, padx=5, pady=2, sticky="w")
+        self.search_bail_status_combobox = ttk.Combobox(self.search_frame, state='readonly', values=["", "N/A", "Granted", "Denied", "Pending"])
+        self.search_bail_status_combobox.grid(row=4, column=1, padx=5, pady=2, sticky="ew")
+
+        # Search by FIR Date range (inclusive)
+        ttk.Label(self.search_frame, text="FIR Date From / To:").grid(row=4, column=2, padx=5, pady=2, sticky="w")
+        self.search_date_frame = ttk.Frame(self.search_frame)
+        self.search_date_frame.grid(row=4, column=3, padx=5, pady=2, sticky="ew")
+        self.search_date_frame.columnconfigure((0, 1), weight=1)
+        self.search_date_from_entry = ttk.Entry(self.search_date_frame, font=('Arial', 12), width=12)
+        self.search_date_from_entry.grid(row=0, column=0, padx=(0, 5), sticky="ew")
+        self.search_date_from_placeholder = "From YYYY-MM-DD"
+        self._set_placeholder(self.search_date_from_entry, self.search_date_from_placeholder)
+        self.search_date_to_entry = ttk.Entry(self.search_date_frame, font=('Arial', 12), width=12)
+        self.search_date_to_entry.grid(row=0, column=1, sticky="ew")
+        self.search_date_to_placeholder = "To YYYY-MM-DD"
+        self._set_placeholder(self.search_date_to_entry, self.search_date_to_placeholder)
+
+        # Approximate name matching, for spelling variants such as Usman/Osman or Ayesha/Aisha
+        self.search_fuzzy_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.search_frame, text="Match similar spellings of names (closest matches first)",
+                        variable=self.search_fuzzy_var, command=self._schedule_live_search).grid(row=5, column=0, columnspan=4, padx=5, pady=2, sticky="w")
 
         # Buttons for Search Section
         self.check_button = ttk.Button(self.search_frame, text="Search FIR", command=self.check_fir_gui, style='Blue.TButton')
-        self.check_button.grid(row=2, column=0, padx=5, pady=5, sticky="ew")
+        self.check_button.grid(row=6, column=0, padx=5, pady=5, sticky="ew")
 
         self.clear_search_button = ttk.Button(self.search_frame, text="Clear Search Fields", command=self.clear_search_fields_gui, style='Orange.TButton')
-        self.clear_search_button.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
+        self.clear_search_button.grid(row=6, column=1, padx=5, pady=5, sticky="ew")
 
         self.delete_fir_button = ttk.Button(self.search_frame, text="Delete Selected FIR", command=self.delete_fir_gui, style='Red.TButton')
-        self.delete_fir_button.grid(row=2, column=2, padx=5, pady=5, sticky="ew")
+        self.delete_fir_button.grid(row=6, column=2, padx=5, pady=5, sticky="ew")
 
         self.view_all_firs_button = ttk.Button(self.search_frame, text="View All FIRs", command=self.view_all_firs, style='Purple.TButton')
-        self.view_all_firs_button.grid(row=2, column=3, padx=5, pady=5, sticky="ew")
+        self.view_all_firs_button.grid(row=6, column=3, padx=5, pady=5, sticky="ew")
 
         # Output area for search results
         self.output_area_search = scrolledtext.ScrolledText(self.search_frame, wrap=tk.WORD, height=12, state='disabled',
                                                              relief=tk.FLAT, bd=1, background='white', foreground='#333333', font=('Arial', 12))
-        self.output_area_search.grid(row=3, column=0, columnspan=4, padx=10, pady=10, sticky="nsew")
+        self.output_area_search.grid(row=7, column=0, columnspan=4, padx=10, pady=10, sticky="nsew")
+        self.output_area_search.configure(yscrollcommand=self._on_search_output_scroll)
+
+        # Paging state for "View All FIRs"
+        self._view_all_cursor = None   # Backend cursor of the next page
+        self._view_all_more = False    # True while there are pages left to fetch
+        self._view_all_pending = False # True while a page is being fetched
+        self._view_all_rendered = 0
+        self._view_all_total = 0
+
+        # Search as you type: every change to a search field restarts a short timer
+        self._live_search_after = None   # Pending master.after id
+        self._last_search_criteria = None
+        for entry in (self.search_cnic_entry, self.search_fir_num_entry, self.search_accused_name_entry,
+                      self.search_accused_father_entry, self.search_complainant_name_entry, self.search_complainant_father_entry,
+                      self.search_section_entry, self.search_date_from_entry, self.search_date_to_entry):
+            entry.bind("<KeyRelease>", self._schedule_live_search)
+            entry.bind("<Return>", lambda event: self.check_fir_gui())
+        for combobox in (self.search_act_combobox, self.search_bail_status_combobox):
+            combobox.bind("<<ComboboxSelected>>", self._schedule_live_search)
 
         # Configure tags for output_area_search
         self.output_area_search.tag_configure('red', foreground='red')
@@ -349,6 +321,7 @@ class FIRApp:
         self.output_area_search.tag_configure('section_info', font=('Arial', 12, 'italic'), foreground='#2F4F4F') # For law sections
         self.output_area_search.tag_configure('complainant_section_header', font=('Arial', 13, 'bold', 'underline'), foreground='#006400') # Dark Green for Complainant
         self.output_area_search.tag_configure('accused_section_header', font=('Arial', 13, 'bold', 'underline'), foreground='#8B0000') # Dark Red for Accused
+        self.output_area_search.tag_configure('more_hint', font=('Arial', 11, 'italic'), foreground='gray') # "Scroll for more" footer
 
 
         # --- Add/Update Section Widgets ---
@@ -435,6 +408,29 @@ class FIRApp:
                                                          relief=tk.FLAT, bd=1, background='white', foreground='#333333', font=('Arial', 12))
         self.add_output_area.grid(row=7, column=0, columnspan=4, padx=10, pady=10, sticky="nsew")
 
+        # --- Status bar with busy indicator ---
+        self.status_frame = ttk.Frame(self.main_frame)
+        self.status_frame.pack(padx=10, fill="x", expand=False)
+        self.status_label = ttk.Label(self.status_frame, text="Ready")
+        self.status_label.pack(side="left")
+        self.busy_bar = ttk.Progressbar(self.status_frame, mode='indeterminate', length=150)
+        self.busy_bar.pack(side="right")
+        self.stats_button = ttk.Button(self.status_frame, text="Statistics", command=self.show_stats_gui, style='Purple.TButton')
+        self.stats_button.pack(side="right", padx=10)
+        self.stats_window = None
+        self._stats_summary = None
+        self.debug_button = ttk.Button(self.status_frame, text="Debug", command=self.show_debug_gui, style='Blue.TButton')
+        self.debug_button.pack(side="right")
+        self.debug_window = None
+
+        # Saves and searches run on background threads; results come back through master.after
+        self.jobs = BackgroundJobs(master, on_busy_change=self._set_busy)
+        master.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Load the data in the background so the window shows up right away. Searches submitted
+        # before the load finishes see the FIRs loaded so far; changes wait for it.
+        self.jobs.submit(fir_store.load, self._report_load_progress,
+                         on_done=self._on_data_loaded, on_error=self._job_failed(self.output_area_search))
 
     # --- Placeholder logic for Entry fields ---
     def _set_placeholder(self, entry_widget, placeholder_text):
@@ -462,21 +458,121 @@ class FIRApp:
         self.style.configure('TEntry', bordercolor='#CCCCCC') # Ensure default border when unfocused
         entry_widget.config(style='TEntry')
 
-    # --- Helper to update ScrolledText widgets ---
+    # --- Helpers to update ScrolledText widgets ---
     def update_output(self, output_widget, message, append=False, color=None, font_tag=None):
-        output_widget.config(state='normal')
-        if not append:
-            output_widget.delete(1.0, tk.END)
-
         tags = []
         if color:
             tags.append(color)
         if font_tag:
             tags.append(font_tag)
-
-        output_widget.insert(tk.END, message + "\n", tuple(tags) if tags else ())
-        output_widget.see(tk.END)
-        output_widget.config(state='disabled')
+        self.render_segments(output_widget, [(message + "\n", tuple(tags))], append)
+
+    def render_segments(self, output_widget, segments, append=False, scroll=True):
+        """Writes a list of (text, tags) segments with a single state toggle and insert."""
+        with metrics.timed('render') as counts:
+            counts['segments'] = len(segments)
+            output_widget.config(state='normal')
+            if not append:
+                output_widget.delete(1.0, tk.END)
+                if output_widget is self.output_area_search:
+                    self._stop_view_all_paging() # The FIR list is being replaced
+            if segments:
+                insert_args = []
+                for text, tags in segments:
+                    insert_args.extend((text, tags))
+                output_widget.insert(tk.END, *insert_args)
+            if scroll:
+                output_widget.see(tk.END)
+            output_widget.config(state='disabled')
+
+    def _fir_detail_segments(self, fir, number, separator):
+        """Builds the (text, tags) segments that display one FIR."""
+        segments = [
+            (f"\n--- FIR Details {number} ---\n", ('darkred', 'header')),
+            ("FIR Number: \n", ('fir_detail_label',)),
+            (f"{fir.get('fir_number', 'N/A')}\n", ('fir_detail_value',)),
+
+            ("\n--- Complainant Details ---\n", ('complainant_section_header',)),
+            ("Name: \n", ('fir_detail_label',)),
+            (f"{fir.get('complainant_name', 'N/A')}\n", ('fir_detail_value',)),
+            ("Father's Name: \n", ('fir_detail_label',)),
+            (f"{fir.get('complainant_father_name', 'N/A')}\n", ('fir_detail_value',)),
+
+            ("\n--- Accused Details ---\n", ('accused_section_header',)),
+            ("CNIC: \n", ('fir_detail_label',)),
+            (f"{fir.get('cnic', 'N/A')}\n", ('fir_detail_value',)),
+            ("Name: \n", ('fir_detail_label',)),
+            (f"{fir.get('accused_name', 'N/A')}\n", ('fir_detail_value',)),
+            ("Father's Name: \n", ('fir_detail_label',)),
+            (f"{fir.get('accused_father_name', 'N/A')}\n", ('fir_detail_value',)),
+
+            ("\n--- Case Details ---\n", ('darkred', 'header')),
+            ("Date: \n", ('fir_detail_label',)),
+            (f"{fir.get('fir_date', 'N/A')}\n", ('fir_detail_value',)),
+            ("Reason: \n", ('fir_detail_label',)),
+            (f"{fir.get('reason', 'N/A')}\n", ('fir_detail_value',)),
+            ("Bail Status: \n", ('fir_detail_label',)),
+            (f"{fir.get('bail_status', 'N/A')}\n", ('fir_detail_value',)),
+            ("Punishment: \n", ('fir_detail_label',)),
+            (f"{fir.get('punishment', 'N/A')}\n", ('fir_detail_value',)),
+        ]
+
+        sections_applied = fir.get('sections', [])
+        if sections_applied:
+            segments.append(("Applied Sections:\n", ('fir_detail_label',)))
+            for section in sections_applied:
+                law_info = laws.get(section, {})
+                title = law_info.get('title', 'Unknown Title')
+                act = law_info.get('act', 'Unknown Act')
+                punishment_info = law_info.get('punishment', 'N/A')
+                segments.append((f"  - {section} ({act}): {title} (Punishment: {punishment_info})\n", ('section_info',)))
+        else:
+            segments.append(("Applied Sections: N/A\n", ('fir_detail_value',)))
+        segments.append((separator + "\n", ('gray',)))
+        return segments
+
+    # --- Background job helpers ---
+    def _set_busy(self, busy):
+        if busy:
+            self.status_label.config(text="Working...")
+            self.busy_bar.start(10)
+        else:
+            self.status_label.config(text="Ready")
+            self.busy_bar.stop()
+
+    def _report_load_progress(self, bytes_read, total_bytes, fir_count):
+        # Called on the io thread; the widgets are updated from the Tk thread
+        self.jobs.call_soon(self._show_load_progress, bytes_read, total_bytes, fir_count)
+
+    def _show_load_progress(self, bytes_read, total_bytes, fir_count):
+        self.busy_bar.stop()
+        self.busy_bar.config(mode='determinate', maximum=max(total_bytes, 1), value=bytes_read)
+        self.status_label.config(text=f"Loading FIR data... {bytes_read * 100 // max(total_bytes, 1)}% ({fir_count} FIRs searchable)")
+
+    def _on_data_loaded(self, fir_count):
+        self.busy_bar.config(mode='indeterminate', value=0)
+        if self.jobs.busy:
+            self.busy_bar.start(10)
+        self.status_label.config(text=f"Loaded {fir_count} FIRs.")
+        # Other users (or the FIR server) may change the files too; their changes are merged in as they appear
+        fir_store.watch(WATCH_INTERVAL, lambda: self.jobs.call_soon(self._on_external_change))
+
+    def _on_external_change(self):
+        """Shows FIRs changed by another user: reruns the search on screen and refreshes the open statistics."""
+        self.status_label.config(text="FIR data updated by another user.")
+        if self._last_search_criteria is not None:
+            self._submit_search(self._last_search_criteria)
+        if self.stats_window is not None and self.stats_window.winfo_exists():
+            self.show_stats_gui()
+
+    def _job_failed(self, output_widget):
+        return lambda error: self.update_output(output_widget, f"Operation failed: {error}", False, 'red')
+
+    def on_close(self):
+        self.jobs.shutdown() # Let queued saves finish before the window goes away
+        fir_store.close()
+        self.master.destroy()
+        shutdown_logging()
 
     # --- Temporary Message for Success/Error ---
     def show_temp_message(self, entry_widget, message, color='green', duration=2000):
@@ -489,89 +585,84 @@ class FIRApp:
         temp_label.after(duration, temp_label.destroy)
 
     # --- Core Logic Functions ---
-    def check_fir_gui(self):
-        cnic_search = self.search_cnic_entry.get().strip()
-        fir_num_search = self.search_fir_num_entry.get().strip()
-        accused_name_search = self.search_accused_name_entry.get().strip()
-        accused_father_search = self.search_accused_father_entry.get().strip()
-
-        # Treat placeholders as empty
-        if cnic_search == self.search_cnic_placeholder:
-            cnic_search = ""
-        if fir_num_search == self.search_fir_num_placeholder:
-            fir_num_search = ""
-        if accused_name_search == self.search_accused_name_placeholder:
-            accused_name_search = ""
-        if accused_father_search == self.search_accused_father_placeholder:
-            accused_father_search = ""
-
-        if not cnic_search and not fir_num_search and not accused_name_search and not accused_father_search:
-            self.update_output(self.output_area_search, "Please enter at least one search criterion (CNIC, FIR Number, Accused Name, or Accused Father's Name).", 'red')
-            return
-
-        found_firs = []
-        for cnic_key, fir_list in fir_data.items():
-            if cnic_search and cnic_search != cnic_key:
-                continue # Skip if searching by CNIC and it doesn't match
-
-            for fir_detail in fir_list:
-                match_cnic = not cnic_search or (cnic_search == cnic_key)
-                match_fir_num = not fir_num_search or (fir_num_search.lower() == fir_detail.get('fir_number', '').lower())
-                match_accused_name = not accused_name_search or (accused_name_search.lower() in fir_detail.get('accused_name', '').lower())
-                match_accused_father = not accused_father_search or (accused_father_search.lower() in fir_detail.get('accused_father_name', '').lower())
-
-                if match_cnic and match_fir_num and match_accused_name and match_accused_father:
-                    found_firs.append(fir_detail)
-
-        self.update_output(self.output_area_search, "", append=False) # Clear previous results
+    def _search_criteria(self, report_errors=True):
+        """Reads the search fields into search() keyword arguments.
+
+        Returns None if a field is invalid (reporting it unless report_errors is False) or if
+        nothing was entered.
+        """
+        entries = {
+            "cnic": (self.search_cnic_entry, self.search_cnic_placeholder),
+            "fir_number": (self.search_fir_num_entry, self.search_fir_num_placeholder),
+            "accused_name": (self.search_accused_name_entry, self.search_accused_name_placeholder),
+            "accused_father_name": (self.search_accused_father_entry, self.search_accused_father_placeholder),
+            "complainant_name": (self.search_complainant_name_entry, self.search_complainant_name_placeholder),
+            "complainant_father_name": (self.search_complainant_father_entry, self.search_complainant_father_placeholder),
+            "section": (self.search_section_entry, self.search_section_placeholder),
+            "date_from": (self.search_date_from_entry, self.search_date_from_placeholder),
+            "date_to": (self.search_date_to_entry, self.search_date_to_placeholder),
+        }
+        criteria = {}
+        for field, (entry, placeholder) in entries.items():
+            value = entry.get().strip()
+            criteria[field] = "" if value == placeholder else value # Treat placeholders as empty
+        criteria["act"] = self.search_act_combobox.get()
+        criteria["bail_status"] = self.search_bail_status_combobox.get()
+
+        if not any(criteria.values()):
+            if report_errors:
+                self.update_output(self.output_area_search, "Please enter at least one search criterion (CNIC, FIR Number, a Name, Section, Act, Bail Status or FIR Date).", 'red')
+            return None
+        if criteria["section"]:
+            section_search = criteria["section"]
+            criteria["section"] = canonical_section(section_search)
+            if criteria["section"] is None:
+                if report_errors:
+                    self.update_output(self.output_area_search, f"Invalid Law Section: {section_search}. Please enter a section from the predefined list.", 'red')
+                    self.show_temp_message(self.search_section_entry, "Invalid Section!", 'red')
+                return None
+        for field in ("date_from", "date_to"):
+            if criteria[field] and not is_valid_fir_date(criteria[field]):
+                if report_errors:
+                    self.update_output(self.output_area_search, "Invalid FIR Date. Format: YYYY-MM-DD", 'red')
+                    self.show_temp_message(entries[field][0], "Invalid Date!", 'red')
+                return None
+        criteria["fuzzy"] = self.search_fuzzy_var.get()
+        return criteria
 
+    def check_fir_gui(self):
+        criteria = self._search_criteria()
+        if criteria is not None:
+            self._submit_search(criteria)
+
+    def _submit_search(self, criteria):
+        self._last_search_criteria = criteria
+        # A newer search (or listing) supersedes this one if it hasn't finished yet
+        self.jobs.submit(fir_service.search, SearchQuery(**criteria),
+                         on_done=self._show_search_results, on_error=self._job_failed(self.output_area_search),
+                         lane='search', supersede='search')
+
+    # --- Search as you type ---
+    def _schedule_live_search(self, event=None):
+        """Restarts the debounce timer; the search runs once typing pauses for SEARCH_DEBOUNCE_MS."""
+        if self._live_search_after is not None:
+            self.master.after_cancel(self._live_search_after)
+        self._live_search_after = self.master.after(SEARCH_DEBOUNCE_MS, self._live_search)
+
+    def _live_search(self):
+        self._live_search_after = None
+        criteria = self._search_criteria(report_errors=False) # Half-typed input is not an error yet
+        if criteria is not None and criteria != self._last_search_criteria:
+            self._submit_search(criteria)
+
+    def _show_search_results(self, found_firs):
         if found_firs:
-            self.update_output(self.output_area_search, f"Found {len(found_firs)} FIR(s):", 'green', 'header')
+            segments = [(f"Found {len(found_firs)} FIR(s):\n", ('green', 'header'))]
             for i, fir in enumerate(found_firs):
-                self.update_output(self.output_area_search, f"\n--- FIR Details {i+1} ---", True, 'darkred', 'header')
-                self.update_output(self.output_area_search, f"FIR Number: ", True, font_tag='fir_detail_label')
-                self.update_output(self.output_area_search, f"{fir.get('fir_number', 'N/A')}", True, font_tag='fir_detail_value')
-
-                self.update_output(self.output_area_search, f"\n--- Complainant Details ---", True, 'complainant_section_header')
-                self.update_output(self.output_area_search, f"Name: ", True, font_tag='fir_detail_label')
-                self.update_output(self.output_area_search, f"{fir.get('complainant_name', 'N/A')}", True, font_tag='fir_detail_value')
-                self.update_output(self.output_area_search, f"Father's Name: ", True, font_tag='fir_detail_label')
-                self.update_output(self.output_area_search, f"{fir.get('complainant_father_name', 'N/A')}", True, font_tag='fir_detail_value')
-
-                self.update_output(self.output_area_search, f"\n--- Accused Details ---", True, 'accused_section_header')
-                self.update_output(self.output_area_search, f"CNIC: ", True, font_tag='fir_detail_label')
-                self.update_output(self.output_area_search, f"{fir.get('cnic', 'N/A')}", True, font_tag='fir_detail_value')
-                self.update_output(self.output_area_search, f"Name: ", True, font_tag='fir_detail_label')
-                self.update_output(self.output_area_search, f"{fir.get('accused_name', 'N/A')}", True, font_tag='fir_detail_value')
-                self.update_output(self.output_area_search, f"Father's Name: ", True, font_tag='fir_detail_label')
-                self.update_output(self.output_area_search, f"{fir.get('accused_father_name', 'N/A')}", True, font_tag='fir_detail_value')
-
-                self.update_output(self.output_area_search, f"\n--- Case Details ---", True, 'darkred', 'header')
-                self.update_output(self.output_area_search, f"Date: ", True, font_tag='fir_detail_label')
-                self.update_output(self.output_area_search, f"{fir.get('fir_date', 'N/A')}", True, font_tag='fir_detail_value')
-                self.update_output(self.output_area_search, f"Reason: ", True, font_tag='fir_detail_label')
-                self.update_output(self.output_area_search, f"{fir.get('reason', 'N/A')}", True, font_tag='fir_detail_value')
-                self.update_output(self.output_area_search, f"Bail Status: ", True, font_tag='fir_detail_label')
-                self.update_output(self.output_area_search, f"{fir.get('bail_status', 'N/A')}", True, font_tag='fir_detail_value')
-                self.update_output(self.output_area_search, f"Punishment: ", True, font_tag='fir_detail_label')
-                self.update_output(self.output_area_search, f"{fir.get('punishment', 'N/A')}", True, font_tag='fir_detail_value')
-
-                sections_applied = fir.get('sections', [])
-                if sections_applied:
-                    self.update_output(self.output_area_search, f"Applied Sections:", True, font_tag='fir_detail_label')
-                    for section in sections_applied:
-                        law_info = laws.get(section, {})
-                        title = law_info.get('title', 'Unknown Title')
-                        act = law_info.get('act', 'Unknown Act')
-                        punishment = law_info.get('punishment', 'N/A')
-                        self.update_output(self.output_area_search, f"  - {section} ({act}): {title} (Punishment: {punishment})", True, font_tag='section_info')
-                else:
-                    self.update_output(self.output_area_search, f"Applied Sections: N/A", True, font_tag='fir_detail_value')
-                self.update_output(self.output_area_search, "\n" + "-"*50, True, 'gray') # Separator
-
-
+                segments.extend(self._fir_detail_segments(fir, i + 1, "\n" + "-"*50)) # Separator
+            self.render_segments(self.output_area_search, segments)
         else:
-            self.update_output(self.output_area_search, "No FIR found matching the criteria.", 'crimson')
+            self.update_output(self.output_area_search, "No FIR found matching the criteria.", False, 'crimson')
 
     def add_update_fir_gui(self):
         cnic = self.add_cnic_entry.get().strip()
@@ -590,87 +681,52 @@ class FIRApp:
         if cnic == self.add_cnic_placeholder: cnic = ""
         if fir_num == self.add_fir_num_placeholder: fir_num = ""
         if complainant_name == self.add_complainant_name_placeholder: complainant_name = ""
-        if complainant_father_name == self.add_complainant_father_name_placeholder: complainant_father_name = ""
+        if complainant_father_name == self.add_complainant_father_placeholder: complainant_father_name = ""
         if accused_name == self.add_accused_name_placeholder: accused_name = ""
-        if accused_father_name == self.add_accused_father_name_placeholder: accused_father_name = ""
+        if accused_father_name == self.add_accused_father_placeholder: accused_father_name = ""
         if fir_date == self.add_fir_date_placeholder: fir_date = datetime.date.today().strftime("%Y-%m-%d") # Use actual date
         if reason == self.add_reason_placeholder: reason = ""
         if sections_str == self.add_sections_placeholder: sections_str = ""
         if punishment == self.add_punishment_placeholder: punishment = ""
 
-        # Validation
-        if not cnic or not is_valid_cnic(cnic):
-            self.update_output(self.add_output_area, "Invalid or missing Accused CNIC. Format: XXXXX-XXXXXXX-X", 'red')
-            self.show_temp_message(self.add_cnic_entry, "Invalid CNIC!", 'red')
-            return
-        if not complainant_name:
-            self.update_output(self.add_output_area, "Complainant Name is required.", 'red')
-            self.show_temp_message(self.add_complainant_name_entry, "Required!", 'red')
-            return
-        if not accused_name:
-            self.update_output(self.add_output_area, "Accused Name is required.", 'red')
-            self.show_temp_message(self.add_accused_name_entry, "Required!", 'red')
-            return
-        if not fir_date or not re.fullmatch(r'\d{4}-\d{2}-\d{2}', fir_date):
-            self.update_output(self.add_output_area, "Invalid FIR Date. Format: YYYY-MM-DD", 'red')
-            self.show_temp_message(self.add_fir_date_entry, "Invalid Date!", 'red')
-            return
-        if not reason:
-            self.update_output(self.add_output_area, "Reason for FIR is required.", 'red')
-            self.show_temp_message(self.add_reason_entry, "Required!", 'red')
+        fir_input = FIRInput(cnic=cnic, fir_number=fir_num, complainant_name=complainant_name,
+                             complainant_father_name=complainant_father_name, accused_name=accused_name,
+                             accused_father_name=accused_father_name, reason=reason, fir_date=fir_date,
+                             sections=tuple(s.strip() for s in sections_str.split(',') if s.strip()),
+                             bail_status=bail_status, punishment=punishment)
+
+        # Validation (the first problem, in form order)
+        errors = fir_service.validate(fir_input)
+        if errors:
+            field, message = next(iter(errors.items()))
+            entry_widget, temp_message = {
+                "cnic": (self.add_cnic_entry, "Invalid CNIC!"),
+                "complainant_name": (self.add_complainant_name_entry, "Required!"),
+                "accused_name": (self.add_accused_name_entry, "Required!"),
+                "fir_date": (self.add_fir_date_entry, "Invalid Date!"),
+                "reason": (self.add_reason_entry, "Required!"),
+                "sections": (self.add_sections_entry, "Invalid Section!"),
+            }[field]
+            if field == "sections":
+                message += " Please enter valid sections from the predefined list."
+            self.update_output(self.add_output_area, message, 'red')
+            self.show_temp_message(entry_widget, temp_message, 'red')
             return
 
-        sections = [s.strip() for s in sections_str.split(',') if s.strip()]
-        for section in sections:
-            if section not in laws:
-                self.update_output(self.add_output_area, f"Invalid Law Section: {section}. Please enter valid sections from the predefined list.", 'red')
-                self.show_temp_message(self.add_sections_entry, f"Invalid Section: {section}!", 'red')
-                return
-
-        operation_type = "registered"
-        existing_fir_index = -1
-        # If FIR number is provided, check if it exists for update
-        if fir_num and is_valid_fir_number(fir_num):
-            if cnic in fir_data:
-                for i, fir in enumerate(fir_data[cnic]):
-                    if fir.get('fir_number') == fir_num:
-                        existing_fir_index = i
-                        operation_type = "updated"
-                        break
-            if existing_fir_index == -1: # FIR number provided but not found for this CNIC
-                self.update_output(self.add_output_area, f"FIR Number '{fir_num}' not found for CNIC '{cnic}'. A new FIR will be registered.", 'orange')
-                fir_num = generate_fir_number() # Generate new if not found
-                operation_type = "registered"
-        else:
-            fir_num = generate_fir_number() # Auto-generate for new FIR
-
-        new_fir_entry = {
-            "fir_number": fir_num,
-            "complainant_name": complainant_name,
-            "complainant_father_name": complainant_father_name,
-            "accused_name": accused_name,
-            "accused_father_name": accused_father_name,
-            "cnic": cnic,
-            "reason": reason,
-            "fir_date": fir_date,
-            "sections": sections,
-            "bail_status": bail_status,
-            "punishment": punishment
-        }
+        self.jobs.submit(fir_service.save_fir, fir_input,
+                         on_done=self._on_fir_saved, on_error=self._job_failed(self.add_output_area))
 
-        if cnic not in fir_data:
-            fir_data[cnic] = []
-
-        if existing_fir_index != -1:
-            fir_data[cnic][existing_fir_index] = new_fir_entry
+    def _on_fir_saved(self, result):
+        cnic, fir_num = result.cnic, result.fir_number
+        if result.notice:
+            self.update_output(self.add_output_area, result.notice, 'orange')
+        if result.operation == "updated":
             self.update_output(self.add_output_area, f"FIR '{fir_num}' for CNIC '{cnic}' successfully updated!", 'green')
             self.show_temp_message(self.add_update_button, "FIR Updated!", 'green')
         else:
-            fir_data[cnic].append(new_fir_entry)
             self.update_output(self.add_output_area, f"New FIR '{fir_num}' for CNIC '{cnic}' successfully registered!", 'green')
             self.show_temp_message(self.add_update_button, "FIR Registered!", 'green')
 
-        save_fir_data(fir_data)
         self.clear_add_fields_gui(keep_cnic=True) # Keep CNIC for possible rapid entry
 
     def delete_fir_gui(self):
@@ -697,80 +753,194 @@ class FIRApp:
             self.show_temp_message(self.search_fir_num_entry, "Invalid FIR Number!", 'red')
             return
 
-        if cnic_to_delete in fir_data:
-            initial_count = len(fir_data[cnic_to_delete])
-            fir_data[cnic_to_delete] = [
-                fir for fir in fir_data[cnic_to_delete]
-                if fir.get('fir_number') != fir_num_to_delete
-            ]
-            if len(fir_data[cnic_to_delete]) < initial_count:
-                if not fir_data[cnic_to_delete]: # If no FIRs left for this CNIC, remove the CNIC entry
-                    del fir_data[cnic_to_delete]
-                save_fir_data(fir_data)
-                self.update_output(self.output_area_search, f"FIR '{fir_num_to_delete}' for CNIC '{cnic_to_delete}' successfully deleted.", 'green')
-                self.show_temp_message(self.delete_fir_button, "FIR Deleted!", 'green')
-                self.clear_search_fields_gui() # Clear fields after successful deletion
-            else:
-                self.update_output(self.output_area_search, f"FIR '{fir_num_to_delete}' not found for CNIC '{cnic_to_delete}'.", 'crimson')
+        self.jobs.submit(fir_service.delete_fir, cnic_to_delete, fir_num_to_delete,
+                         on_done=self._on_fir_deleted, on_error=self._job_failed(self.output_area_search))
+
+    def _on_fir_deleted(self, result):
+        status, cnic_to_delete, fir_num_to_delete = result.status, result.cnic, result.fir_number
+        if status == "deleted":
+            self.update_output(self.output_area_search, f"FIR '{fir_num_to_delete}' for CNIC '{cnic_to_delete}' successfully deleted.", 'green')
+            self.show_temp_message(self.delete_fir_button, "FIR Deleted!", 'green')
+            self.clear_search_fields_gui() # Clear fields after successful deletion
+        elif status == "not_found":
+            self.update_output(self.output_area_search, f"FIR '{fir_num_to_delete}' not found for CNIC '{cnic_to_delete}'.", 'crimson')
         else:
             self.update_output(self.output_area_search, f"No FIRs found for CNIC '{cnic_to_delete}'.", 'crimson')
 
     def view_all_firs(self):
+        self.jobs.submit(fir_service.count, on_done=self._start_view_all, on_error=self._job_failed(self.output_area_search),
+                         lane='search', supersede='search')
+
+    def _start_view_all(self, total):
+        self._last_search_criteria = None # The search results are replaced
         self.update_output(self.output_area_search, "", append=False) # Clear previous results
-        if not fir_data:
+        # total comes from the backend's metadata, not from rendering
+        if not total:
             self.update_output(self.output_area_search, "No FIRs currently registered in the system.", 'crimson')
             return
 
         self.update_output(self.output_area_search, "--- All Registered FIRs ---", False, 'header')
-        fir_count = 0
-        for cnic, fir_list in fir_data.items():
-            for fir in fir_list:
-                fir_count += 1
-                self.update_output(self.output_area_search, f"\n--- FIR Details {fir_count} ---", True, 'darkred', 'header')
-                self.update_output(self.output_area_search, f"FIR Number: ", True, font_tag='fir_detail_label')
-                self.update_output(self.output_area_search, f"{fir.get('fir_number', 'N/A')}", True, font_tag='fir_detail_value')
-
-                self.update_output(self.output_area_search, f"\n--- Complainant Details ---", True, 'complainant_section_header')
-                self.update_output(self.output_area_search, f"Name: ", True, font_tag='fir_detail_label')
-                self.update_output(self.output_area_search, f"{fir.get('complainant_name', 'N/A')}", True, font_tag='fir_detail_value')
-                self.update_output(self.output_area_search, f"Father's Name: ", True, font_tag='fir_detail_label')
-                self.update_output(self.output_area_search, f"{fir.get('complainant_father_name', 'N/A')}", True, font_tag='fir_detail_value')
-
-                self.update_output(self.output_area_search, f"\n--- Accused Details ---", True, 'accused_section_header')
-                self.update_output(self.output_area_search, f"CNIC: ", True, font_tag='fir_detail_label')
-                self.update_output(self.output_area_search, f"{fir.get('cnic', 'N/A')}", True, font_tag='fir_detail_value')
-                self.update_output(self.output_area_search, f"Name: ", True, font_tag='fir_detail_label')
-                self.update_output(self.output_area_search, f"{fir.get('accused_name', 'N/A')}", True, font_tag='fir_detail_value')
-                self.update_output(self.output_area_search, f"Father's Name: ", True, font_tag='fir_detail_label')
-                self.update_output(self.output_area_search, f"{fir.get('accused_father_name', 'N/A')}", True, font_tag='fir_detail_value')
-
-                self.update_output(self.output_area_search, f"\n--- Case Details ---", True, 'darkred', 'header')
-                self.update_output(self.output_area_search, f"Date: ", True, font_tag='fir_detail_label')
-                self.update_output(self.output_area_search, f"{fir.get('fir_date', 'N/A')}", True, font_tag='fir_detail_value')
-                self.update_output(self.output_area_search, f"Reason: ", True, font_tag='fir_detail_label')
-                self.update_output(self.output_area_search, f"{fir.get('reason', 'N/A')}", True, font_tag='fir_detail_value')
-                self.update_output(self.output_area_search, f"Bail Status: ", True, font_tag='fir_detail_label')
-                self.update_output(self.output_area_search, f"{fir.get('bail_status', 'N/A')}", True, font_tag='fir_detail_value')
-                self.update_output(self.output_area_search, f"Punishment: ", True, font_tag='fir_detail_label')
-                self.update_output(self.output_area_search, f"{fir.get('punishment', 'N/A')}", True, font_tag='fir_detail_value')
-
-                sections_applied = fir.get('sections', [])
-                if sections_applied:
-                    self.update_output(self.output_area_search, f"Applied Sections:", True, font_tag='fir_detail_label')
-                    for section in sections_applied:
-                        law_info = laws.get(section, {})
-                        title = law_info.get('title', 'Unknown Title')
-                        act = law_info.get('act', 'Unknown Act')
-                        punishment_info = law_info.get('punishment', 'N/A')
-                        self.update_output(self.output_area_search, f"  - {section} ({act}): {title} (Punishment: {punishment_info})", True, font_tag='section_info')
-                else:
-                    self.update_output(self.output_area_search, f"Applied Sections: N/A", True, font_tag='fir_detail_value')
-                self.update_output(self.output_area_search, "\n" + "="*70 + "\n", True, 'gray') # Stronger separator between FIRs
-
-        self.update_output(self.output_area_search, f"\nTotal FIRs: {fir_count}", True, 'green', 'header')
+        self.update_output(self.output_area_search, f"Total FIRs: {total}", True, 'green', 'header')
+        self._view_all_cursor = None
+        self._view_all_more = True
+        self._view_all_rendered = 0
+        self._view_all_total = total
+        self._request_view_all_page()
+
+    def _on_search_output_scroll(self, first, last):
+        self.output_area_search.vbar.set(first, last)
+        # Fetch the next page once the user scrolls close to the end of what is rendered
+        if self._view_all_more and not self._view_all_pending and float(last) > 0.9:
+            self._request_view_all_page()
+
+    def _request_view_all_page(self):
+        self._view_all_pending = True
+        self.jobs.submit(fir_service.list_firs, self._view_all_cursor, VIEW_ALL_PAGE_SIZE,
+                         on_done=self._render_view_all_page, on_error=self._job_failed(self.output_area_search),
+                         lane='search', supersede='search')
+
+    def _stop_view_all_paging(self):
+        self._view_all_more = False
+        self._view_all_pending = False
+        self._view_all_cursor = None
+
+    def _render_view_all_page(self, page):
+        if not self._view_all_more:
+            return # Paging was stopped while this page was being fetched
+        firs, self._view_all_cursor = page.firs, page.next_cursor
+        self._view_all_pending = False
+        self._view_all_more = self._view_all_cursor is not None
+        first_page = self._view_all_rendered == 0
+
+        segments = []
+        for fir in firs:
+            self._view_all_rendered += 1
+            segments.extend(self._fir_detail_segments(fir, self._view_all_rendered, "\n" + "="*70 + "\n")) # Stronger separator between FIRs
+        if self._view_all_more:
+            segments.append((f"Showing {self._view_all_rendered} of {self._view_all_total} FIRs. Scroll down to load more...\n", ('more_hint',)))
+        else:
+            segments.append((f"\nTotal FIRs: {self._view_all_rendered}\n", ('green', 'header')))
+
+        hint = self.output_area_search.tag_ranges('more_hint')
+        if hint:
+            self.output_area_search.config(state='normal')
+            self.output_area_search.delete(hint[0], hint[-1])
+        self.render_segments(self.output_area_search, segments, append=True, scroll=False)
+        if first_page:
+            self.output_area_search.yview_moveto(0)
+
+
+    # --- Statistics Panel ---
+    def show_stats_gui(self):
+        """Opens (or refreshes) the statistics window; the counters are read, not recomputed."""
+        if self.stats_window is None or not self.stats_window.winfo_exists():
+            self.stats_window = tk.Toplevel(self.master)
+            self.stats_window.title("FIR Statistics")
+            self.stats_window.geometry("600x700")
+            buttons = ttk.Frame(self.stats_window, padding="10 10 10 0")
+            buttons.pack(fill="x")
+            ttk.Button(buttons, text="Refresh", command=self.show_stats_gui, style='Blue.TButton').pack(side="left")
+            ttk.Button(buttons, text="Export...", command=self.export_stats_gui, style='Green.TButton').pack(side="left", padx=10)
+            self.stats_output = scrolledtext.ScrolledText(self.stats_window, wrap=tk.WORD, state='disabled', relief=tk.FLAT, bd=1,
+                                                          background='white', foreground='#333333', font=('Arial', 12))
+            self.stats_output.pack(fill="both", expand=True, padx=10, pady=10)
+            self.stats_output.tag_configure('header', font=('Arial', 14, 'bold'), foreground='#0056b3')
+            self.stats_output.tag_configure('fir_detail_label', font=('Arial', 12, 'bold'), foreground='#4682B4')
+        self.stats_window.lift()
+        self.jobs.submit(fir_service.stats, on_done=self._show_stats, on_error=self._job_failed(self.stats_output),
+                         lane='search')
+
+    def _show_stats(self, summary):
+        if self.stats_window is None or not self.stats_window.winfo_exists():
+            return # Closed while the counters were being read
+        self._stats_summary = summary
+        segments = [("--- FIR Statistics ---\n", ('header',)),
+                    (f"Total FIRs: {summary['total_firs']}\n"
+                     f"Accused CNICs: {summary['distinct_cnics']} ({summary['repeat_offender_cnics']} with more than one FIR)\n", ())]
+        groups = [("FIRs per Act", 'by_act'), ("FIRs per Bail Status", 'by_bail_status'),
+                  ("FIRs per Punishment", 'by_punishment'), ("FIRs per Month", 'by_month'),
+                  ("Top Repeat Offenders (CNIC)", 'top_repeat_offenders'), ("FIRs per Section", 'by_section')]
+        for title, group in groups:
+            segments.append((f"\n{title}\n", ('fir_detail_label',)))
+            for value, count in summary[group].items():
+                label = f"{value} ({laws[value]['title']})" if group == 'by_section' and value in laws else value
+                segments.append((f"  {label}: {count}\n", ()))
+        self.render_segments(self.stats_output, segments, scroll=False)
+
+    def export_stats_gui(self):
+        if self._stats_summary is None:
+            return
+        path = filedialog.asksaveasfilename(parent=self.stats_window, title="Export FIR Statistics", defaultextension=".csv",
+                                            filetypes=[("CSV", "*.csv"), ("JSON", "*.json")])
+        if path:
+            self.jobs.submit(export_stats, self._stats_summary, path,
+                             on_done=lambda _: messagebox.showinfo("FIR Statistics", f"Statistics exported to {path}", parent=self.stats_window),
+                             on_error=self._job_failed(self.stats_output))
+
+    # --- Debug Panel ---
+    def show_debug_gui(self):
+        """Opens (or refreshes) the window showing operation timings, counters and the last profile."""
+        if self.debug_window is None or not self.debug_window.winfo_exists():
+            self.debug_window = tk.Toplevel(self.master)
+            self.debug_window.title("Performance Metrics")
+            self.debug_window.geometry("900x700")
+            buttons = ttk.Frame(self.debug_window, padding="10 10 10 0")
+            buttons.pack(fill="x")
+            ttk.Button(buttons, text="Refresh", command=self.show_debug_gui, style='Blue.TButton').pack(side="left")
+            ttk.Button(buttons, text="Reset", command=self.reset_metrics_gui, style='Orange.TButton').pack(side="left", padx=10)
+            self.profile_button = ttk.Button(buttons, command=self.toggle_profiling_gui, style='Purple.TButton')
+            self.profile_button.pack(side="left")
+            ttk.Button(buttons, text="Dump JSON...", command=self.dump_metrics_gui, style='Green.TButton').pack(side="left", padx=10)
+            self.debug_output = scrolledtext.ScrolledText(self.debug_window, wrap=tk.NONE, state='disabled', relief=tk.FLAT, bd=1,
+                                                          background='white', foreground='#333333', font=('Courier New', 10))
+            self.debug_output.pack(fill="both", expand=True, padx=10, pady=10)
+            self.debug_output.tag_configure('header', font=('Arial', 14, 'bold'), foreground='#0056b3')
+        self.debug_window.lift()
+        self.profile_button.config(text="Stop Profiling" if metrics.profiling else "Start Profiling")
+        snapshot = metrics.snapshot()
+        segments = [(f"--- Operation Timings since {snapshot['since']} (ms) ---\n", ('header',)),
+                    (f"{'operation':24}{'calls':>8}{'mean':>11}{'p50':>11}{'p95':>11}{'p99':>11}{'max':>11}\n", ())]
+        for name, timing in snapshot['timings'].items():
+            segments.append((f"{name:24}{timing['count']:>8}{timing['mean_ms']:>11.3f}{timing['p50_ms']:>11.3f}"
+                             f"{timing['p95_ms']:>11.3f}{timing['p99_ms']:>11.3f}{timing['max_ms']:>11.3f}\n", ()))
+        segments.append(("\n--- Counters ---\n", ('header',)))
+        segments.extend((f"{name:40}{value:>14}\n", ()) for name, value in snapshot['counters'].items())
+        report = snapshot['last_profile']
+        if report:
+            segments.append((f"\n--- Last Profile ({report['profiled_blocks']} operations) ---\n", ('header',)))
+            segments.append((report['functions'], ()))
+            memory = report['memory']
+            if memory:
+                segments.append((f"\nMemory: {memory['current_kb']} KiB traced at the end, {memory['peak_kb']} KiB at peak\n", ()))
+                segments.extend((f"  {line}\n", ()) for line in memory['top_allocations'])
+        self.render_segments(self.debug_output, segments, scroll=False)
+
+    def reset_metrics_gui(self):
+        metrics.reset()
+        self.show_debug_gui()
+
+    def toggle_profiling_gui(self):
+        if metrics.profiling:
+            # Summarizing the allocations can take a moment on a large heap
+            self.jobs.submit(metrics.stop_profiling, on_done=lambda _: self.show_debug_gui(),
+                             on_error=self._job_failed(self.debug_output), lane='search')
+        else:
+            metrics.start_profiling()
+            self.show_debug_gui()
 
+    def dump_metrics_gui(self):
+        path = filedialog.asksaveasfilename(parent=self.debug_window, title="Dump Performance Metrics", defaultextension=".json",
+                                            filetypes=[("JSON", "*.json")])
+        if path:
+            self.jobs.submit(metrics.dump, path,
+                             on_done=lambda _: messagebox.showinfo("Performance Metrics", f"Metrics written to {path}", parent=self.debug_window),
+                             on_error=self._job_failed(self.debug_output))
 
     def clear_search_fields_gui(self):
+        if self._live_search_after is not None:
+            self.master.after_cancel(self._live_search_after)
+            self._live_search_after = None
+        self._last_search_criteria = None
         self.search_cnic_entry.delete(0, tk.END)
         self._set_placeholder(self.search_cnic_entry, self.search_cnic_placeholder)
         self.search_fir_num_entry.delete(0, tk.END)
@@ -779,6 +949,18 @@ class FIRApp:
         self._set_placeholder(self.search_accused_name_entry, self.search_accused_name_placeholder)
         self.search_accused_father_entry.delete(0, tk.END)
         self._set_placeholder(self.search_accused_father_entry, self.search_accused_father_placeholder)
+        self.search_complainant_name_entry.delete(0, tk.END)
+        self._set_placeholder(self.search_complainant_name_entry, self.search_complainant_name_placeholder)
+        self.search_complainant_father_entry.delete(0, tk.END)
+        self._set_placeholder(self.search_complainant_father_entry, self.search_complainant_father_placeholder)
+        self.search_section_entry.delete(0, tk.END)
+        self._set_placeholder(self.search_section_entry, self.search_section_placeholder)
+        self.search_act_combobox.set("")
+        self.search_bail_status_combobox.set("")
+        self.search_date_from_entry.delete(0, tk.END)
+        self._set_placeholder(self.search_date_from_entry, self.search_date_from_placeholder)
+        self.search_date_to_entry.delete(0, tk.END)
+        self._set_placeholder(self.search_date_to_entry, self.search_date_to_placeholder)
         self.update_output(self.output_area_search, "")
 
     def clear_add_fields_gui(self, keep_cnic=False):
@@ -808,6 +990,7 @@ class FIRApp:
 
 # --- Run the Application ---
 if __name__ == "__main__":
+    configure_logging(LOG_LEVEL, LOG_FILE, LOG_MAX_BYTES, LOG_BACKUPS)
     root = tk.Tk()
     app = FIRApp(root)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,24 @@
+import pytest
+
+from fir_backends import JsonFileBackend, SQLiteBackend
+
+# --- Shared Test Fixtures ---
+
+def _open_backend(name, directory):
+    if name == 'sqlite':
+        return SQLiteBackend(str(directory / 'fir_data.db'))
+    return JsonFileBackend(str(directory / 'fir_data.json'), str(directory / 'fir_data.journal'),
+                           str(directory / 'fir_sequence.json'))
+
+@pytest.fixture(scope='session')
+def open_backend():
+    """open_backend(name, directory) creates a backend ('json' or 'sqlite') over files in directory."""
+    return _open_backend
+
+@pytest.fixture(params=['json', 'sqlite'])
+def backend(request, tmp_path):
+    """A loaded, empty backend; tests using it run once per backend."""
+    store = _open_backend(request.param, tmp_path)
+    store.load()
+    yield store
+    store.close()
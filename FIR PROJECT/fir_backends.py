@@ -0,0 +1,835 @@
+import argparse
+import contextlib
+import functools
+import json
+import os
+import queue
+import sqlite3
+import threading
+
+from fir_fuzzy import NAME_FIELDS, TokenMatcher, combine_costs, name_tokens
+from fir_index import FIR_NUMBER_PARTS, PERIOD_LENGTHS, FIRIndex, FIRSequence, format_fir_number
+from fir_laws import laws
+from fir_logging import add_logging_arguments, configure_logging, get_logger
+from fir_metrics import metrics
+from fir_records import FIR_FIELDS, compact_record, fir_object_hook
+from fir_stats import FIRStats
+from fir_storage import (FileLock, append_journal_records, apply_journal_record, file_size, file_stamp, iter_snapshot,
+                         journal_delete_record, journal_put_record, quarantine_file, read_journal_tail, replay_journal,
+                         rotate_journal, snapshot_generations, write_snapshot)
+
+log = get_logger(__name__)
+
+def synchronized(method):
+    """Runs a backend method while holding the backend's lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+# --- Storage Backends ---
+# Every backend offers the same surface to the GUI:
+#   load(), save(), close()
+#   put_fir(cnic, fir_entry) -> 'registered' | 'updated', put_many([(cnic, fir_entry), ...])
+#   delete_fir(cnic, fir_number) -> bool, get_fir(cnic, fir_number), get_firs(cnic)
+#   search(cnic, fir_number, accused_name, accused_father_name, section=, act=, bail_status=,
+#          date_from=, date_to=, complainant_name=, complainant_father_name=, fuzzy=) -> [fir_entry, ...]
+#   fetch_page(cursor, limit) -> ([fir_entry, ...], next_cursor), iter_firs()
+#   date_counts(period, date_from, date_to) -> {'2024-01': count, ...} (period: 'day', 'month' or 'year')
+#   fir_stats(top) -> FIRStats.summary(top), from counters kept up to date on every change
+#   count() (from metadata, without touching the records), next_fir_number(year, district_code)
+#   reserve_fir_numbers(year, district_code, count) -> [fir_number, ...]
+#   bulk_load(), a context manager wrapped around large imports
+#   refresh() -> True if changes other processes made to the shared files were merged in
+# Backends may be used from several threads; every public method holds the backend's lock
+# (SQLiteBackend reads may instead run on a pool of read-only connections).
+
+class JsonFileBackend:
+    """Keeps all FIRs in memory, persisted as fir_data.json plus an append-only change journal."""
+
+    name = 'json'
+
+    def __init__(self, data_file, journal_file, sequence_file, mode='journal',
+                 compaction_threshold=1000, generations=3, compact_records=False, snapshot_format='compact'):
+        self.data_file = data_file
+        self.journal_file = journal_file
+        self.sequence_file = sequence_file
+        self.mode = mode                      # 'journal' or 'snapshot'
+        self.compaction_threshold = compaction_threshold
+        self.generations = generations
+        self.compact_records = compact_records  # Hold FIRs as read-only FIRRecords (fir_records.py) instead of dicts
+        self.snapshot_format = snapshot_format  # How snapshots are written (fir_storage.SNAPSHOT_FORMATS); any is loaded
+        self.data = {}                        # CNIC -> list of FIR entries
+        self.index = FIRIndex()
+        self.sequence = FIRSequence()
+        self.journal_record_count = 0         # Journal records not yet folded into the snapshot
+        self.bulk_loads = 0                   # Open bulk_load() contexts; compaction waits for them
+        self.recovery_failed = False          # Set when snapshots exist but none of them could be read
+        self.lock = threading.RLock()
+        # Other processes may share the files: changes are made holding file_lock, after merging
+        # in theirs. What this process has seen of the files so far:
+        self.file_lock = FileLock(data_file + '.lock')
+        self.snapshot_stamp = None            # file_stamp() of the data file
+        self.journal_offset = 0               # End of the last journal record applied
+
+    def load(self, on_progress=None):
+        """Streams in the newest intact snapshot, then replays the journals kept since it on top of it.
+
+        The lock is taken once per batch of CNICs rather than for the whole load, so other
+        threads can already search the FIRs loaded so far. on_progress(bytes_read, total_bytes,
+        fir_count) is called after every batch. Other processes can't change the files meanwhile.
+        """
+        with self.file_lock:
+            with self.lock:
+                self.data = {}
+                self.index = FIRIndex()
+                self.sequence = FIRSequence.load(self.sequence_file) # Raised further by every FIR loaded
+            generation = self._load_snapshot(on_progress)
+            with self.lock:
+                self.journal_record_count = (self._replay_kept_journals(generation) +
+                                             replay_journal(self.journal_file, self.data, self._replay_record))
+                self.snapshot_stamp = file_stamp(self.data_file)
+                self.journal_offset = file_size(self.journal_file)
+        if self.journal_record_count:
+            log.info("Replayed %s journal records from %s.", self.journal_record_count, self.journal_file)
+        return self.data
+
+    # --- Changes made by other processes ---
+    def refresh(self):
+        """Merges in the changes other processes made to the files since this one last looked.
+
+        Returns True if there were any. Costs two stat() calls when nothing changed; otherwise
+        only the journal records appended since are read, unless another process compacted the
+        journal into a new snapshot, which is then loaded in full.
+        """
+        if file_stamp(self.data_file) == self.snapshot_stamp and file_size(self.journal_file) == self.journal_offset:
+            return False
+        with self.lock, self.file_lock:
+            merged = self._merge_external_changes()
+        if merged is None:
+            log.info("Reloaded %s, rewritten by another process.", self.data_file)
+        elif merged:
+            log.info("Merged %s changes made by another process.", merged)
+        return merged != 0
+
+    def _merge_external_changes(self):
+        """Applies the changes other processes made to the files; needs both self.lock and self.file_lock.
+
+        Returns the number of journal records applied, or None if everything was reloaded.
+        """
+        if file_stamp(self.data_file) != self.snapshot_stamp or file_size(self.journal_file) < self.journal_offset:
+            self._reload()
+            return None
+        records, self.journal_offset = read_journal_tail(self.journal_file, self.journal_offset)
+        for record in records:
+            try:
+                self._replay_record(self.data, record)
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                log.warning("Skipping corrupt record in %s: %s", self.journal_file, e)
+        self.journal_record_count += len(records)
+        return len(records)
+
+    def _save_sequence(self):
+        """Saves changed FIR number counters, keeping numbers other processes allocated but haven't used yet."""
+        if self.sequence.dirty:
+            self.sequence.merge(FIRSequence.load(self.sequence_file))
+            self.sequence.save(self.sequence_file)
+
+    def _reload(self):
+        """Replaces the data with a fresh load of the files, which another process rewrote."""
+        fresh = JsonFileBackend(self.data_file, self.journal_file, self.sequence_file, self.mode,
+                                self.compaction_threshold, self.generations, self.compact_records, self.snapshot_format)
+        fresh.file_lock = self.file_lock # Held by this thread already
+        fresh.load()
+        fresh.sequence.merge(self.sequence)
+        self.data, self.index, self.sequence = fresh.data, fresh.index, fresh.sequence
+        self.journal_record_count, self.snapshot_stamp, self.journal_offset = (
+            fresh.journal_record_count, fresh.snapshot_stamp, fresh.journal_offset)
+        self.recovery_failed = fresh.recovery_failed
+
+    @contextlib.contextmanager
+    def _shared_change(self):
+        """Holds the locks around a change, after bringing the data up to date with other processes' changes."""
+        with self.lock, self.file_lock:
+            self._merge_external_changes()
+            yield
+
+    def _load_snapshot(self, on_progress):
+        """Loads the newest intact snapshot; returns its generation (0: the data file), or None if there was none."""
+        failures = 0
+        for generation, path in enumerate(snapshot_generations(self.data_file, self.generations)):
+            if not os.path.exists(path):
+                continue
+            try:
+                self._stream_snapshot(path, on_progress)
+            except (ValueError, OSError) as e:
+                log.warning("Skipping damaged snapshot %s: %s", path, e)
+                failures += 1
+                with self.lock: # Drop whatever was loaded before the damage was found
+                    self.data = {}
+                    self.index = FIRIndex()
+                continue
+            log.info("Loaded %s FIRs across %s CNIC entries from %s.", len(self.index), len(self.data), path)
+            if path != self.data_file and os.path.exists(self.data_file):
+                # Don't let the damaged file be rotated in as the newest previous generation.
+                quarantined = quarantine_file(self.data_file)
+                log.warning("Damaged %s moved to %s.", self.data_file, quarantined)
+            return generation
+        if failures:
+            # Nothing usable survived: keep the damaged file out of the way of the next save.
+            self.recovery_failed = True
+            if os.path.exists(self.data_file):
+                quarantined = quarantine_file(self.data_file)
+                log.error("No intact snapshot found. Damaged %s moved to %s. Starting with empty data.", self.data_file, quarantined)
+            return
+        log.warning("%s not found. Starting with empty data.", self.data_file)
+
+    def _replay_kept_journals(self, generation):
+        """Replays the journals kept since snapshot generation n (see fir_storage.py); returns the records applied."""
+        applied = 0
+        for n in range(generation or 0, 0, -1):
+            kept = f"{self.journal_file}.{n}"
+            if not os.path.exists(kept):
+                log.warning("%s not found: changes saved between %s.%s and the next newer snapshot may be missing.",
+                            kept, self.data_file, n)
+                continue
+            applied += replay_journal(kept, self.data, self._replay_record)
+        if generation:
+            log.warning("Recovered from %s.%s: replayed %s records from the journals kept since it.",
+                        self.data_file, generation, applied)
+        return applied
+
+    def _stream_snapshot(self, path, on_progress, batch_size=1000):
+        total_bytes = os.path.getsize(path)
+        batch = []
+        for cnic, fir_list, bytes_read in iter_snapshot(path, fir_object_hook if self.compact_records else None):
+            batch.append((cnic, fir_list))
+            if len(batch) >= batch_size:
+                self._add_loaded(batch)
+                batch = []
+                if on_progress:
+                    on_progress(bytes_read, total_bytes, len(self.index))
+        self._add_loaded(batch)
+        if on_progress:
+            on_progress(total_bytes, total_bytes, len(self.index))
+
+    @synchronized
+    def _add_loaded(self, entries):
+        """Adds a batch of freshly parsed CNIC entries to the data and the indexes."""
+        for cnic, fir_list in entries:
+            for fir_detail in self.data.get(cnic, ()): # A repeated CNIC key replaces the earlier entry
+                self.index.remove(cnic, fir_detail.get('fir_number', ''))
+            self.data[cnic] = fir_list
+            for fir_detail in fir_list:
+                self.index.add(cnic, fir_detail)
+                self.sequence.observe(fir_detail.get('fir_number', ''))
+
+    def _replay_record(self, data, record):
+        """Applies a replayed journal record to the data and the indexes."""
+        if record.get("op") == "put":
+            self._apply_put(record["cnic"], record["fir"])
+        else:
+            apply_journal_record(data, record)
+            self.index.remove(record.get("cnic"), record.get("fir_number"))
+
+    @synchronized
+    def save(self):
+        """Saves a full snapshot and empties the journal, whose changes it now contains.
+
+        The journal's records are kept alongside the older snapshot generations, for loads
+        that have to fall back to one of them.
+        """
+        try:
+            with self._shared_change():
+                self._save_sequence()
+                snapshot_rotated = self.generations > 0 and os.path.exists(self.data_file)
+                with metrics.timed('snapshot_write') as counts:
+                    counts['bytes'] = write_snapshot(self.data_file, self.data, self.generations, self.snapshot_format)
+                rotate_journal(self.journal_file, self.generations, snapshot_rotated)
+                self.journal_record_count = 0
+                self.snapshot_stamp = file_stamp(self.data_file)
+                self.journal_offset = 0
+            log.info("Data successfully saved to %s.", self.data_file)
+        except Exception as e:
+            log.error("Error saving data to %s: %s", self.data_file, e)
+
+    @synchronized
+    def close(self):
+        pass
+
+    def _persist(self, records):
+        """Persists applied changes, either as one journal append or as a full snapshot.
+
+        Called inside _shared_change(), so the files haven't changed since the changes were applied.
+        """
+        try:
+            self._save_sequence() # Persist allocated FIR numbers before the FIRs themselves
+        except Exception as e:
+            log.error("Error saving FIR sequence to %s: %s", self.sequence_file, e)
+        if self.mode != 'journal':
+            self.save()
+            return
+        try:
+            with metrics.timed('journal_append') as counts:
+                counts.update(bytes=append_journal_records(self.journal_file, records), records=len(records))
+            self.journal_record_count += len(records)
+            self.journal_offset = file_size(self.journal_file) # Nobody else appends while we hold the file lock
+        except Exception as e:
+            log.error("Error appending to %s: %s. Saving a full snapshot instead.", self.journal_file, e)
+            self.save()
+            return
+        if self.journal_record_count >= self.compaction_threshold and not self.bulk_loads:
+            log.info("Compacting %s journal records into %s.", self.journal_record_count, self.data_file)
+            self.save()
+
+    def _apply_put(self, cnic, fir_entry):
+        operation = "updated" if (cnic, fir_entry.get('fir_number', '')) in self.index.records else "registered"
+        if self.compact_records:
+            fir_entry = compact_record(fir_entry)
+        record = journal_put_record(cnic, fir_entry)
+        apply_journal_record(self.data, record)
+        self.index.add(cnic, fir_entry)
+        self.sequence.observe(fir_entry.get('fir_number', ''))
+        return operation, record
+
+    @synchronized
+    def put_fir(self, cnic, fir_entry):
+        """Registers a new FIR or replaces the one with the same number for this CNIC."""
+        with self._shared_change():
+            operation, record = self._apply_put(cnic, fir_entry)
+            self._persist([record])
+        return operation
+
+    @synchronized
+    def put_many(self, entries):
+        """Registers or updates a batch of (cnic, fir_entry) pairs with one persistence operation."""
+        with self._shared_change():
+            records = [self._apply_put(cnic, fir_entry)[1] for cnic, fir_entry in entries]
+            if records:
+                self._persist(records)
+        return len(records)
+
+    @synchronized
+    def delete_fir(self, cnic, fir_number):
+        """Deletes an FIR, returning False if this CNIC has no FIR with that number."""
+        with self._shared_change():
+            if (cnic, fir_number) not in self.index.records:
+                return False
+            record = journal_delete_record(cnic, fir_number)
+            apply_journal_record(self.data, record)
+            self.index.remove(cnic, fir_number)
+            self._persist([record])
+        return True
+
+    @synchronized
+    def get_fir(self, cnic, fir_number):
+        return self.index.records.get((cnic, fir_number))
+
+    @synchronized
+    def get_firs(self, cnic):
+        return list(self.data.get(cnic, []))
+
+    @synchronized
+    def search(self, cnic='', fir_number='', accused_name='', accused_father_name='', **criteria):
+        return self.index.search(cnic, fir_number, accused_name, accused_father_name, **criteria)
+
+    @synchronized
+    def fetch_page(self, cursor=None, limit=50):
+        """Returns (firs, next_cursor) for one page in registration order.
+
+        Pass next_cursor back in to get the following page; it is None after the last page.
+        The cursor is the insertion number of the last FIR returned (see FIRIndex.page), so
+        deletions between pages don't make later FIRs skip a page.
+        """
+        return self.index.page(cursor or 0, limit)
+
+    @synchronized
+    def date_counts(self, period='day', date_from='', date_to=''):
+        return self.index.by_date.counts(period, date_from, date_to)
+
+    @synchronized
+    def fir_stats(self, top=10):
+        return self.index.stats.summary(top)
+
+    def iter_firs(self):
+        with self.lock:
+            firs = [fir for fir_list in self.data.values() for fir in fir_list]
+        yield from firs
+
+    @synchronized
+    def count(self):
+        return len(self.index)
+
+    @synchronized
+    def next_fir_number(self, year, district_code):
+        return self.reserve_fir_numbers(year, district_code, 1)[0]
+
+    @synchronized
+    def reserve_fir_numbers(self, year, district_code, count):
+        """Allocates FIR numbers and saves the counters at once, so no other process hands them out too."""
+        with self._shared_change():
+            self.sequence.merge(FIRSequence.load(self.sequence_file))
+            first = self.sequence.reserve(year, district_code, count)
+            try:
+                self._save_sequence()
+            except Exception as e:
+                log.error("Error saving FIR sequence to %s: %s", self.sequence_file, e)
+        return [format_fir_number(year, district_code, seq) for seq in range(first, first + count)]
+
+    @contextlib.contextmanager
+    def bulk_load(self):
+        """Holds off journal compaction while batches are imported, then compacts once if due."""
+        with self.lock:
+            self.bulk_loads += 1
+        try:
+            yield self
+        finally:
+            with self.lock:
+                self.bulk_loads -= 1
+                if not self.bulk_loads and self.mode == 'journal' and self.journal_record_count >= self.compaction_threshold:
+                    log.info("Compacting %s journal records into %s.", self.journal_record_count, self.data_file)
+                    self.save()
+
+
+class SQLiteBackend:
+    """Keeps FIRs in an SQLite database (WAL mode), so queries run on indexes instead of in memory."""
+
+    name = 'sqlite'
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS firs (
+            id INTEGER PRIMARY KEY,
+            cnic TEXT NOT NULL,
+            fir_number TEXT NOT NULL,
+            complainant_name TEXT,
+            complainant_father_name TEXT,
+            accused_name TEXT,
+            accused_father_name TEXT,
+            reason TEXT,
+            fir_date TEXT,
+            sections TEXT NOT NULL DEFAULT '[]',  -- JSON list, in the order entered
+            bail_status TEXT,
+            punishment TEXT,
+            UNIQUE (cnic, fir_number)               -- also serves lookups by CNIC alone
+        );
+        CREATE INDEX IF NOT EXISTS idx_firs_fir_number ON firs (fir_number COLLATE NOCASE);
+        CREATE INDEX IF NOT EXISTS idx_firs_accused_name ON firs (accused_name COLLATE NOCASE);
+        CREATE INDEX IF NOT EXISTS idx_firs_accused_father_name ON firs (accused_father_name COLLATE NOCASE);
+        CREATE INDEX IF NOT EXISTS idx_firs_fir_date ON firs (fir_date);
+        CREATE INDEX IF NOT EXISTS idx_firs_bail_status ON firs (bail_status COLLATE NOCASE);
+        CREATE TABLE IF NOT EXISTS fir_sections (
+            fir_id INTEGER NOT NULL REFERENCES firs (id) ON DELETE CASCADE,
+            section TEXT NOT NULL,
+            PRIMARY KEY (section, fir_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_fir_sections_fir_id ON fir_sections (fir_id);
+        CREATE TABLE IF NOT EXISTS fir_name_words (
+            field TEXT NOT NULL,                    -- one of fir_fuzzy.NAME_FIELDS
+            word TEXT NOT NULL,                     -- lowercased word of that name
+            fir_id INTEGER NOT NULL REFERENCES firs (id) ON DELETE CASCADE,
+            PRIMARY KEY (field, word, fir_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_fir_name_words_fir_id ON fir_name_words (fir_id);
+        CREATE TABLE IF NOT EXISTS fir_sequences (
+            year INTEGER NOT NULL,
+            district_code TEXT NOT NULL,
+            last_seq INTEGER NOT NULL,
+            PRIMARY KEY (year, district_code)
+        );
+    """
+
+    # Trigram full-text index for substring search on names (needs SQLite 3.34+ with FTS5).
+    NAME_SEARCH_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS fir_names USING fts5 (
+            accused_name, accused_father_name, content='firs', content_rowid='id', tokenize='trigram'
+        );
+        CREATE TRIGGER IF NOT EXISTS firs_names_insert AFTER INSERT ON firs BEGIN
+            INSERT INTO fir_names (rowid, accused_name, accused_father_name)
+            VALUES (new.id, new.accused_name, new.accused_father_name);
+        END;
+        CREATE TRIGGER IF NOT EXISTS firs_names_delete AFTER DELETE ON firs BEGIN
+            INSERT INTO fir_names (fir_names, rowid, accused_name, accused_father_name)
+            VALUES ('delete', old.id, old.accused_name, old.accused_father_name);
+        END;
+        CREATE TRIGGER IF NOT EXISTS firs_names_update AFTER UPDATE ON firs BEGIN
+            INSERT INTO fir_names (fir_names, rowid, accused_name, accused_father_name)
+            VALUES ('delete', old.id, old.accused_name, old.accused_father_name);
+            INSERT INTO fir_names (rowid, accused_name, accused_father_name)
+            VALUES (new.id, new.accused_name, new.accused_father_name);
+        END;
+    """
+
+    def __init__(self, database_file, read_connections=0):
+        self.database_file = database_file
+        self.conn = None
+        self.read_connections = read_connections  # Extra connections for reads that don't need the lock
+        self.read_pool = None     # queue.Queue of those connections, once loaded
+        self.name_search = False  # True when the trigram name index is available
+        self.fir_count = 0        # Kept up to date on every change, so count() never scans
+        self.stats = None         # FIRStats, built on first use and then kept up to date like fir_count
+        self.name_words = None    # TokenMatcher over the distinct name words, built on the first fuzzy search
+        self.lock = threading.RLock()
+        self.recovery_failed = False
+        self.data_version = None  # PRAGMA data_version when this process last caught up with other processes' commits
+
+    @synchronized
+    def load(self, on_progress=None):
+        """Opens the database, creating the schema if needed (instant, so there is no progress to report)."""
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.database_file, check_same_thread=False) # Guarded by self.lock
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL") # Durable at checkpoints; WAL keeps the file consistent
+            self.conn.execute("PRAGMA foreign_keys=ON")
+            with self.conn:
+                self.conn.executescript(self.SCHEMA)
+            try:
+                with self.conn:
+                    self.conn.executescript(self.NAME_SEARCH_SCHEMA)
+                self.name_search = True
+            except sqlite3.OperationalError as e:
+                log.warning("Trigram name index unavailable (%s); name searches will scan.", e)
+            self.fir_count = self.conn.execute("SELECT COUNT(*) FROM firs").fetchone()[0]
+            self.data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+            if self.fir_count and self.conn.execute("SELECT 1 FROM fir_name_words LIMIT 1").fetchone() is None:
+                with self.conn: # Database from before fuzzy name search
+                    for row in self.conn.execute(f"SELECT id, {', '.join(NAME_FIELDS)} FROM firs").fetchall():
+                        self._index_name_words(row[0], dict(zip(NAME_FIELDS, row[1:])))
+            if self.read_connections:
+                self.read_pool = queue.Queue()
+                for _ in range(self.read_connections):
+                    conn = sqlite3.connect(self.database_file, check_same_thread=False) # Used by one thread at a time
+                    conn.execute("PRAGMA query_only=ON")
+                    self.read_pool.put(conn)
+            log.info("Opened %s with %s FIRs.", self.database_file, self.fir_count)
+
+    @synchronized
+    def refresh(self):
+        """Catches up with commits other processes made to the database; returns True if there were any.
+
+        SQLite already keeps concurrent writers apart; only the counters held in memory
+        (FIR count, statistics, fuzzy name words) need to be brought up to date.
+        """
+        data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self.data_version:
+            return False
+        self.data_version = data_version
+        self.fir_count = self.conn.execute("SELECT COUNT(*) FROM firs").fetchone()[0]
+        self.stats = None       # Rebuilt on next use
+        self.name_words = None
+        return True
+
+    @synchronized
+    def save(self):
+        """Every change is committed as it is made; this only checkpoints the WAL."""
+        self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    @synchronized
+    def close(self):
+        if self.read_pool is not None:
+            for _ in range(self.read_connections): # Waits for reads still running
+                self.read_pool.get().close()
+            self.read_pool = None
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    @contextlib.contextmanager
+    def _reader(self):
+        """Yields a connection to read with: a pooled one if there is a pool, otherwise the main one under the lock.
+
+        In WAL mode pooled readers see the last committed state and neither wait for the writer
+        nor for each other. Changes read through self.conn, so they also see their own
+        uncommitted rows.
+        """
+        pool = self.read_pool
+        if pool is None:
+            with self.lock:
+                yield self.conn
+            return
+        conn = pool.get()
+        try:
+            yield conn
+        finally:
+            pool.put(conn)
+
+    def _row_to_fir(self, row):
+        fir_entry = dict(zip(FIR_FIELDS, row))
+        fir_entry['sections'] = json.loads(fir_entry['sections'] or '[]')
+        return fir_entry
+
+    def _select(self, conn, where="", params=(), suffix=""):
+        columns = ", ".join(f"f.{field}" for field in FIR_FIELDS)
+        return conn.execute(f"SELECT {columns} FROM firs f {where} {suffix}", params)
+
+    def _observe_fir_number(self, fir_number):
+        match = FIR_NUMBER_PARTS.fullmatch(fir_number or '')
+        if match:
+            self.conn.execute("INSERT INTO fir_sequences (year, district_code, last_seq) VALUES (?, ?, ?) "
+                              "ON CONFLICT (year, district_code) DO UPDATE SET last_seq = MAX(last_seq, excluded.last_seq)",
+                              (int(match.group(1)), match.group(2), int(match.group(3))))
+
+    def _upsert(self, cnic, fir_entry):
+        values = {field: fir_entry.get(field, '') for field in FIR_FIELDS}
+        values['cnic'] = cnic
+        values['sections'] = json.dumps(list(fir_entry.get('sections', [])))
+        row = self.conn.execute("SELECT id FROM firs WHERE cnic = ? AND fir_number = ?",
+                                (cnic, values['fir_number'])).fetchone()
+        if self.stats is not None:
+            if row is not None:
+                self.stats.remove(cnic, self._get_fir(self.conn, cnic, values['fir_number']))
+            self.stats.add(cnic, fir_entry)
+        if row is None:
+            cursor = self.conn.execute(f"INSERT INTO firs ({', '.join(FIR_FIELDS)}) VALUES ({', '.join('?' * len(FIR_FIELDS))})",
+                                       [values[field] for field in FIR_FIELDS])
+            fir_id, operation = cursor.lastrowid, "registered"
+        else:
+            fir_id, operation = row[0], "updated"
+            updated = [field for field in FIR_FIELDS if field not in ('cnic', 'fir_number')]
+            self.conn.execute(f"UPDATE firs SET {', '.join(f'{field} = ?' for field in updated)} WHERE id = ?",
+                              [values[field] for field in updated] + [fir_id])
+            self.conn.execute("DELETE FROM fir_sections WHERE fir_id = ?", (fir_id,))
+        self.conn.executemany("INSERT OR IGNORE INTO fir_sections (fir_id, section) VALUES (?, ?)",
+                              [(fir_id, section) for section in fir_entry.get('sections', [])])
+        if operation == "updated":
+            self.conn.execute("DELETE FROM fir_name_words WHERE fir_id = ?", (fir_id,))
+        self._index_name_words(fir_id, fir_entry)
+        self._observe_fir_number(values['fir_number'])
+        return operation
+
+    def _index_name_words(self, fir_id, fir_entry):
+        rows = [(field, word, fir_id) for field in NAME_FIELDS for word in set(name_tokens(fir_entry.get(field)))]
+        self.conn.executemany("INSERT OR IGNORE INTO fir_name_words (field, word, fir_id) VALUES (?, ?, ?)", rows)
+        if self.name_words is not None:
+            for _, word, _ in rows:
+                self.name_words.add(word)
+
+    def _fuzzy_name_costs(self, conn, field, query):
+        """Returns {fir id: cost} for the FIRs whose field matches query approximately (see NameIndex.fuzzy_search)."""
+        costs_per_word = []
+        for query_word in name_tokens(query):
+            with self.lock: # The matcher changes with every write
+                if self.name_words is None:
+                    # Words of deleted FIRs stay in the matcher; they just don't match any FIR
+                    self.name_words = TokenMatcher()
+                    for (word,) in self.conn.execute("SELECT DISTINCT word FROM fir_name_words"):
+                        self.name_words.add(word)
+                similar = self.name_words.similar(query_word)
+            costs = {}
+            rows = conn.execute("SELECT fir_id, word FROM fir_name_words WHERE field = ? AND word IN (SELECT value FROM json_each(?))",
+                                     (field, json.dumps(list(similar))))
+            for fir_id, word in rows:
+                if similar[word] < costs.get(fir_id, similar[word] + 1):
+                    costs[fir_id] = similar[word]
+            costs_per_word.append(costs)
+        return combine_costs(costs_per_word)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """Commits on success; on failure rolls back and drops the statistics counters, which may be off now."""
+        try:
+            with self.conn:
+                yield
+        except BaseException:
+            self.stats = None # Rebuilt on next use
+            raise
+
+    @synchronized
+    def put_fir(self, cnic, fir_entry):
+        with self._transaction():
+            operation = self._upsert(cnic, fir_entry)
+        if operation == "registered":
+            self.fir_count += 1
+        return operation
+
+    @synchronized
+    def put_many(self, entries):
+        count = registered = 0
+        with self._transaction():
+            for cnic, fir_entry in entries:
+                if self._upsert(cnic, fir_entry) == "registered":
+                    registered += 1
+                count += 1
+        self.fir_count += registered
+        return count
+
+    @synchronized
+    def delete_fir(self, cnic, fir_number):
+        with self._transaction():
+            fir_detail = self._get_fir(self.conn, cnic, fir_number) if self.stats is not None else None
+            cursor = self.conn.execute("DELETE FROM firs WHERE cnic = ? AND fir_number = ?", (cnic, fir_number))
+            if fir_detail is not None:
+                self.stats.remove(cnic, fir_detail)
+        if cursor.rowcount > 0:
+            self.fir_count -= 1
+            return True
+        return False
+
+    def get_fir(self, cnic, fir_number):
+        with self._reader() as conn:
+            return self._get_fir(conn, cnic, fir_number)
+
+    def _get_fir(self, conn, cnic, fir_number):
+        row = self._select(conn, "WHERE f.cnic = ? AND f.fir_number = ?", (cnic, fir_number)).fetchone()
+        return self._row_to_fir(row) if row else None
+
+    def get_firs(self, cnic):
+        with self._reader() as conn:
+            return [self._row_to_fir(row) for row in self._select(conn, "WHERE f.cnic = ?", (cnic,), "ORDER BY f.id")]
+
+    def _name_clause(self, column, query, clauses, params):
+        if self.name_search and len(query) >= 3 and column in ('accused_name', 'accused_father_name'):
+            clauses.append(f"f.id IN (SELECT rowid FROM fir_names WHERE {column} LIKE ?)")
+        else:
+            clauses.append(f"f.{column} LIKE ?")
+        params.append(f"%{query}%")
+
+    def search(self, cnic='', fir_number='', accused_name='', accused_father_name='',
+               section='', act='', bail_status='', date_from='', date_to='',
+               complainant_name='', complainant_father_name='', fuzzy=False):
+        with self._reader() as conn:
+            return self._search(conn, cnic=cnic, fir_number=fir_number, accused_name=accused_name,
+                                accused_father_name=accused_father_name, section=section, act=act,
+                                bail_status=bail_status, date_from=date_from, date_to=date_to,
+                                complainant_name=complainant_name, complainant_father_name=complainant_father_name,
+                                fuzzy=fuzzy)
+
+    def _search(self, conn, cnic, fir_number, accused_name, accused_father_name, section, act, bail_status,
+                date_from, date_to, complainant_name, complainant_father_name, fuzzy):
+        clauses, params = [], []
+        if cnic:
+            clauses.append("f.cnic = ?")
+            params.append(cnic)
+        if fir_number:
+            clauses.append("f.fir_number = ? COLLATE NOCASE")
+            params.append(fir_number)
+        if section:
+            clauses.append("f.id IN (SELECT fir_id FROM fir_sections WHERE section = ?)")
+            params.append(section)
+        if act:
+            act_sections = [code for code, info in laws.items() if info['act'].lower() == act.lower()]
+            if not act_sections:
+                return []
+            clauses.append(f"f.id IN (SELECT fir_id FROM fir_sections WHERE section IN ({', '.join('?' * len(act_sections))}))")
+            params.extend(act_sections)
+        if bail_status:
+            clauses.append("f.bail_status = ? COLLATE NOCASE")
+            params.append(bail_status)
+        if date_from or date_to: # FIRs without a date never match
+            clauses.append("f.fir_date BETWEEN ? AND ?")
+            params.extend([date_from or '0000-00-00', date_to or '9999-99-99'])
+        name_queries = {'accused_name': accused_name, 'accused_father_name': accused_father_name,
+                        'complainant_name': complainant_name, 'complainant_father_name': complainant_father_name}
+        name_costs = []
+        for field, query in name_queries.items():
+            if query and fuzzy:
+                name_costs.append(self._fuzzy_name_costs(conn, field, query))
+                clauses.append("f.id IN (SELECT value FROM json_each(?))")
+                params.append(json.dumps(list(name_costs[-1])))
+            elif query:
+                self._name_clause(field, query, clauses, params)
+        if not clauses:
+            return []
+        columns = ", ".join(f"f.{field}" for field in FIR_FIELDS)
+        rows = conn.execute(f"SELECT {columns}, f.id FROM firs f WHERE {' AND '.join(clauses)} ORDER BY f.id", params).fetchall()
+        metrics.count('search.scanned', len(rows)) # Rows checked in Python after the SQL filters
+        if name_costs:
+            ranked = sorted(rows, key=lambda row: (sum(costs[row[-1]] for costs in name_costs), row[-1]))
+            return [self._row_to_fir(row[:-1]) for row in ranked]
+        found_firs = [self._row_to_fir(row[:-1]) for row in rows]
+        # LIKE treats % and _ as wildcards and only folds ASCII case; keep the exact substring semantics.
+        return [fir for fir in found_firs
+                if all(query.lower() in (fir[field] or '').lower() for field, query in name_queries.items())]
+
+    def fetch_page(self, cursor=None, limit=50):
+        """Returns (firs, next_cursor) for one page in registration order.
+
+        The cursor is the last row id already returned, so every page is an index range scan.
+        """
+        columns = ", ".join(FIR_FIELDS)
+        with self._reader() as conn:
+            rows = conn.execute(f"SELECT id, {columns} FROM firs WHERE id > ? ORDER BY id LIMIT ?",
+                                (cursor or 0, limit + 1)).fetchall()
+        next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+        return [self._row_to_fir(row[1:]) for row in rows[:limit]], next_cursor
+
+    @synchronized
+    def fir_stats(self, top=10):
+        if self.stats is None: # One pass over the table; every change after that updates the counters
+            self.stats = FIRStats()
+            for row in self.conn.execute(f"SELECT {', '.join(FIR_FIELDS)} FROM firs"):
+                fir_detail = self._row_to_fir(row)
+                self.stats.add(fir_detail['cnic'], fir_detail)
+        return self.stats.summary(top)
+
+    def date_counts(self, period='day', date_from='', date_to=''):
+        label_length = PERIOD_LENGTHS[period]
+        with self._reader() as conn:
+            rows = conn.execute("SELECT substr(fir_date, 1, ?) AS label, COUNT(*) FROM firs WHERE fir_date BETWEEN ? AND ? "
+                                "GROUP BY label ORDER BY label",
+                                (label_length, date_from or '0000-00-00', date_to or '9999-99-99'))
+            return dict(rows.fetchall())
+
+    def iter_firs(self, batch_size=1000):
+        cursor = None
+        while True:
+            firs, cursor = self.fetch_page(cursor, batch_size)
+            yield from firs
+            if cursor is None:
+                return
+
+    @synchronized
+    def count(self):
+        return self.fir_count
+
+    @synchronized
+    def next_fir_number(self, year, district_code):
+        return self.reserve_fir_numbers(year, district_code, 1)[0]
+
+    @synchronized
+    def reserve_fir_numbers(self, year, district_code, count):
+        with self.conn:
+            self.conn.execute("INSERT INTO fir_sequences (year, district_code, last_seq) VALUES (?, ?, ?) "
+                              "ON CONFLICT (year, district_code) DO UPDATE SET last_seq = last_seq + excluded.last_seq",
+                              (year, district_code, count))
+            last = self.conn.execute("SELECT last_seq FROM fir_sequences WHERE year = ? AND district_code = ?",
+                                     (year, district_code)).fetchone()[0]
+        return [format_fir_number(year, district_code, seq) for seq in range(last - count + 1, last + 1)]
+
+    @contextlib.contextmanager
+    def bulk_load(self):
+        yield self # Each put_many is already a single transaction
+
+
+# --- One-shot Migration ---
+def migrate_json_to_sqlite(json_backend, sqlite_backend):
+    """Copies every FIR and FIR number counter from a JSON backend into an empty SQLite database."""
+    json_backend.load()
+    sqlite_backend.load()
+    if sqlite_backend.count():
+        raise ValueError(f"{sqlite_backend.database_file} already contains FIRs; refusing to migrate into it.")
+    sqlite_backend.put_many((cnic, fir) for cnic, fir_list in json_backend.data.items() for fir in fir_list)
+    with sqlite_backend.conn:
+        sqlite_backend.conn.executemany(
+            "INSERT INTO fir_sequences (year, district_code, last_seq) VALUES (?, ?, ?) "
+            "ON CONFLICT (year, district_code) DO UPDATE SET last_seq = MAX(last_seq, excluded.last_seq)",
+            [(year, district_code, last_seq) for (year, district_code), last_seq in json_backend.sequence.counters.items()])
+    migrated = sqlite_backend.count()
+    log.info("Migrated %s FIRs from %s to %s.", migrated, json_backend.data_file, sqlite_backend.database_file)
+    return migrated
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate FIR data from fir_data.json (and its journal) to an SQLite database.")
+    parser.add_argument('--data', default='fir_data.json', help="JSON snapshot to read")
+    parser.add_argument('--journal', default='fir_data.journal', help="change journal replayed on top of the snapshot")
+    parser.add_argument('--sequence', default='fir_sequence.json', help="FIR number counters")
+    parser.add_argument('--database', default='fir_data.db', help="SQLite database to create")
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+    configure_logging(args.log_level, args.log_file)
+    source = JsonFileBackend(args.data, args.journal, args.sequence)
+    target = SQLiteBackend(args.database)
+    try:
+        migrate_json_to_sqlite(source, target)
+    finally:
+        target.close()
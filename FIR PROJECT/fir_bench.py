@@ -0,0 +1,272 @@
+import argparse
+import contextlib
+import datetime
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from fir_backends import JsonFileBackend, SQLiteBackend
+from fir_datagen import FIRGenerator, generate_dataset
+from fir_laws import laws
+from fir_logging import LOGGER_NAME, add_logging_arguments, configure_logging, get_logger
+from fir_metrics import summarize_timings
+from fir_storage import SNAPSHOT_FORMATS, iter_snapshot, write_snapshot
+
+log = get_logger(__name__)
+
+# --- Load Benchmark ---
+# Times the storage operations the GUI depends on against generated datasets of a given size,
+# and writes the results as JSON so runs can be compared. With --baseline, any operation whose
+# median got slower by more than --tolerance is reported as a regression (exit status 1).
+# The snapshot formats (fir_storage.py) are compared on the same datasets: file size, and the
+# time to write, parse and load each one.
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+@contextlib.contextmanager
+def _quiet():
+    """Keeps the backends' progress messages out of the benchmark output."""
+    logger = logging.getLogger(LOGGER_NAME)
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    try:
+        yield
+    finally:
+        logger.setLevel(level)
+
+def _sample_firs(backend, count, seed):
+    """Reservoir-samples count FIRs from the backend, to build realistic queries from."""
+    rng = random.Random(seed)
+    sample = []
+    for i, fir in enumerate(backend.iter_firs()):
+        if i < count:
+            sample.append(fir)
+        else:
+            j = rng.randint(0, i)
+            if j < count:
+                sample[j] = fir
+    return sample
+
+def _name_fragment(rng, name):
+    """A substring of a name, as a user would type it into the search box."""
+    name = name or 'a'
+    length = min(len(name), rng.randint(3, 6))
+    start = rng.randint(0, len(name) - length)
+    return name[start:start + length]
+
+def _days_after(fir_date, days):
+    return (datetime.date.fromisoformat(fir_date) + datetime.timedelta(days=days)).isoformat()
+
+def prepare_dataset(workdir, backend_name, size, seed, copy_to=None):
+    """Generates the dataset for one size and returns a factory opening a backend over it.
+
+    With copy_to, the backend opens copies of the dataset's files in that directory, so the
+    changes made through it don't reach the dataset that later runs are timed on.
+    """
+    data_file = os.path.join(workdir, f"fir_data_{size}.json")
+    sequence_file = os.path.join(workdir, f"fir_sequence_{size}.json")
+    journal_file = os.path.join(workdir, f"fir_data_{size}.journal")
+    database_file = os.path.join(workdir, f"fir_data_{size}.db")
+    if not os.path.exists(data_file):
+        generate_dataset(data_file, size, seed, sequence_file=sequence_file)
+    if backend_name not in ('json', 'json-compact') and not os.path.exists(database_file):
+        target = SQLiteBackend(database_file)
+        with _quiet():
+            target.load()
+            generator = FIRGenerator(seed)
+            batch = []
+            for pair in generator.iter_firs(size):
+                batch.append(pair)
+                if len(batch) >= 10000:
+                    target.put_many(batch)
+                    batch = []
+            target.put_many(batch)
+        target.close()
+    if copy_to:
+        files = [data_file, sequence_file, journal_file] if backend_name in ('json', 'json-compact') else [database_file]
+        for path in files:
+            if os.path.exists(path):
+                shutil.copy2(path, copy_to)
+        data_file, sequence_file, journal_file, database_file = (
+            os.path.join(copy_to, os.path.basename(path)) for path in (data_file, sequence_file, journal_file, database_file))
+    if backend_name in ('json', 'json-compact'):
+        return lambda: JsonFileBackend(data_file, journal_file, sequence_file,
+                                       compact_records=(backend_name == 'json-compact'))
+    return lambda: SQLiteBackend(database_file)
+
+def run_benchmark(backend_name, size, workdir, repeat=5, queries=50, seed=0):
+    """Times every benchmarked operation for one backend and dataset size."""
+    open_backend = prepare_dataset(workdir, backend_name, size, seed)
+    rng = random.Random(seed)
+    results = {}
+
+    load_times, peak_memory = [], 0
+    for run in range(repeat):
+        backend = open_backend()
+        if run == 0:
+            tracemalloc.start() # Only on the first run, since tracing slows the load down
+        with _quiet():
+            elapsed, _ = _timed(backend.load)
+        if run == 0:
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            load_times.append(elapsed)
+        backend.close()
+    results["load"] = summarize_timings(load_times or [elapsed])
+    results["load"]["peak_mb"] = round(peak_memory / 2 ** 20, 1)
+
+    # The rest registers, deletes and saves, which compacts the snapshot, rotates its generations
+    # and advances the FIR number counters: do that on a copy, so every run loads the same files.
+    scratch = tempfile.TemporaryDirectory(prefix="fir_bench_", dir=workdir)
+    backend = prepare_dataset(workdir, backend_name, size, seed, copy_to=scratch.name)()
+    with _quiet():
+        backend.load()
+    try:
+        sample = _sample_firs(backend, queries, seed)
+        criteria = {
+            "search_cnic": lambda fir: {"cnic": fir["cnic"]},
+            "search_fir_number": lambda fir: {"fir_number": fir["fir_number"]},
+            "search_accused_name": lambda fir: {"accused_name": _name_fragment(rng, fir["accused_name"])},
+            "search_accused_father_name": lambda fir: {"accused_father_name": _name_fragment(rng, fir["accused_father_name"])},
+            "search_section_bail_status": lambda fir: {"section": rng.choice(fir["sections"] or ["302"]), "bail_status": fir["bail_status"]},
+            "search_act_date_range": lambda fir: {"act": laws[rng.choice(fir["sections"] or ["302"])]["act"],
+                                                  "date_from": fir["fir_date"], "date_to": _days_after(fir["fir_date"], 30)},
+            "search_accused_name_fuzzy": lambda fir: {"accused_name": fir["accused_name"].split()[0], "fuzzy": True},
+            "search_complainant_name": lambda fir: {"complainant_name": _name_fragment(rng, fir["complainant_name"])},
+            "search_date_range": lambda fir: {"date_from": fir["fir_date"], "date_to": _days_after(fir["fir_date"], 7)},
+        }
+        for operation, make_query in criteria.items():
+            results[operation] = summarize_timings([_timed(lambda q: backend.search(**q), make_query(fir))[0] for fir in sample])
+        results["date_counts_month"] = summarize_timings([_timed(backend.date_counts, 'month')[0] for _ in range(repeat)])
+
+        # Register then delete fresh FIRs, so the FIRs are the same for the timings below
+        generator = FIRGenerator(seed + 1)
+        registered, register_times, delete_times = [], [], []
+        with _quiet():
+            for cnic, fir_entry in generator.iter_firs(queries):
+                fir_entry["fir_number"] = backend.next_fir_number(datetime.date.today().year, "BEN")
+                register_times.append(_timed(backend.put_fir, cnic, fir_entry)[0])
+                registered.append((cnic, fir_entry["fir_number"]))
+            for cnic, fir_number in registered:
+                delete_times.append(_timed(backend.delete_fir, cnic, fir_number)[0])
+        results["register"] = summarize_timings(register_times)
+        results["delete"] = summarize_timings(delete_times)
+
+        def list_all():
+            cursor, listed = None, 0
+            while True:
+                firs, cursor = backend.fetch_page(cursor, 50)
+                listed += len(firs)
+                if cursor is None:
+                    return listed
+        results["list_all"] = summarize_timings([_timed(list_all)[0] for _ in range(repeat)])
+
+        save_times = []
+        with _quiet():
+            for _ in range(repeat):
+                save_times.append(_timed(backend.save)[0])
+        results["save"] = summarize_timings(save_times)
+    finally:
+        backend.close()
+        scratch.cleanup()
+    return results
+
+def run_format_benchmark(size, workdir, formats, repeat=5, seed=0):
+    """Times writing, parsing and loading one dataset in each snapshot format; 'save' also gets the file's bytes."""
+    source = prepare_dataset(workdir, 'json', size, seed)()
+    with _quiet():
+        source.load()
+    results = {}
+    try:
+        for fmt in formats:
+            path = os.path.join(workdir, f"fir_data_{size}.{fmt}")
+            save_times = [_timed(write_snapshot, path, source.data, 0, fmt)[0] for _ in range(repeat)]
+            read_times = [_timed(lambda: sum(1 for _ in iter_snapshot(path)))[0] for _ in range(repeat)]
+            load_times = []
+            for _ in range(repeat):
+                backend = JsonFileBackend(path, path + ".journal", path + ".sequence")
+                with _quiet():
+                    load_times.append(_timed(backend.load)[0])
+                backend.close()
+            results[fmt] = {"save": dict(summarize_timings(save_times), bytes=os.path.getsize(path)),
+                            "read": summarize_timings(read_times), "load": summarize_timings(load_times)}
+    finally:
+        source.close()
+    return results
+
+def find_regressions(results, baseline, tolerance):
+    """Lists every operation whose median is more than tolerance (a fraction) slower than in baseline."""
+    regressions = []
+    for backend_name, sizes in results.items():
+        for size, operations in sizes.items():
+            for operation, summary in operations.items():
+                previous = baseline.get(backend_name, {}).get(size, {}).get(operation)
+                if not previous or not previous.get("median_ms"):
+                    continue
+                ratio = summary["median_ms"] / previous["median_ms"]
+                if ratio > 1 + tolerance:
+                    regressions.append({"backend": backend_name, "size": size, "operation": operation,
+                                        "baseline_median_ms": previous["median_ms"],
+                                        "median_ms": summary["median_ms"], "ratio": round(ratio, 3)})
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the FIR storage backends on generated datasets.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000], help="dataset sizes (number of FIRs)")
+    parser.add_argument('--backends', nargs='+', choices=['json', 'json-compact', 'sqlite'], default=['json', 'sqlite'])
+    parser.add_argument('--repeat', type=int, default=5, help="runs of load, save and list_all per size")
+    parser.add_argument('--queries', type=int, default=50, help="searches per criterion, and FIRs registered/deleted")
+    parser.add_argument('--formats', nargs='*', choices=SNAPSHOT_FORMATS, default=list(SNAPSHOT_FORMATS),
+                        help="snapshot formats whose size and save/read/load times are compared (as 'snapshot-<format>')")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', help="where generated datasets are kept (reused across runs); default: a temp dir")
+    parser.add_argument('--out', default='fir_bench_results.json')
+    parser.add_argument('--baseline', help="earlier results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed slowdown of a median, e.g. 0.2 = 20%%")
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+    configure_logging(args.log_level, args.log_file)
+
+    with contextlib.ExitStack() as stack:
+        workdir = args.workdir or stack.enter_context(tempfile.TemporaryDirectory(prefix="fir_bench_"))
+        os.makedirs(workdir, exist_ok=True)
+        results = {}
+        for backend_name in args.backends:
+            for size in args.sizes:
+                log.info("Benchmarking %s with %s FIRs...", backend_name, size)
+                results.setdefault(backend_name, {})[str(size)] = run_benchmark(
+                    backend_name, size, workdir, args.repeat, args.queries, args.seed)
+        for size in args.sizes if args.formats else []:
+            log.info("Benchmarking snapshot formats with %s FIRs...", size)
+            for fmt, operations in run_format_benchmark(size, workdir, args.formats, args.repeat, args.seed).items():
+                results.setdefault(f"snapshot-{fmt}", {})[str(size)] = operations
+
+    report = {"created": datetime.datetime.now().isoformat(timespec='seconds'), "seed": args.seed, "results": results}
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get("results", {})
+        report["tolerance"] = args.tolerance
+        report["regressions"] = find_regressions(results, baseline, args.tolerance)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    for backend_name, sizes in results.items():
+        for size, operations in sizes.items():
+            for operation, summary in operations.items():
+                memory = f"   peak {summary['peak_mb']} MB" if 'peak_mb' in summary else ""
+                memory += f"   {summary['bytes'] / 2 ** 20:.2f} MB on disk" if 'bytes' in summary else ""
+                print(f"{backend_name:16} {size:>9} {operation:28} median {summary['median_ms']:10.3f} ms   p95 {summary['p95_ms']:10.3f} ms{memory}")
+    for regression in report.get("regressions", []):
+        print(f"REGRESSION: {regression['backend']} {regression['size']} {regression['operation']}: "
+              f"{regression['baseline_median_ms']} ms -> {regression['median_ms']} ms (x{regression['ratio']})")
+    sys.exit(1 if report.get("regressions") else 0)
@@ -0,0 +1,249 @@
+import argparse
+import csv
+import itertools
+import json
+import logging
+import os
+import re
+import sys
+import time
+
+from fir_backends import JsonFileBackend, SQLiteBackend
+from fir_logging import add_logging_arguments, configure_logging, get_logger
+from fir_records import FIR_FIELDS
+from fir_stats import export_stats
+from fir_storage import SNAPSHOT_FORMATS
+from fir_validation import validate_fir_entries
+
+log = get_logger(__name__)
+
+# --- Bulk Import / Export ---
+# Moves FIRs in and out as CSV (one column per FIR field, sections separated by commas or
+# semicolons) or JSON Lines (one FIR object per line). Input is streamed in batches: each
+# batch is validated with the registration form's rules, gets its missing FIR numbers in one
+# reservation per year and district, and is stored with a single put_many (one journal append
+# or one SQLite transaction). Rejected rows are written to a side file with their errors.
+# A row that brings its own FIR number must not clash with a stored FIR or an earlier row:
+# the number may only be reused to replace the same CNIC's FIR, and only when asked to.
+
+SECTION_SEPARATORS = re.compile(r'[,;]')
+
+def detect_format(path):
+    """Guesses 'csv' or 'jsonl' from the file extension."""
+    return 'csv' if os.path.splitext(path)[1].lower() == '.csv' else 'jsonl'
+
+def read_csv_rows(path):
+    """Returns an iterator of (line_number, row, error) for every data row of a CSV file.
+
+    Raises ValueError straight away if the header names a column that is not an FIR field.
+    """
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        columns = next(csv.reader(f), [])
+    unknown = [column for column in columns if column not in FIR_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown CSV columns in {path}: {', '.join(unknown)}")
+    return _iter_csv_rows(path)
+
+def _iter_csv_rows(path):
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            row = {field: value for field, value in row.items() if value is not None}
+            if 'sections' in row:
+                row['sections'] = [s.strip() for s in SECTION_SEPARATORS.split(row['sections']) if s.strip()]
+            yield reader.line_num, row, None
+
+def read_jsonl_rows(path):
+    """Yields (line_number, row, error) for every non-blank line of a JSON Lines file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_no, line.rstrip("\n"), f"Invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield line_no, row, "Expected a JSON object"
+                continue
+            yield line_no, row, None
+
+def normalize_row(row):
+    """Turns a parsed row into an FIR entry, or returns (None, {field: message}) if it has the wrong shape."""
+    unknown = [field for field in row if field not in FIR_FIELDS]
+    if unknown:
+        return None, {"row": f"Unknown fields: {', '.join(unknown)}"}
+    sections = row.get('sections', [])
+    if not isinstance(sections, list) or not all(isinstance(s, str) for s in sections):
+        return None, {"sections": "Sections must be a list of section codes."}
+    fir_entry = {}
+    for field in FIR_FIELDS:
+        value = row.get(field, '')
+        if field == 'sections':
+            fir_entry[field] = [s.strip() for s in sections if s.strip()]
+        elif not isinstance(value, str):
+            return None, {field: f"Field {field} must be text."}
+        else:
+            fir_entry[field] = value.strip()
+    if not fir_entry['bail_status']:
+        fir_entry['bail_status'] = "N/A"
+    return fir_entry, {}
+
+def fir_number_conflict(store, cnic, fir_number, replace=False):
+    """Returns why fir_number can't be imported for cnic, or None if it is free (or may be replaced)."""
+    if store.get_fir(cnic, fir_number) is not None:
+        return None if replace else f"FIR Number {fir_number} is already registered for this CNIC (use --replace to overwrite it)."
+    if store.search(fir_number=fir_number): # Stored FIRs don't all carry their CNIC, but this one isn't cnic's
+        return f"FIR Number {fir_number} is already registered for another CNIC."
+    return None
+
+def import_firs(store, path, fmt=None, batch_size=5000, rejects_file=None, district_code="LHR", replace=False):
+    """Imports FIRs from a CSV or JSON Lines file into store; returns (imported, rejected).
+
+    FIRs without a FIR number are numbered in the year of their FIR date. A row whose FIR
+    number is already stored is rejected, unless replace is set and it is the same CNIC's FIR.
+    Raises ValueError if a CSV file has columns that are not FIR fields.
+    """
+    fmt = fmt or detect_format(path)
+    rows = read_csv_rows(path) if fmt == 'csv' else read_jsonl_rows(path)
+    rejects_file = rejects_file or path + '.rejects.jsonl'
+    imported = rejected = 0
+    rejects = None
+    seen_numbers = {} # Lowercased FIR number -> line of the row that brought it
+
+    def reject(line_no, errors, row):
+        nonlocal rejects, rejected
+        if rejects is None:
+            rejects = open(rejects_file, 'w', encoding='utf-8')
+        rejects.write(json.dumps({"line": line_no, "errors": errors, "row": row}) + "\n")
+        rejected += 1
+
+    try:
+        with store.bulk_load():
+            while True:
+                chunk = list(itertools.islice(rows, batch_size))
+                if not chunk:
+                    break
+                parsed = []
+                for line_no, row, error in chunk:
+                    fir_entry, errors = (None, {"row": error}) if error else normalize_row(row)
+                    if errors:
+                        reject(line_no, errors, row)
+                    else:
+                        parsed.append((line_no, row, fir_entry))
+                batch_errors = validate_fir_entries([fir_entry for _, _, fir_entry in parsed]) # One pass per column
+                batch, needs_number = [], {}
+                for i, (line_no, row, fir_entry) in enumerate(parsed):
+                    if i in batch_errors:
+                        reject(line_no, batch_errors[i], row)
+                        continue
+                    fir_number = fir_entry['fir_number']
+                    if not fir_number:
+                        needs_number.setdefault(int(fir_entry['fir_date'][:4]), []).append(fir_entry)
+                    elif fir_number.lower() in seen_numbers:
+                        reject(line_no, {"fir_number": f"FIR Number {fir_number} is already used on line {seen_numbers[fir_number.lower()]}."}, row)
+                        continue
+                    else:
+                        conflict = fir_number_conflict(store, fir_entry['cnic'], fir_number, replace)
+                        if conflict:
+                            reject(line_no, {"fir_number": conflict}, row)
+                            continue
+                        seen_numbers[fir_number.lower()] = line_no
+                    batch.append((fir_entry['cnic'], fir_entry))
+                for year, fir_entries in needs_number.items():
+                    fir_numbers = []
+                    while len(fir_numbers) < len(fir_entries): # Skipping numbers that rows of this batch bring themselves
+                        reserved = store.reserve_fir_numbers(year, district_code, len(fir_entries) - len(fir_numbers))
+                        fir_numbers += [fir_number for fir_number in reserved if fir_number.lower() not in seen_numbers]
+                    for fir_entry, fir_number in zip(fir_entries, fir_numbers):
+                        fir_entry['fir_number'] = fir_number
+                imported += store.put_many(batch)
+                log.info("Imported %s FIRs (%s rejected) from %s...", imported, rejected, path)
+    finally:
+        if rejects is not None:
+            rejects.close()
+    if rejected:
+        log.info("%s rejected rows written to %s.", rejected, rejects_file)
+    return imported, rejected
+
+def check_firs(store, report_file, batch_size=50000):
+    """Validates every stored FIR, writing the problems to report_file; returns (checked, invalid)."""
+    checked = invalid = 0
+    firs = store.iter_firs()
+    with open(report_file, 'w', encoding='utf-8') as report:
+        while True:
+            batch = list(itertools.islice(firs, batch_size))
+            if not batch:
+                break
+            for row, errors in sorted(validate_fir_entries(batch).items()):
+                report.write(json.dumps({"cnic": batch[row].get('cnic'), "fir_number": batch[row].get('fir_number'),
+                                         "errors": errors}) + "\n")
+                invalid += 1
+            checked += len(batch)
+    return checked, invalid
+
+def export_firs(store, path, fmt=None):
+    """Streams every FIR in store to a CSV or JSON Lines file; returns the number exported."""
+    fmt = fmt or detect_format(path)
+    exported = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        if fmt == 'csv':
+            writer = csv.DictWriter(f, fieldnames=FIR_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            for fir in store.iter_firs():
+                row = dict(fir)
+                row['sections'] = ", ".join(row.get('sections', []))
+                writer.writerow(row)
+                exported += 1
+        else:
+            for fir in store.iter_firs():
+                f.write(json.dumps(dict(fir)) + "\n")
+                exported += 1
+    return exported
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import or export FIRs as CSV or JSON Lines, check the stored FIRs or export their statistics.")
+    parser.add_argument('command', choices=['import', 'export', 'check', 'stats'])
+    parser.add_argument('file', help="CSV (.csv) or JSON Lines file to read or write; for check, the report file; for stats, a .csv or .json file")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="default: from the file extension")
+    parser.add_argument('--rejects', help="where rejected rows go (default: <file>.rejects.jsonl)")
+    parser.add_argument('--batch-size', type=int, default=5000, help="rows validated and stored per batch")
+    parser.add_argument('--district', default="LHR", help="district code for FIRs imported without a FIR number")
+    parser.add_argument('--replace', action='store_true', help="let imported rows overwrite the same CNIC's FIR with their FIR number")
+    parser.add_argument('--backend', choices=['json', 'sqlite'], default='json')
+    parser.add_argument('--data', default='fir_data.json', help="JSON snapshot (json backend)")
+    parser.add_argument('--journal', default='fir_data.journal', help="change journal (json backend)")
+    parser.add_argument('--sequence', default='fir_sequence.json', help="FIR number counters (json backend)")
+    parser.add_argument('--snapshot-format', choices=SNAPSHOT_FORMATS, default='pretty', help="how --data is written (json backend); any is read")
+    parser.add_argument('--database', default='fir_data.db', help="SQLite database (sqlite backend)")
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+    configure_logging(args.log_level, args.log_file)
+
+    if args.backend == 'sqlite':
+        backend = SQLiteBackend(args.database)
+    else:
+        backend = JsonFileBackend(args.data, args.journal, args.sequence, snapshot_format=args.snapshot_format)
+    started = time.perf_counter()
+    status = 0
+    try:
+        backend.load()
+        if args.command == 'import':
+            try:
+                imported, rejected = import_firs(backend, args.file, args.format, args.batch_size, args.rejects, args.district, args.replace)
+                summary = f"Imported {imported} FIRs, rejected {rejected}"
+            except (OSError, ValueError) as e: # Missing or unreadable file, or CSV columns that aren't FIR fields
+                summary, status = f"Not imported: {e}", 2
+        elif args.command == 'check':
+            checked, invalid = check_firs(backend, args.file)
+            summary = f"Checked {checked} FIRs, {invalid} with problems (see {args.file})"
+        elif args.command == 'stats':
+            export_stats(backend.fir_stats(), args.file)
+            summary = f"Exported statistics on {backend.count()} FIRs to {args.file}"
+        else:
+            summary = f"Exported {export_firs(backend, args.file, args.format)} FIRs"
+    finally:
+        backend.close()
+    log.log(logging.ERROR if status else logging.INFO, "%s in %.1fs.", summary, time.perf_counter() - started)
+    sys.exit(status)
@@ -0,0 +1,165 @@
+import argparse
+import dataclasses
+import json
+import sys
+import time
+
+from fir_backends import JsonFileBackend, SQLiteBackend
+from fir_logging import add_logging_arguments, configure_logging, get_logger
+from fir_metrics import metrics
+from fir_service import FIRInput, FIRService, SearchQuery, ValidationError
+from fir_stats import export_stats
+from fir_storage import SNAPSHOT_FORMATS
+from fir_store import FIRStore
+
+log = get_logger(__name__)
+
+# --- Command Line Interface ---
+# Runs the FIR service (fir_service.py) without the GUI, for batch jobs and benchmarks.
+# Results are written to stdout as JSON (one FIR per line for searches); progress and timings
+# are logged to stderr (see fir_logging.py). Exit status: 0 on success, 1 if the FIR wasn't
+# found, 2 for invalid input.
+
+def add_storage_arguments(parser):
+    """Adds the options choosing where the FIRs are kept (used by open_store) to parser."""
+    parser.add_argument('--backend', choices=['json', 'sqlite'], default='json')
+    parser.add_argument('--data', default='fir_data.json', help="JSON snapshot (json backend)")
+    parser.add_argument('--journal', default='fir_data.journal', help="change journal (json backend)")
+    parser.add_argument('--sequence', default='fir_sequence.json', help="FIR number counters (json backend)")
+    parser.add_argument('--snapshot-format', choices=SNAPSHOT_FORMATS, default='pretty', help="how --data is written (json backend); any is read")
+    parser.add_argument('--database', default='fir_data.db', help="SQLite database (sqlite backend)")
+    parser.add_argument('--district', default="LHR", help="district code of newly assigned FIR numbers")
+
+def open_store(args, read_connections=0):
+    if args.backend == 'sqlite':
+        return FIRStore(lambda: SQLiteBackend(args.database, read_connections))
+    return FIRStore(lambda: JsonFileBackend(args.data, args.journal, args.sequence, snapshot_format=args.snapshot_format))
+
+def _print_json(out, value):
+    out.write(json.dumps(value, default=dict) + "\n")
+
+def run_search(service, args, out):
+    query = SearchQuery(**{field.name: getattr(args, field.name) for field in dataclasses.fields(SearchQuery)})
+    try:
+        found_firs = service.search(query)
+    except ValidationError as e:
+        _print_json(out, {"errors": e.errors})
+        return f"Not searched: {e}", 2
+    for fir in found_firs[:args.limit] if args.limit else found_firs:
+        _print_json(out, fir)
+    return f"Found {len(found_firs)} FIRs", 0
+
+def run_register(service, args, out):
+    fir_input = FIRInput(cnic=args.cnic, fir_number=args.fir_number, complainant_name=args.complainant_name,
+                         complainant_father_name=args.complainant_father_name, accused_name=args.accused_name,
+                         accused_father_name=args.accused_father_name, reason=args.reason, fir_date=args.fir_date,
+                         sections=tuple(args.sections), bail_status=args.bail_status, punishment=args.punishment)
+    try:
+        result = service.save_fir(fir_input)
+    except ValidationError as e:
+        _print_json(out, {"errors": e.errors})
+        return f"Not saved: {e}", 2
+    _print_json(out, dataclasses.asdict(result))
+    return f"FIR {result.fir_number} {result.operation}", 0
+
+def run_delete(service, args, out):
+    result = service.delete_fir(args.cnic, args.fir_number)
+    _print_json(out, dataclasses.asdict(result))
+    return f"FIR {args.fir_number}: {result.status}", 0 if result.status == "deleted" else 1
+
+def run_import(service, args, out):
+    try:
+        result = service.import_file(args.file, args.format, args.rejects, args.replace)
+    except (OSError, ValueError) as e: # Missing or unreadable file, or CSV columns that aren't FIR fields
+        _print_json(out, {"errors": {"file": str(e)}})
+        return f"Not imported: {e}", 2
+    _print_json(out, dataclasses.asdict(result))
+    return f"Imported {result.transferred} FIRs, rejected {result.rejected}", 0
+
+def run_export(service, args, out):
+    result = service.export_file(args.file, args.format)
+    return f"Exported {result.transferred} FIRs to {args.file}", 0
+
+def run_stats(service, args, out):
+    summary = service.stats(args.top)
+    if args.out:
+        export_stats(summary, args.out)
+    else:
+        _print_json(out, summary)
+    return f"Statistics on {summary['total_firs']} FIRs", 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Search, register, delete, import, export and summarize FIRs without the GUI.")
+    add_storage_arguments(parser)
+    add_logging_arguments(parser)
+    parser.add_argument('--metrics', help="write the operation timings and counters (fir_metrics.py) to this JSON file")
+    parser.add_argument('--profile', action='store_true', help="also profile the operations (cProfile, tracemalloc) into --metrics")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    search = commands.add_parser('search', help="print the matching FIRs as JSON Lines")
+    for field in dataclasses.fields(SearchQuery):
+        if field.name != 'fuzzy':
+            search.add_argument('--' + field.name.replace('_', '-'), default="")
+    search.add_argument('--fuzzy', action='store_true', help="match similar spellings of names")
+    search.add_argument('--limit', type=int, default=0, help="print at most this many FIRs (0: all)")
+    search.set_defaults(run=run_search)
+
+    register = commands.add_parser('register', help="register a new FIR, or update one by --fir-number")
+    register.add_argument('--cnic', required=True)
+    register.add_argument('--complainant-name', required=True)
+    register.add_argument('--accused-name', required=True)
+    register.add_argument('--reason', required=True)
+    register.add_argument('--fir-number', default="")
+    register.add_argument('--complainant-father-name', default="")
+    register.add_argument('--accused-father-name', default="")
+    register.add_argument('--fir-date', default="", help="YYYY-MM-DD (default: today)")
+    register.add_argument('--sections', nargs='*', default=[])
+    register.add_argument('--bail-status', default="N/A")
+    register.add_argument('--punishment', default="")
+    register.set_defaults(run=run_register)
+
+    delete = commands.add_parser('delete', help="delete one FIR")
+    delete.add_argument('cnic')
+    delete.add_argument('fir_number')
+    delete.set_defaults(run=run_delete)
+
+    import_ = commands.add_parser('import', help="import FIRs from CSV or JSON Lines (see fir_bulk.py)")
+    import_.add_argument('file')
+    import_.add_argument('--format', choices=['csv', 'jsonl'], help="default: from the file extension")
+    import_.add_argument('--rejects', help="where rejected rows go (default: <file>.rejects.jsonl)")
+    import_.add_argument('--replace', action='store_true', help="let imported rows overwrite the same CNIC's FIR with their FIR number")
+    import_.set_defaults(run=run_import)
+
+    export = commands.add_parser('export', help="export every FIR to CSV or JSON Lines")
+    export.add_argument('file')
+    export.add_argument('--format', choices=['csv', 'jsonl'], help="default: from the file extension")
+    export.set_defaults(run=run_export)
+
+    stats = commands.add_parser('stats', help="print (or --out: export) the FIR statistics")
+    stats.add_argument('--top', type=int, default=10, help="repeat offenders listed")
+    stats.add_argument('--out', help="write to this .csv or .json file instead of stdout")
+    stats.set_defaults(run=run_stats)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    configure_logging(args.log_level, args.log_file)
+    store = open_store(args)
+    started = time.perf_counter()
+    out = sys.stdout
+    if args.profile:
+        metrics.start_profiling()
+    try:
+        store.load()
+        summary, status = args.run(FIRService(store, args.district), args, out)
+    finally:
+        store.close()
+        if args.profile:
+            metrics.stop_profiling()
+        if args.metrics:
+            metrics.dump(args.metrics)
+    log.info("%s in %.2fs.", summary, time.perf_counter() - started)
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+import argparse
+import datetime
+import itertools
+import json
+import random
+import time
+
+from fir_index import FIRSequence, format_fir_number
+from fir_laws import laws
+from fir_logging import add_logging_arguments, configure_logging, get_logger
+
+log = get_logger(__name__)
+
+# --- Synthetic FIR Data Generator ---
+# Produces realistic-looking, reproducible datasets for load testing. Everything is driven by
+# one seeded random.Random, so the same seed and count always give the same FIRs. FIRs are
+# generated CNIC by CNIC, which lets the CNIC-keyed snapshot be written as a stream.
+
+FIRST_NAMES = ["Muhammad", "Ali", "Ahmed", "Usman", "Bilal", "Hassan", "Hamza", "Imran", "Asif", "Zain",
+               "Faisal", "Kamran", "Tariq", "Shahid", "Naveed", "Waqas", "Adnan", "Salman", "Irfan", "Junaid",
+               "Fatima", "Ayesha", "Sara", "Zainab", "Maryam", "Hina", "Sana", "Amna", "Rabia", "Nida",
+               "Osman", "Aisha", "Mohammad", "Ahmad", "Husain", "Umar", "Omer", "Yasir", "Danish", "Farhan"]
+FAMILY_NAMES = ["Khan", "Ahmed", "Ali", "Hussain", "Iqbal", "Akhtar", "Javed", "Butt", "Malik", "Qureshi",
+                "Sheikh", "Chaudhry", "Raza", "Shah", "Mehmood", "Siddiqui", "Abbasi", "Baig", "Mirza", "Akram"]
+REASONS = [
+    "Personal dispute leading to physical altercation.",
+    "Attempted theft from a convenience store.",
+    "Cyberbullying on social media platform.",
+    "Traffic violation resulting in minor accident.",
+    "Unauthorized access to private property.",
+    "Possession of small quantity of contraband.",
+    "Verbal threat and intimidation.",
+    "Snatching of mobile phone at gunpoint.",
+    "Fraudulent online transaction.",
+    "Land dispute turned violent.",
+]
+BAIL_STATUSES = {"Pending": 40, "Granted": 30, "Denied": 15, "N/A": 15}
+PUNISHMENTS = {"Case ongoing": 55, "Acquitted": 10, "Case dismissed": 8, "Fine imposed": 10,
+               "Sentenced to 1 year imprisonment": 8, "Community service ordered": 4,
+               "Sentenced to 5 years rigorous imprisonment": 5}
+ACT_WEIGHTS = {"PPC": 60, "CNSA": 8, "MVO": 8, "PECA": 6, "Arms Ordinance": 6, "ATA": 3, "CrPC": 3,
+               "MPO": 2, "AMLA": 1, "NAB Ordinance": 1, "PCA": 1, "Customs Act": 1}  # Other acts: 1
+DISTRICTS = {"LHR": 35, "KHI": 30, "ISB": 10, "RWP": 8, "FSD": 7, "MUL": 6, "PEW": 4}
+FIRS_PER_CNIC = {1: 70, 2: 18, 3: 7, 4: 3, 5: 1, 8: 1}  # Most people have one FIR; a few are repeat offenders
+
+def _zipf_weights(n, s=1.1):
+    return [1 / (rank ** s) for rank in range(1, n + 1)]
+
+class FIRGenerator:
+    """Seeded generator of FIR entries with skewed, realistic value distributions."""
+
+    def __init__(self, seed=0, years=3, end_date=None):
+        self.rng = random.Random(seed)
+        self.end_ordinal = (end_date or datetime.date.today()).toordinal()
+        self.days = years * 365
+        self.sequence = FIRSequence()
+        self.seen_cnics = set()
+        self.first_names = FIRST_NAMES
+        self.first_name_cum = list(itertools.accumulate(_zipf_weights(len(FIRST_NAMES))))
+        self.family_name_cum = list(itertools.accumulate(_zipf_weights(len(FAMILY_NAMES), 0.8)))
+        self.sections_by_act = {}
+        for code, info in laws.items():
+            self.sections_by_act.setdefault(info['act'], []).append(code)
+        self.acts = list(self.sections_by_act)
+        self.act_cum = list(itertools.accumulate(ACT_WEIGHTS.get(act, 1) for act in self.acts))
+        self.bail_cum = list(itertools.accumulate(BAIL_STATUSES.values()))
+        self.punishment_cum = list(itertools.accumulate(PUNISHMENTS.values()))
+        self.district_cum = list(itertools.accumulate(DISTRICTS.values()))
+        self.firs_per_cnic_cum = list(itertools.accumulate(FIRS_PER_CNIC.values()))
+
+    def _pick(self, population, cum_weights):
+        return self.rng.choices(population, cum_weights=cum_weights)[0]
+
+    def _name(self):
+        first = self._pick(FIRST_NAMES, self.first_name_cum)
+        if self.rng.random() < 0.6:
+            return f"{first} {self._pick(FAMILY_NAMES, self.family_name_cum)}"
+        return first
+
+    def _cnic(self):
+        while True:
+            cnic = f"{self.rng.randint(10000, 99999)}-{self.rng.randint(1000000, 9999999)}-{self.rng.randint(0, 9)}"
+            if cnic not in self.seen_cnics:
+                self.seen_cnics.add(cnic)
+                return cnic
+
+    def _date(self):
+        # More recent cases are more common (triangular skew towards end_date)
+        offset = int(self.rng.triangular(0, self.days, 0))
+        return datetime.date.fromordinal(self.end_ordinal - offset)
+
+    def _sections(self):
+        act = self._pick(self.acts, self.act_cum)
+        candidates = self.sections_by_act[act]
+        count = min(len(candidates), self._pick((1, 2, 3), (70, 92, 100)))
+        sections = self.rng.sample(candidates, count)
+        if self.rng.random() < 0.1: # Occasionally add a procedural/other-act section
+            extra = self.rng.choice(list(laws))
+            if extra not in sections:
+                sections.append(extra)
+        return sections
+
+    def fir_entry(self, cnic, accused_name, accused_father_name):
+        fir_date = self._date()
+        district_code = self._pick(list(DISTRICTS), self.district_cum)
+        seq = self.sequence.next(fir_date.year, district_code)
+        return {
+            "fir_number": format_fir_number(fir_date.year, district_code, seq),
+            "complainant_name": self._name(),
+            "complainant_father_name": self._name(),
+            "accused_name": accused_name,
+            "accused_father_name": accused_father_name,
+            "cnic": cnic,
+            "reason": self.rng.choice(REASONS),
+            "fir_date": fir_date.strftime("%Y-%m-%d"),
+            "sections": self._sections(),
+            "bail_status": self._pick(list(BAIL_STATUSES), self.bail_cum),
+            "punishment": self._pick(list(PUNISHMENTS), self.punishment_cum),
+        }
+
+    def iter_cnics(self, count):
+        """Yields (cnic, [fir_entry, ...]) until exactly count FIRs have been produced."""
+        produced = 0
+        while produced < count:
+            per_cnic = min(self._pick(list(FIRS_PER_CNIC), self.firs_per_cnic_cum), count - produced)
+            cnic = self._cnic()
+            accused_name = self._name()
+            accused_father_name = self._name()
+            yield cnic, [self.fir_entry(cnic, accused_name, accused_father_name) for _ in range(per_cnic)]
+            produced += per_cnic
+
+    def iter_firs(self, count):
+        """Yields (cnic, fir_entry) pairs, count in total."""
+        for cnic, fir_list in self.iter_cnics(count):
+            for fir_entry in fir_list:
+                yield cnic, fir_entry
+
+# --- Writers ---
+def write_snapshot_stream(path, cnic_groups):
+    """Writes CNIC-keyed FIR data in the fir_data.json layout without holding it in memory."""
+    total = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("{")
+        for i, (cnic, fir_list) in enumerate(cnic_groups):
+            f.write(("\n" if i == 0 else ",\n") + json.dumps(cnic) + ": " + json.dumps(fir_list))
+            total += len(fir_list)
+        f.write("\n}\n")
+    return total
+
+def write_jsonl(path, cnic_groups):
+    """Writes one FIR per line (the bulk import/export format)."""
+    total = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for _, fir_list in cnic_groups:
+            for fir_entry in fir_list:
+                f.write(json.dumps(fir_entry) + "\n")
+                total += 1
+    return total
+
+def generate_dataset(path, count, seed=0, fmt='json', sequence_file=None, years=3):
+    """Generates count FIRs into path; returns the FIRGenerator used (for its sequence counters)."""
+    generator = FIRGenerator(seed, years)
+    writer = write_jsonl if fmt == 'jsonl' else write_snapshot_stream
+    writer(path, generator.iter_cnics(count))
+    if sequence_file:
+        generator.sequence.save(sequence_file)
+    return generator
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic, reproducible FIR dataset.")
+    parser.add_argument('count', type=int, help="number of FIRs to generate, e.g. 10000 to 10000000")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--years', type=int, default=3, help="spread FIR dates over this many years before today")
+    parser.add_argument('--format', choices=['json', 'jsonl'], default='json',
+                        help="json: fir_data.json snapshot layout; jsonl: one FIR per line")
+    parser.add_argument('--out', default='fir_data.json')
+    parser.add_argument('--sequence', help="also write the FIR number counters here (e.g. fir_sequence.json)")
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+    configure_logging(args.log_level, args.log_file)
+    started = time.perf_counter()
+    generate_dataset(args.out, args.count, args.seed, args.format, args.sequence, args.years)
+    log.info("Generated %s FIRs into %s in %.1fs.", args.count, args.out, time.perf_counter() - started)
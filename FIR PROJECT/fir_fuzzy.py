@@ -0,0 +1,122 @@
+import re
+from collections import Counter
+
+# --- Fuzzy Name Matching ---
+# Names are transliterated from Urdu, so the same name is spelt several ways ("Usman"/"Osman",
+# "Ayesha"/"Aisha", "Mohammad"/"Muhammad"). Names are compared word by word: a query word
+# matches a stored word that sounds alike (same phonetic key) or is within a few edits of it.
+# Candidate words come from phonetic-key and trigram postings over the distinct words, so only
+# a handful of words are ever compared letter by letter, however many FIRs there are.
+
+NAME_FIELDS = ["accused_name", "accused_father_name", "complainant_name", "complainant_father_name"]
+
+NAME_WORD = re.compile(r'[a-z]+')
+VOWELS = frozenset('aeiouy')
+SOUND_ALIKE = [('ph', 'f'), ('kh', 'k'), ('gh', 'g'), ('ck', 'k'), ('q', 'k'), ('c', 'k'), ('v', 'w')]
+
+def name_tokens(name):
+    """Splits a name into lowercased words, e.g. 'Ali Khan' -> ['ali', 'khan']."""
+    return NAME_WORD.findall((name or '').lower())
+
+def phonetic_key(token):
+    """Reduces a lowercased word to how it sounds, so spelling variants share a key.
+
+    Letters that sound alike are merged, vowels are dropped (a leading vowel becomes 'a'),
+    as is an 'h' that only softens the consonant before it, and doubled letters count once:
+    usman/osman -> 'asmn', ayesha/aisha -> 'as', muhammad/mohammed -> 'mhmd'.
+    """
+    for spelling, sound in SOUND_ALIKE:
+        token = token.replace(spelling, sound)
+    if not token:
+        return ''
+    key = ['a' if token[0] in 'aeiou' else token[0]]
+    previous = token[0]
+    for ch in token[1:]:
+        if ch not in VOWELS and not (ch == 'h' and previous not in VOWELS) and ch != key[-1]:
+            key.append(ch)
+        previous = ch
+    return ''.join(key)
+
+def max_edits(token):
+    """Edits allowed between a query word and a stored word (one more if they sound alike)."""
+    return 0 if len(token) <= 2 else 1 if len(token) <= 5 else 2
+
+def edit_distance(a, b):
+    """Levenshtein distance between two words."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+def trigrams(token):
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TokenMatcher:
+    """Finds the stored words similar to a query word, with their edit distance."""
+
+    def __init__(self):
+        self.tokens = set()
+        self.by_phonetic = {}  # phonetic key -> set of words
+        self.by_gram = {}      # trigram -> set of words containing it
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def add(self, token):
+        if token in self.tokens:
+            return
+        self.tokens.add(token)
+        self.by_phonetic.setdefault(phonetic_key(token), set()).add(token)
+        for gram in trigrams(token):
+            self.by_gram.setdefault(gram, set()).add(token)
+
+    def remove(self, token):
+        if token not in self.tokens:
+            return
+        self.tokens.discard(token)
+        for postings, value in [(self.by_phonetic, phonetic_key(token))] + [(self.by_gram, gram) for gram in trigrams(token)]:
+            words = postings[value]
+            words.discard(token)
+            if not words:
+                del postings[value]
+
+    def similar(self, query_token):
+        """Returns {word: edit distance} for the stored words matching query_token.
+
+        Words that sound alike may be one edit further away than other words, so vowel
+        variants match but unrelated names that merely share consonants don't.
+        """
+        limit = max_edits(query_token)
+        sound_alike = self.by_phonetic.get(phonetic_key(query_token), set())
+        grams = trigrams(query_token)
+        # A word within `limit` edits shares all but at most 3 * limit of the query's trigrams
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.by_gram.get(gram, ()))
+        needed = max(1, len(grams) - 3 * limit)
+        candidates = sound_alike.union(token for token, count in shared.items() if count >= needed)
+        matches = {}
+        for token in candidates:
+            distance = edit_distance(query_token, token)
+            if distance <= limit or (token in sound_alike and distance <= limit + 1):
+                matches[token] = distance
+        return matches
+
+def combine_costs(costs_per_word):
+    """Combines {item: cost} dicts, one per query word, into the items matching every word.
+
+    An item's cost is the sum of its costs, i.e. how far it is from the whole query.
+    """
+    combined = None
+    for costs in costs_per_word:
+        if combined is None:
+            combined = dict(costs)
+        else:
+            combined = {item: cost + costs[item] for item, cost in combined.items() if item in costs}
+    return combined or {}
@@ -0,0 +1,421 @@
+import bisect
+import datetime
+import json
+import os
+import re
+
+from fir_fuzzy import NAME_FIELDS, TokenMatcher, combine_costs, name_tokens
+from fir_laws import laws
+from fir_metrics import metrics
+from fir_stats import FIRStats
+from fir_storage import write_snapshot
+
+FIR_NUMBER_PARTS = re.compile(r'(\d{4})/([A-Z]{3})/(\d+)')  # e.g., 2024/LHR/0001
+
+def format_fir_number(year, district_code, seq):
+    """Formats an FIR number, padding the sequence with leading zeros to 4 digits."""
+    return f"{year}/{district_code}/{seq:04d}"
+
+# --- FIR Number Sequences ---
+class FIRSequence:
+    """Hands out FIR sequence numbers per (year, district code) without scanning the data.
+
+    The last number used for each key is kept in memory and persisted next to the data file.
+    At load it is also rebuilt from the FIRs themselves, so a missing or stale counter file
+    can never cause a number to be handed out twice.
+    """
+
+    def __init__(self, counters=None):
+        self.counters = dict(counters or {})  # (year, district_code) -> last sequence used
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path):
+        """Loads persisted counters, starting empty if the file is missing or unreadable."""
+        counters = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for key, last_seq in json.load(f).items():
+                        year, district_code = key.split('/')
+                        counters[(int(year), district_code)] = int(last_seq)
+            except (ValueError, OSError, AttributeError):
+                counters = {}
+        return cls(counters)
+
+    def save(self, path):
+        """Persists the counters atomically if they changed since the last save."""
+        if not self.dirty:
+            return
+        write_snapshot(path, {f"{year}/{district_code}": last_seq
+                              for (year, district_code), last_seq in sorted(self.counters.items())}, fmt='compact')
+        self.dirty = False
+
+    def observe(self, fir_number):
+        """Raises the counter for fir_number's year and district to at least its sequence."""
+        match = FIR_NUMBER_PARTS.fullmatch(fir_number or '')
+        if not match:
+            return
+        key = (int(match.group(1)), match.group(2))
+        seq = int(match.group(3))
+        if seq > self.counters.get(key, 0):
+            self.counters[key] = seq
+            self.dirty = True
+
+    def merge(self, other):
+        """Raises the counters to other's, e.g. to those another process saved."""
+        for key, last_seq in other.counters.items():
+            if last_seq > self.counters.get(key, 0):
+                self.counters[key] = last_seq
+
+    def rebuild(self, data):
+        """Brings the counters up to date with every FIR in data in a single pass."""
+        for fir_list in data.values():
+            for fir_detail in fir_list:
+                self.observe(fir_detail.get('fir_number', ''))
+
+    def next(self, year, district_code):
+        """Allocates and returns the next sequence number for (year, district_code)."""
+        return self.reserve(year, district_code, 1)
+
+    def reserve(self, year, district_code, count):
+        """Allocates count consecutive sequence numbers for (year, district_code); returns the first."""
+        key = (year, district_code)
+        first = self.counters.get(key, 0) + 1
+        self.counters[key] = first + count - 1
+        self.dirty = True
+        return first
+
+# --- Search Indexes ---
+def _grams(value, max_gram=3):
+    """Yields every substring of value up to max_gram characters long."""
+    for n in range(1, max_gram + 1):
+        for i in range(len(value) - n + 1):
+            yield value[i:i + n]
+
+class SubstringIndex:
+    """Case-insensitive substring lookup over one text field.
+
+    Names repeat heavily, so postings are kept per distinct value: an n-gram maps to the
+    values containing it, and each value maps to the FIR keys that carry it. A query is
+    answered from the n-gram postings and only the candidate values are checked directly.
+    """
+
+    def __init__(self, max_gram=3):
+        self.max_gram = max_gram
+        self.keys_by_value = {}   # lowercased value -> set of FIR keys
+        self.values_by_gram = {}  # n-gram -> set of lowercased values containing it
+
+    def add(self, value, key):
+        value = (value or '').lower()
+        keys = self.keys_by_value.get(value)
+        if keys is None:
+            keys = self.keys_by_value[value] = set()
+            self._add_value(value)
+        keys.add(key)
+
+    def _add_value(self, value):
+        for gram in set(_grams(value, self.max_gram)):
+            self.values_by_gram.setdefault(gram, set()).add(value)
+
+    def remove(self, value, key):
+        value = (value or '').lower()
+        keys = self.keys_by_value.get(value)
+        if keys is None:
+            return
+        keys.discard(key)
+        if not keys:
+            del self.keys_by_value[value]
+            self._remove_value(value)
+
+    def _remove_value(self, value):
+        for gram in set(_grams(value, self.max_gram)):
+            values = self.values_by_gram[gram]
+            values.discard(value)
+            if not values:
+                del self.values_by_gram[gram]
+
+    def search(self, query):
+        """Returns the set of FIR keys whose value contains query (case-insensitive)."""
+        query = query.lower()
+        if len(query) <= self.max_gram:
+            values = self.values_by_gram.get(query, ())
+        else:
+            postings = [self.values_by_gram.get(query[i:i + self.max_gram], set())
+                        for i in range(len(query) - self.max_gram + 1)]
+            postings.sort(key=len)
+            values = [value for value in postings[0].intersection(*postings[1:]) if query in value]
+        keys = set()
+        for value in values:
+            keys |= self.keys_by_value[value]
+        return keys
+
+def date_ordinal(fir_date):
+    """Returns the ordinal of a YYYY-MM-DD date, or None if it isn't a real date."""
+    try:
+        return datetime.date.fromisoformat(fir_date).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+PERIOD_LENGTHS = {'day': 10, 'month': 7, 'year': 4}  # Length of the YYYY-MM-DD prefix labelling a period
+
+class DateIndex:
+    """FIR keys by FIR date, for date range queries and per day/month/year counts.
+
+    The distinct dates in use are kept as a sorted list of ordinals, so the dates in a
+    range are found with two bisections; each date maps to the keys of its FIRs. There are
+    only a few thousand distinct dates however many FIRs there are, so keeping the list
+    sorted on every change is cheap. FIRs without a valid date aren't indexed.
+    """
+
+    def __init__(self):
+        self.ordinals = []        # Sorted distinct date ordinals
+        self.keys_by_ordinal = {} # date ordinal -> set of keys
+
+    def __len__(self):
+        return sum(len(keys) for keys in self.keys_by_ordinal.values())
+
+    def add(self, fir_date, key):
+        ordinal = date_ordinal(fir_date)
+        if ordinal is None:
+            return
+        keys = self.keys_by_ordinal.get(ordinal)
+        if keys is None:
+            keys = self.keys_by_ordinal[ordinal] = set()
+            bisect.insort(self.ordinals, ordinal)
+        keys.add(key)
+
+    def remove(self, fir_date, key):
+        ordinal = date_ordinal(fir_date)
+        keys = self.keys_by_ordinal.get(ordinal)
+        if keys is None:
+            return
+        keys.discard(key)
+        if not keys:
+            del self.keys_by_ordinal[ordinal]
+            del self.ordinals[bisect.bisect_left(self.ordinals, ordinal)]
+
+    def _span(self, date_from='', date_to=''):
+        """Returns the slice of self.ordinals within [date_from, date_to]; empty bounds are open."""
+        start = bisect.bisect_left(self.ordinals, datetime.date.fromisoformat(date_from).toordinal()) if date_from else 0
+        end = bisect.bisect_right(self.ordinals, datetime.date.fromisoformat(date_to).toordinal()) if date_to else len(self.ordinals)
+        return self.ordinals[start:end]
+
+    def count(self, date_from='', date_to=''):
+        """Number of FIRs dated within [date_from, date_to] (YYYY-MM-DD, inclusive)."""
+        return sum(len(self.keys_by_ordinal[ordinal]) for ordinal in self._span(date_from, date_to))
+
+    def keys(self, date_from='', date_to=''):
+        """Returns the set of keys of the FIRs dated within [date_from, date_to]."""
+        keys = set()
+        for ordinal in self._span(date_from, date_to):
+            keys |= self.keys_by_ordinal[ordinal]
+        return keys
+
+    def counts(self, period='day', date_from='', date_to=''):
+        """Returns {period label: FIR count} in date order, e.g. {'2024-01': 31, ...} for period='month'."""
+        label_length = PERIOD_LENGTHS[period]
+        counts = {}
+        for ordinal in self._span(date_from, date_to):
+            label = datetime.date.fromordinal(ordinal).isoformat()[:label_length]
+            counts[label] = counts.get(label, 0) + len(self.keys_by_ordinal[ordinal])
+        return counts
+
+class NameIndex(SubstringIndex):
+    """SubstringIndex over a name field that can also match names approximately (fir_fuzzy.py)."""
+
+    def __init__(self, max_gram=3):
+        super().__init__(max_gram)
+        self.words = TokenMatcher()
+        self.values_by_word = {}  # word -> set of lowercased values containing it
+
+    def _add_value(self, value):
+        super()._add_value(value)
+        for word in set(name_tokens(value)):
+            values = self.values_by_word.get(word)
+            if values is None:
+                values = self.values_by_word[word] = set()
+                self.words.add(word)
+            values.add(value)
+
+    def _remove_value(self, value):
+        super()._remove_value(value)
+        for word in set(name_tokens(value)):
+            values = self.values_by_word[word]
+            values.discard(value)
+            if not values:
+                del self.values_by_word[word]
+                self.words.remove(word)
+
+    def fuzzy_search(self, query):
+        """Returns {FIR key: cost} for names matching every word of query, spelling variants included.
+
+        The cost is the total edit distance between the query's words and the name's.
+        """
+        costs_per_word = []
+        for query_word in name_tokens(query):
+            costs = {}
+            for word, distance in self.words.similar(query_word).items():
+                for value in self.values_by_word[word]:
+                    if distance < costs.get(value, distance + 1):
+                        costs[value] = distance
+            costs_per_word.append(costs)
+        keys = {}
+        for value, cost in combine_costs(costs_per_word).items():
+            for key in self.keys_by_value[value]:
+                keys[key] = cost
+        return keys
+
+class FIRIndex:
+    """In-memory secondary indexes over the CNIC-keyed FIR data.
+
+    FIRs are identified by (cnic, fir_number) keys. The index has to be told about every
+    change made to the data (add() for registrations and updates, remove() for deletions),
+    which also keeps its statistics counters (fir_stats.py) current. Exact-match criteria are
+    answered from posting lists (value -> set of keys), which search() intersects smallest first.
+    """
+
+    def __init__(self):
+        self.records = {}         # (cnic, fir_number) -> FIR dict
+        self._order = {}          # (cnic, fir_number) -> insertion number, kept across updates
+        self._keys_by_order = {}  # insertion number -> (cnic, fir_number)
+        self._orders = []         # Insertion numbers in ascending order, including removed ones until compacted
+        self._removed_orders = 0
+        self._next_order = 1
+        self.by_cnic = {}         # cnic -> set of keys
+        self.by_fir_number = {}   # lowercased FIR number -> set of keys
+        self.by_section = {}      # section code -> set of keys
+        self.by_act = {}          # lowercased act of any of the FIR's sections (from laws) -> set of keys
+        self.by_bail_status = {}  # lowercased bail status -> set of keys
+        self.names = {field: NameIndex() for field in NAME_FIELDS}  # Accused and complainant names and father names
+        self.by_date = DateIndex()
+        self.stats = FIRStats()
+
+    def __len__(self):
+        return len(self.records)
+
+    def rebuild(self, data):
+        """Indexes every FIR in data in a single pass."""
+        for cnic, fir_list in data.items():
+            for fir_detail in fir_list:
+                self.add(cnic, fir_detail)
+
+    def add(self, cnic, fir_detail):
+        """Indexes a newly registered FIR, or re-indexes an updated one."""
+        key = (cnic, fir_detail.get('fir_number', ''))
+        if key in self.records:
+            self._unindex(key, self.records[key])
+        else:
+            self._order[key] = self._next_order
+            self._keys_by_order[self._next_order] = key
+            self._orders.append(self._next_order)
+            self._next_order += 1
+        self.records[key] = fir_detail
+        for postings, value in self._postings(key, fir_detail):
+            postings.setdefault(value, set()).add(key)
+        for field, name_index in self.names.items():
+            name_index.add(fir_detail.get(field, ''), key)
+        self.by_date.add(fir_detail.get('fir_date'), key)
+        self.stats.add(key[0], fir_detail)
+
+    def remove(self, cnic, fir_number):
+        """Drops a deleted FIR from the indexes."""
+        key = (cnic, fir_number)
+        fir_detail = self.records.pop(key, None)
+        if fir_detail is None:
+            return
+        del self._keys_by_order[self._order.pop(key)]
+        self._removed_orders += 1
+        if self._removed_orders > len(self._orders) // 2:
+            self._orders = [order for order in self._orders if order in self._keys_by_order]
+            self._removed_orders = 0
+        self._unindex(key, fir_detail)
+
+    def page(self, after=0, limit=50):
+        """Returns (firs, last) for up to limit FIRs registered after insertion number `after`.
+
+        last is the insertion number of the page's last FIR, or None if no FIRs follow it.
+        FIRs removed or added between two pages don't shift the later ones.
+        """
+        firs, last = [], None
+        for i in range(bisect.bisect_right(self._orders, after), len(self._orders)):
+            key = self._keys_by_order.get(self._orders[i])
+            if key is None:
+                continue
+            if len(firs) == limit:
+                return firs, last
+            firs.append(self.records[key])
+            last = self._orders[i]
+        return firs, None
+
+    def _postings(self, key, fir_detail):
+        """Yields (posting lists, value) for every exact-match index entry of an FIR."""
+        yield self.by_cnic, key[0]
+        yield self.by_fir_number, key[1].lower()
+        yield self.by_bail_status, (fir_detail.get('bail_status') or '').lower()
+        sections = set(fir_detail.get('sections') or ())
+        for section in sections:
+            yield self.by_section, section
+        for act in {laws[section]['act'].lower() for section in sections if section in laws}:
+            yield self.by_act, act
+
+    def _unindex(self, key, fir_detail):
+        for postings, value in self._postings(key, fir_detail):
+            keys = postings.get(value)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del postings[value]
+        for field, name_index in self.names.items():
+            name_index.remove(fir_detail.get(field, ''), key)
+        self.by_date.remove(fir_detail.get('fir_date'), key)
+        self.stats.remove(key[0], fir_detail)
+
+    def search(self, cnic='', fir_number='', accused_name='', accused_father_name='',
+               section='', act='', bail_status='', date_from='', date_to='',
+               complainant_name='', complainant_father_name='', fuzzy=False):
+        """Returns the FIRs matching every non-empty criterion, in registration order.
+
+        CNIC, FIR number, section, act and bail status must match exactly (all but CNIC and
+        section case-insensitively); the names match on a case-insensitive substring.
+        date_from/date_to (YYYY-MM-DD, inclusive) restrict the FIR date; FIRs without a valid
+        date never match them. With fuzzy=True the names match approximately instead, and the
+        closest matches come first.
+        """
+        candidates = []
+        if cnic:
+            candidates.append(self.by_cnic.get(cnic, set()))
+        if fir_number:
+            candidates.append(self.by_fir_number.get(fir_number.lower(), set()))
+        if section:
+            candidates.append(self.by_section.get(section, set()))
+        if act:
+            candidates.append(self.by_act.get(act.lower(), set()))
+        if bail_status:
+            candidates.append(self.by_bail_status.get(bail_status.lower(), set()))
+        name_queries = {'accused_name': accused_name, 'accused_father_name': accused_father_name,
+                        'complainant_name': complainant_name, 'complainant_father_name': complainant_father_name}
+        name_costs = []
+        for field, query in name_queries.items():
+            if query and fuzzy:
+                name_costs.append(self.names[field].fuzzy_search(query))
+                candidates.append(set(name_costs[-1]))
+            elif query:
+                candidates.append(self.names[field].search(query))
+        dated = date_from or date_to
+        if dated and (not candidates or self.by_date.count(date_from, date_to) < min(map(len, candidates))):
+            candidates.append(self.by_date.keys(date_from, date_to))
+            dated = False # The range is one of the candidate sets
+        if not candidates:
+            return []
+        candidates.sort(key=len)
+        metrics.count('search.scanned', len(candidates[0])) # Every other criterion is checked against these
+        keys = candidates[0].intersection(*candidates[1:])
+        if dated: # Fewer candidates than FIRs in the range: check their dates directly
+            first = datetime.date.fromisoformat(date_from).toordinal() if date_from else 0
+            last = datetime.date.fromisoformat(date_to).toordinal() if date_to else datetime.date.max.toordinal()
+            keys = [key for key in keys if first <= (date_ordinal(self.records[key].get('fir_date')) or -1) <= last]
+        if name_costs:
+            ranked = sorted(keys, key=lambda key: (sum(costs[key] for costs in name_costs), self._order[key]))
+            return [self.records[key] for key in ranked]
+        return [self.records[key] for key in sorted(keys, key=self._order.__getitem__)]
@@ -0,0 +1,95 @@
+import itertools
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Background Jobs ---
+class BackgroundJobs:
+    """Runs storage and search work off the Tk thread and hands the results back to it.
+
+    Each lane is a single worker thread, so jobs in the same lane run in submission order
+    (e.g. all changes to the data go through the 'io' lane). Finished jobs are queued and
+    their callbacks run on the Tk thread, which polls the queue with master.after.
+
+    Jobs submitted with a supersede key replace any earlier job with the same key: a job
+    that hasn't started yet is cancelled, and the result of one already running is dropped.
+    """
+
+    def __init__(self, master, on_busy_change=None, poll_interval=50):
+        self.master = master
+        self.on_busy_change = on_busy_change  # Called with True/False when work starts/stops
+        self.poll_interval = poll_interval
+        self._lanes = {}
+        self._results = queue.Queue()
+        self._job_ids = itertools.count(1)
+        self._latest = {}    # supersede key -> (job id, future) of the newest job with that key
+        self._pending = 0
+        self._closed = False
+        self._poll_id = self.master.after(self.poll_interval, self._poll)
+
+    def submit(self, fn, *args, on_done=None, on_error=None, lane='io', supersede=None):
+        """Runs fn(*args) in the given lane; on_done(result) or on_error(exc) runs on the Tk thread."""
+        if self._closed:
+            return None
+        job_id = next(self._job_ids)
+        self._pending += 1
+        if self._pending == 1 and self.on_busy_change:
+            self.on_busy_change(True)
+        if supersede is not None and supersede in self._latest:
+            _, previous = self._latest[supersede]
+            if previous.cancel():
+                self._job_finished()
+        executor = self._lanes.get(lane)
+        if executor is None:
+            executor = self._lanes[lane] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"fir-{lane}")
+        future = executor.submit(self._run, job_id, fn, args, on_done, on_error, supersede)
+        if supersede is not None:
+            self._latest[supersede] = (job_id, future)
+        return job_id
+
+    def call_soon(self, callback, *args):
+        """Runs callback(*args) on the Tk thread; safe to call from a job, e.g. to report progress."""
+        self._results.put((None, None, callback, args))
+
+    def _run(self, job_id, fn, args, on_done, on_error, supersede):
+        try:
+            result = fn(*args)
+        except Exception as e:
+            self._results.put((job_id, supersede, on_error, e))
+        else:
+            self._results.put((job_id, supersede, on_done, result))
+
+    def _poll(self):
+        try:
+            while True:
+                job_id, supersede, callback, value = self._results.get_nowait()
+                if job_id is None: # Posted with call_soon
+                    callback(*value)
+                    continue
+                self._job_finished()
+                if supersede is not None:
+                    latest_id, _ = self._latest.get(supersede, (None, None))
+                    if latest_id != job_id:
+                        continue # A newer job with the same key replaced this one
+                    del self._latest[supersede]
+                if callback:
+                    callback(value)
+        except queue.Empty:
+            pass
+        if not self._closed:
+            self._poll_id = self.master.after(self.poll_interval, self._poll)
+
+    def _job_finished(self):
+        self._pending -= 1
+        if self._pending == 0 and self.on_busy_change:
+            self.on_busy_change(False)
+
+    @property
+    def busy(self):
+        return self._pending > 0
+
+    def shutdown(self):
+        """Waits for queued work (e.g. pending saves) to finish and stops polling."""
+        self._closed = True
+        self.master.after_cancel(self._poll_id)
+        for executor in self._lanes.values():
+            executor.shutdown(wait=True)
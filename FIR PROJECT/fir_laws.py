@@ -0,0 +1,87 @@
+# --- Expanded Pakistan Laws Dictionary (as provided) ---
+laws = {
+    # --- Pakistan Penal Code (PPC) ---
+    "302": {"act": "PPC", "title": "Murder", "punishment": "Death, life imprisonment, and fine"},
+    "324": {"act": "PPC", "title": "Attempt to Murder", "punishment": "Up to 10 years or life imprisonment, and/or fine"},
+    "337A": {"act": "PPC", "title": "Hurt (Simple)", "punishment": "Up to 1 year imprisonment or fine"},
+    "337L(2)": {"act": "PPC", "title": "Rash or Negligent Act Causing Hurt", "punishment": "Up to 2 years imprisonment or fine"},
+    "382": {"act": "PPC", "title": "Theft after preparation for causing death/hurt/restraint", "punishment": "Up to 10 years and fine"},
+    "392": {"act": "PPC", "title": "Robbery", "punishment": "Up to 10 years and fine; if committed on highway, up to 14 years and fine"},
+    "406": {"act": "PPC", "title": "Criminal Breach of Trust", "punishment": "Up to 7 years and fine"},
+    "420": {"act": "PPC", "title": "Cheating and dishonestly inducing delivery of property", "punishment": "Up to 7 years and fine"},
+    "447": {"act": "PPC", "title": "Criminal Trespass", "punishment": "Up to 3 months or fine"},
+    "452": {"act": "PPC", "title": "House-trespass after preparation for hurt, assault or wrongful restraint", "punishment": "Up to 10 years and fine"},
+    "506": {"act": "PPC", "title": "Criminal Intimidation", "punishment": "Up to 2 years or fine"},
+    "186": {"act": "PPC", "title": "Obstructing Public Servant", "punishment": "Up to 3 months or fine up to PKR 50,000"},
+    "147": {"act": "PPC", "title": "Rioting", "punishment": "Up to 2 years or fine"},
+    "109": {"act": "PPC", "title": "Abetment", "punishment": "Same as for the main offence, and fine"},
+    "295C": {"act": "PPC", "title": "Blasphemy (Defiling Holy Prophet)", "punishment": "Death or life imprisonment, and fine"},
+    "295A": {"act": "PPC", "title": "Deliberate and malicious acts intended to outrage religious feelings", "punishment": "Up to 10 years or fine"},
+    "298C": {"act": "PPC", "title": "Qadiani/Ahmadi posing as Muslim", "punishment": "Imprisonment up to 3 years and fine"},
+    "365": {"act": "PPC", "title": "Kidnapping or abducting with intent secretly and wrongfully to confine person", "punishment": "Up to 7 years and fine"},
+    "376": {"act": "PPC", "title": "Rape", "punishment": "Death or imprisonment for life or rigorous imprisonment up to 25 years, and fine"},
+
+    # --- Anti-Terrorism Act (ATA) ---
+    "6ATA": {"act": "ATA", "title": "Definition of Terrorism", "punishment": "Varies by act; includes death, life imprisonment, and confiscation of property"},
+    "7ATA": {"act": "ATA", "title": "Punishment for Terrorist Act", "punishment": "Death, life imprisonment or confiscation, and fine"},
+    "11EATA": {"act": "ATA", "title": "Proscription of organizations", "punishment": "Strict penalties for membership/support, and fine"},
+    "11WATA": {"act": "ATA", "title": "Hate Speech", "punishment": "Up to 7 years, fine, and forfeiture of property"},
+    "21ATA": {"act": "ATA", "title": "Collection of funds for terrorist purposes", "punishment": "Up to 14 years and fine"},
+
+    # --- Prevention of Electronic Crimes Act (PECA) ---
+    "3PECA": {"act": "PECA", "title": "Unauthorized Access (Hacking)", "punishment": "Up to 3 years or fine or both"},
+    "4PECA": {"act": "PECA", "title": "Unauthorized Copying or Transmission of Data", "punishment": "Up to 2 years or fine or both"},
+    "11PECA": {"act": "PECA", "title": "Cyberstalking", "punishment": "3 years imprisonment and/or fine"},
+    "14PECA": {"act": "PECA", "title": "Electronic Fraud", "punishment": "Up to 7 years imprisonment or fine or both"},
+    "20PECA": {"act": "PECA", "title": "Offences against dignity of a natural person (Defamation)", "punishment": "3 years + 1 million fine"},
+    "21PECA": {"act": "PECA", "title": "Offences against modesty of a natural person and minor", "punishment": "Up to 7 years, fine, and confiscation"},
+    "24PECA": {"act": "PECA", "title": "Spoofing (SMS/Email)", "punishment": "Up to 3 years or fine or both"},
+    "37PECA": {"act": "PECA", "title": "Unlawful Online Content", "punishment": "Removal, blocking, and potential legal action, and fine"},
+
+    # --- Code of Criminal Procedure (CrPC) ---
+    "54CrPC": {"act": "CrPC", "title": "Arrest without warrant (Cognizable Offence)", "punishment": "Procedure for arrest, not a crime in itself"},
+    "61CrPC": {"act": "CrPC", "title": "Detention Limit", "punishment": "Cannot detain beyond 24 hrs without magistrate's order"},
+    "154CrPC": {"act": "CrPC", "title": "Recording of FIR", "punishment": "Police must record FIR for cognizable offense"},
+    "164CrPC": {"act": "CrPC", "title": "Recording of Confession/Statement", "punishment": "Procedure for recording evidence"},
+    "173CrPC": {"act": "CrPC", "title": "Police Report (Challan)", "punishment": "Procedure for submitting investigation report"},
+
+    # --- Control of Narcotic Substances Act (CNSA) ---
+    "6CNSA": {"act": "CNSA", "title": "Prohibition of possession of narcotic drugs, etc.", "punishment": "Varies significantly by quantity/type, from 2 years to death, and heavy fine"},
+    "9CNSA": {"act": "CNSA", "title": "Drug Possession (General)", "punishment": "Imprisonment up to lifetime + fine, varies by quantity"},
+    "8CNSA": {"act": "CNSA", "title": "Trafficking or financing trafficking of narcotic substances", "punishment": "Minimum 2 years to death depending on quantity, and heavy fine"},
+
+    # --- Foreigners Act (FA) ---
+    "3FA": {"act": "Foreigners Act", "title": "Restriction of entry, stay and departure", "punishment": "Deportation, imprisonment, and fine"},
+    "14FA": {"act": "Foreigners Act", "title": "Illegal Entry/Overstay", "punishment": "Deportation or 3 years jail and/or fine up to PKR 10,000"},
+
+    # --- NAB Ordinance (National Accountability Ordinance) ---
+    "9NAB": {"act": "NAB Ordinance", "title": "Corruption & Corrupt Practices (General)", "punishment": "Up to 14 years max + fine, and disqualification from public office"},
+    "10NAB": {"act": "NAB Ordinance", "title": "Reference for investigation/trial", "punishment": "Procedure, not a punishment itself"},
+
+    # --- Motor Vehicle Ordinance (MVO) ---
+    "279MVO": {"act": "MVO", "title": "Rash Driving or Riding on a Public Way", "punishment": "Up to 2 years + fine"},
+    "99MVO": {"act": "MVO", "title": "Driving without License", "punishment": "Fine up to PKR 5000 and/or short imprisonment"},
+    "116MVO": {"act": "MVO", "title": "Disobedience of orders", "punishment": "Fine and/or short imprisonment"},
+
+    # --- Arms Ordinance (AO) ---
+    "13AO": {"act": "Arms Ordinance", "title": "Possession of illicit arms", "punishment": "Up to 7 years imprisonment or fine or both"},
+    "13AOA": {"act": "Arms Ordinance", "title": "Prohibition of automatic weapons", "punishment": "Strict penalties, and fine"},
+
+    #  Maintenance of Public Order (MPO) ---
+    "3MPO": {"act": "MPO", "title": "Power to arrest and detain suspected persons", "punishment": "Up to 3 months detention (extendable)"},
+    "16MPO": {"act": "MPO", "title": "Disobedience to order duly promulgated by public servant", "punishment": "Up to 6 months or fine"},
+
+    #  Prevention of Corruption Act (PCA) ---
+    "5PCA": {"act": "PCA", "title": "Criminal misconduct by public servant", "punishment": "Up to 7 years and/or fine"},
+
+    #  Qanun-e-Shahadat Order (QSO - Law of Evidence) ---
+    "3QSO": {"act": "QSO", "title": "Competency of Witnesses", "punishment": "Admissibility of evidence, not a crime"},
+    "129QSO": {"act": "QSO", "title": "Estoppel", "punishment": "Legal principle, not a crime"},
+    "163QSO": {"act": "QSO", "title": "Electronic Evidence", "punishment": "Admissibility of electronic records"},
+
+    # Customs Act (CA)
+    "156CA": {"act": "Customs Act", "title": "Offences and Penalties (Smuggling)", "punishment": "Imprisonment, fine, and confiscation of goods"},
+
+    #  Anti-Money Laundering Act (AMLA)
+    "3AMLA": {"act": "AMLA", "title": "Offence of Money Laundering", "punishment": "3 to 10 years imprisonment and fine up to 100 million rupees"},
+}
@@ -0,0 +1,159 @@
+import atexit
+import contextlib
+import contextvars
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+from fir_metrics import metrics
+
+# --- Logging ---
+# Every module logs through get_logger(__name__), below the 'fir' logger. configure_logging()
+# hands those records to a bounded queue that a listener thread drains into the console and a
+# rotating log file, so a log call costs its caller one put_nowait and never waits on a disk,
+# a terminal or a full queue: records that don't fit are dropped and counted as 'log.dropped'.
+# Until it is called, only warnings and errors are shown, on stderr (Python's default).
+#
+# FIR changes run as operations. Each gets an id that every record logged inside it carries,
+# and its end is logged with how long it took:
+#
+#   with operation('delete_fir', cnic=cnic, fir_number=fir_number) as fields:
+#       fields['deleted'] = backend.delete_fir(cnic, fir_number)
+#
+# The log file has one JSON object per line: time, level, logger, op_id, message, and the
+# fields of the operation (op, duration_ms, outcome and those passed in or set in the block).
+
+LOGGER_NAME = 'fir'
+CONSOLE_FORMAT = '[%(asctime)s] %(levelname)s %(message)s'
+QUEUE_SIZE = 10000  # Records waiting for the listener; more are dropped
+
+_current_op_id = contextvars.ContextVar('fir_op_id', default=None)
+_op_numbers = itertools.count(1)
+_OP_PREFIX = f"{os.getpid():x}"  # Keeps the ids of processes sharing the data files apart
+_listener = None
+
+def get_logger(name):
+    """Returns the logger of a module, e.g. get_logger('fir_backends') -> 'fir.backends'."""
+    if name.startswith('fir_'):
+        name = name[len('fir_'):]
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+log = get_logger('operations')
+
+def current_op_id():
+    """Id of the operation running in this thread (or task), or None."""
+    return _current_op_id.get()
+
+@contextlib.contextmanager
+def operation(name, **fields):
+    """Runs a with block as one logged operation; it yields fields, which the block may add to.
+
+    Records logged in the block carry the operation's id. An operation started inside another
+    one shares its id, and its end is only logged at DEBUG level.
+    """
+    op_id = _current_op_id.get()
+    outermost = op_id is None
+    if outermost:
+        op_id = f"{_OP_PREFIX}-{next(_op_numbers)}"
+    token = _current_op_id.set(op_id)
+    fields = dict(fields)
+    outcome = 'ok'
+    started = time.perf_counter()
+    try:
+        yield fields
+    except BaseException as e:
+        outcome = 'failed'
+        fields['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        level = logging.DEBUG if not outermost else logging.INFO if outcome == 'ok' else logging.WARNING
+        if log.isEnabledFor(level):
+            details = " ".join(f"{key}={value}" for key, value in fields.items())
+            log.log(level, "%s %s in %.2f ms %s", name, outcome, duration_ms, details,
+                    extra={'fields': {'op': name, 'duration_ms': round(duration_ms, 3), 'outcome': outcome, **fields}})
+        _current_op_id.reset(token)
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats a record as one JSON object (see the top of this module)."""
+
+    def format(self, record):
+        entry = {
+            "time": f"{self.formatTime(record, '%Y-%m-%d %H:%M:%S')}.{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "op_id": getattr(record, 'op_id', None),
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class _BoundedQueueHandler(logging.handlers.QueueHandler):
+    """Stamps records with the current op_id and queues them unformatted, dropping them when the queue is full."""
+
+    def prepare(self, record):
+        record.op_id = _current_op_id.get()
+        return record # Formatted by the listener's handlers, off the caller's thread
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.count('log.dropped')
+
+class _QueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel) # Waits for room, so no queued record is lost on shutdown
+
+def configure_logging(level='INFO', log_file=None, max_bytes=1_000_000, backup_count=5, console=True, queue_size=QUEUE_SIZE):
+    """Sends the records at level and above to stderr (if console) and to log_file, rotated at max_bytes.
+
+    The last backup_count rotated files are kept as log_file.1 ... .N. Calling this again
+    replaces the previous configuration; shutdown_logging() (also run at exit) ends it.
+    """
+    global _listener
+    shutdown_logging()
+    handlers = []
+    if console:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter(CONSOLE_FORMAT, '%H:%M:%S'))
+        handlers.append(handler)
+    if log_file:
+        handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        handler.setFormatter(JsonLinesFormatter())
+        handlers.append(handler)
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    logger.addHandler(_BoundedQueueHandler(queue.Queue(queue_size)))
+    logger.propagate = False
+    _listener = _QueueListener(logger.handlers[-1].queue, *handlers)
+    _listener.start()
+
+def shutdown_logging():
+    """Writes out the queued records and stops the listener thread; later records go to stderr again."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        if isinstance(handler, _BoundedQueueHandler):
+            logger.removeHandler(handler)
+    logger.propagate = True
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+atexit.register(shutdown_logging)
+
+def add_logging_arguments(parser):
+    """Adds the --log-level and --log-file options (used by configure_logging) to parser."""
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], type=str.upper)
+    parser.add_argument('--log-file', help="also log to this file, as JSON Lines, rotated every megabyte")
@@ -0,0 +1,233 @@
+import bisect
+import cProfile
+import io
+import json
+import pstats
+import statistics
+import threading
+import time
+import tracemalloc
+
+# --- Instrumentation ---
+# Latency histograms and counters for the operations the application spends its time in (load,
+# save, FIR numbering, searches, rendering, changes). Everything records into the module-level
+# `metrics`; the GUI shows it in its debug panel, and it can be dumped as JSON.
+#
+#   with metrics.timed('save') as counts:
+#       counts['bytes'] = write_snapshot(...)    # Adds to the counter 'save.bytes'
+#
+# While profiling is switched on, every timed block is also run under cProfile, and tracemalloc
+# traces allocations, so the report shows where the time and memory of those operations went.
+
+BUCKET_BOUNDS_MS = [0.01 * 2 ** i for i in range(25)]  # 0.01 ms ... ~168 s, doubling
+
+class Histogram:
+    """Latency histogram with doubling buckets; percentiles are read off the buckets."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)  # The last one holds everything slower
+
+    def add(self, ms):
+        self.count += 1
+        self.total_ms += ms
+        if self.min_ms is None or ms < self.min_ms:
+            self.min_ms = ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of the samples (at most the maximum)."""
+        needed = fraction * self.count
+        seen = 0
+        for bound, in_bucket in zip(BUCKET_BOUNDS_MS, self.buckets):
+            seen += in_bucket
+            if seen >= needed:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "min_ms": round(self.min_ms or 0.0, 3),
+            "p50_ms": round(self.percentile(0.5), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "p99_ms": round(self.percentile(0.99), 3),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+class Metrics:
+    """Thread-safe registry of named latency histograms and counters."""
+
+    def __init__(self):
+        self.enabled = True
+        self.timings = {}   # name -> Histogram
+        self.counters = {}  # name -> number
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._profile_stats = None            # pstats.Stats collected while profiling, or None when off
+        self._profile_lock = threading.Lock() # cProfile can only follow one block at a time
+        self._profiled_blocks = 0
+        self._owns_tracemalloc = False        # Whether start_profiling() started tracemalloc (and stop_profiling() stops it)
+        self.last_profile = None              # Report of the last profiling session
+
+    def record(self, name, seconds, **counts):
+        """Adds a duration to name's histogram and counts to the counters 'name.key'."""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.timings.get(name)
+            if histogram is None:
+                histogram = self.timings[name] = Histogram()
+            histogram.add(seconds * 1000)
+            for key, value in counts.items():
+                counter = f"{name}.{key}"
+                self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def timed(self, name):
+        """Times a with block under name; it yields a dict whose entries are added to the counters as name.key.
+
+        A block that raises is still timed, and counted under name.errors.
+        """
+        return _Timer(self, name)
+
+    def snapshot(self):
+        """Returns everything recorded so far as plain, JSON-ready dicts."""
+        with self._lock:
+            timings = {name: histogram.summary() for name, histogram in sorted(self.timings.items())}
+            counters = dict(sorted(self.counters.items()))
+        return {
+            "since": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started)),
+            "timings": timings,
+            "counters": counters,
+            "profiling": self.profiling,
+            "last_profile": self.last_profile,
+        }
+
+    def dump(self, path):
+        """Writes snapshot() to path as JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def reset(self):
+        with self._lock:
+            self.timings = {}
+            self.counters = {}
+            self.started = time.time()
+
+    # --- Profiling ---
+    @property
+    def profiling(self):
+        return self._profile_stats is not None
+
+    def start_profiling(self):
+        """Profiles every timed block (cProfile) and traces allocations (tracemalloc) until stop_profiling()."""
+        with self._lock:
+            if self._profile_stats is not None:
+                return
+            self._profile_stats = pstats.Stats() # Empty; blocks are added as they finish
+            self._profiled_blocks = 0
+        self._owns_tracemalloc = not tracemalloc.is_tracing()
+        if self._owns_tracemalloc:
+            tracemalloc.start(10)
+
+    def stop_profiling(self, top=25, profile_file=None):
+        """Ends profiling and returns (and keeps as last_profile) its report.
+
+        The report lists the functions with the most cumulative time and the lines that
+        allocated the most memory still in use. profile_file also saves the raw cProfile data.
+        """
+        with self._lock:
+            stats, self._profile_stats = self._profile_stats, None
+        if stats is None:
+            return self.last_profile
+        report = {"profiled_blocks": self._profiled_blocks, "functions": "", "memory": {}}
+        if self._profiled_blocks:
+            out = io.StringIO()
+            stats.stream = out
+            stats.sort_stats('cumulative').print_stats(top)
+            report["functions"] = out.getvalue()
+            if profile_file:
+                stats.dump_stats(profile_file)
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            allocations = tracemalloc.take_snapshot().statistics('lineno')[:top]
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+            report["memory"] = {
+                "current_kb": round(current / 1024, 1),
+                "peak_kb": round(peak / 1024, 1),
+                "top_allocations": [f"{stat.traceback}: {stat.size / 1024:.1f} KiB in {stat.count} blocks" for stat in allocations],
+            }
+        self.last_profile = report
+        return report
+
+    def _start_block_profile(self):
+        if self._profile_stats is None or not self._profile_lock.acquire(blocking=False):
+            return None # Not profiling, or another block (maybe an enclosing one) is being profiled
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError: # Another profiler is active
+            self._profile_lock.release()
+            return None
+        return profile
+
+    def _end_block_profile(self, profile):
+        profile.disable()
+        self._profile_lock.release()
+        with self._lock:
+            if self._profile_stats is not None:
+                self._profile_stats.add(profile)
+                self._profiled_blocks += 1
+
+class _Timer:
+    """The context manager of Metrics.timed(); a class rather than a generator, to keep hot paths cheap."""
+
+    __slots__ = ('metrics', 'name', 'counts', 'profile', 'started')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.counts = {}
+
+    def __enter__(self):
+        self.profile = self.metrics._start_block_profile() if self.metrics._profile_stats is not None else None
+        self.started = time.perf_counter()
+        return self.counts
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = time.perf_counter() - self.started
+        if self.profile is not None:
+            self.metrics._end_block_profile(self.profile)
+        if exc_type is not None:
+            self.counts['errors'] = self.counts.get('errors', 0) + 1
+        self.metrics.record(self.name, elapsed, **self.counts)
+        return False
+
+metrics = Metrics()
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def summarize_timings(samples):
+    """Summarizes exact durations in seconds (e.g. benchmark or load test runs) as runs, median, p95 and max in ms."""
+    return {
+        "runs": len(samples),
+        "median_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(_percentile(samples, 0.95) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3),
+    }
@@ -0,0 +1,106 @@
+import sys
+from collections.abc import Mapping
+
+# Field order of an FIR entry, as stored in fir_data.json
+FIR_FIELDS = ["fir_number", "complainant_name", "complainant_father_name", "accused_name",
+              "accused_father_name", "cnic", "reason", "fir_date", "sections", "bail_status", "punishment"]
+
+# --- Compact FIR Records ---
+# Holding millions of FIRs as dicts costs far more in dict overhead and duplicate strings than
+# the data itself. FIRRecord keeps one FIR in fixed slots instead. Fields with few distinct
+# values are stored as integer codes into shared string tables, and the remaining strings are
+# interned so repeated names share one object. Records are read-only Mappings, so code that
+# reads FIRs as dicts (fir['cnic'], fir.get('reason', 'N/A'), dict(fir), json) keeps working.
+
+class StringTable:
+    """Maps repeated values to small integer codes and back."""
+
+    def __init__(self):
+        self.values = []  # code -> value
+        self.codes = {}   # value -> code
+
+    def __len__(self):
+        return len(self.values)
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, code):
+        return self.values[code]
+
+CODED_FIELDS = frozenset(["complainant_father_name", "accused_father_name", "fir_date", "bail_status", "punishment"])
+INTERNED_FIELDS = frozenset(["complainant_name", "accused_name", "cnic", "reason"])
+_FIELD_SET = frozenset(FIR_FIELDS)
+_MISSING = object()
+
+class FIRRecord(Mapping):
+    """One FIR in 11 slots, read like the dict it was built from."""
+
+    __slots__ = tuple(FIR_FIELDS)
+
+    string_table = StringTable()   # Codes of CODED_FIELDS values, shared by all records
+    section_table = StringTable()  # Codes of distinct section tuples, e.g. ('302', '34')
+
+    def __init__(self, fir_entry):
+        set_slot = object.__setattr__
+        for field, value in fir_entry.items():
+            if field in CODED_FIELDS:
+                value = FIRRecord.string_table.encode(value)
+            elif field == 'sections':
+                value = FIRRecord.section_table.encode(tuple(value))
+            elif field in INTERNED_FIELDS and type(value) is str:
+                value = sys.intern(value)
+            set_slot(self, field, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FIRRecord is read-only; store a new record instead")
+
+    def _get(self, field):
+        value = getattr(self, field, _MISSING)
+        if value is _MISSING:
+            return value
+        if field in CODED_FIELDS:
+            return FIRRecord.string_table.decode(value)
+        if field == 'sections':
+            return list(FIRRecord.section_table.decode(value))
+        return value
+
+    def __getitem__(self, field):
+        value = self._get(field) if field in _FIELD_SET else _MISSING
+        if value is _MISSING:
+            raise KeyError(field)
+        return value
+
+    def __iter__(self):
+        return (field for field in FIR_FIELDS if hasattr(self, field))
+
+    def __len__(self):
+        return sum(1 for field in FIR_FIELDS if hasattr(self, field))
+
+    def __repr__(self):
+        return f"FIRRecord({dict(self)!r})"
+
+def compact_record(fir_entry):
+    """Returns fir_entry as a FIRRecord, or unchanged if it can't be represented as one.
+
+    FIRs carrying fields outside FIR_FIELDS, or sections that aren't a list of strings,
+    stay dicts so that nothing is lost.
+    """
+    if isinstance(fir_entry, FIRRecord):
+        return fir_entry
+    if not _FIELD_SET.issuperset(fir_entry):
+        return fir_entry
+    sections = fir_entry.get('sections', [])
+    if not isinstance(sections, list) or not all(isinstance(section, str) for section in sections):
+        return fir_entry
+    if not all(isinstance(fir_entry[field], str) for field in CODED_FIELDS if field in fir_entry):
+        return fir_entry
+    return FIRRecord(fir_entry)
+
+def fir_object_hook(obj):
+    """json object_hook that builds compact records for FIRs as a file is parsed."""
+    return compact_record(obj) if 'fir_number' in obj else obj
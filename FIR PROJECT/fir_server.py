@@ -0,0 +1,379 @@
+import argparse
+import concurrent.futures
+import dataclasses
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fir_cli import add_storage_arguments, open_store
+from fir_logging import add_logging_arguments, configure_logging, get_logger
+from fir_metrics import metrics, summarize_timings
+from fir_service import FIRInput, FIRService, SearchQuery, ValidationError
+
+log = get_logger(__name__)
+
+# --- Local FIR Service ---
+# Serves the FIR service (fir_service.py) over HTTP/JSON on this machine, so several lawyers'
+# clients share one store instead of each rewriting the data files behind the others' backs.
+# Every request runs on its own thread: reads run concurrently (on pooled connections with the
+# sqlite backend), while changes are serialized, since registering looks up and assigns the FIR
+# number before storing the FIR.
+#
+#   GET    /health                              FIR count
+#   GET    /firs?cnic=&accused_name=&...&fuzzy=1&limit=   search (SearchQuery fields)
+#   GET    /firs/page?cursor=&limit=            all FIRs, a page at a time
+#   POST   /firs                                register a new FIR (FIRInput fields; any fir_number is ignored)
+#   GET    /fir?cnic=&fir_number=               one FIR
+#   PUT    /fir                                 update the FIR with the body's cnic and fir_number
+#   DELETE /fir?cnic=&fir_number=               delete one FIR
+#   GET    /sections?act=&q=                    law section lookup
+#   GET    /stats?top=, /date-counts?period=&date_from=&date_to=
+#   GET    /metrics                             operation timings and counters (fir_metrics.py)
+#
+# Errors are {"error": message}, plus "errors": {field: message} with 422 for invalid FIRs and
+# with 400 for invalid search criteria or dates.
+
+SEARCH_LIMIT = 100  # FIRs returned by a search unless ?limit= says otherwise
+
+class RequestError(Exception):
+    """Ends a request with an HTTP error status."""
+
+    def __init__(self, status, message, **details):
+        super().__init__(message)
+        self.status = status
+        self.body = {"error": message, **details}
+
+def _int_param(params, name, default):
+    try:
+        return int(params.get(name, default))
+    except ValueError:
+        raise RequestError(400, f"{name} must be a whole number")
+
+def _fir_input(body):
+    if not isinstance(body, dict):
+        raise RequestError(400, "Expected a JSON object")
+    names = {field.name for field in dataclasses.fields(FIRInput)}
+    unknown = body.keys() - names
+    if unknown:
+        raise RequestError(400, f"Unknown fields: {', '.join(sorted(unknown))}")
+    values = {name: body.get(name, "") for name in names}
+    not_text = sorted(name for name, value in values.items() if name != "sections" and not isinstance(value, str))
+    if not_text:
+        raise RequestError(400, f"Fields must be text: {', '.join(not_text)}")
+    sections = values["sections"] or []
+    if isinstance(sections, str) or not all(isinstance(section, str) for section in sections):
+        raise RequestError(400, "sections must be a list of section codes")
+    values["sections"] = tuple(sections)
+    return FIRInput(**values)
+
+class FIRRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so clients reuse their connections
+    disable_nagle_algorithm = True  # Headers and body go out in separate writes; don't hold the body back
+
+    def do_GET(self):
+        self._dispatch(self.server.get_routes)
+
+    def do_POST(self):
+        self._dispatch(self.server.post_routes)
+
+    def do_PUT(self):
+        self._dispatch(self.server.put_routes)
+
+    def do_DELETE(self):
+        self._dispatch(self.server.delete_routes)
+
+    def _dispatch(self, routes):
+        url = urllib.parse.urlsplit(self.path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+        try:
+            body = self._read_body()
+            route = routes.get(url.path)
+            if route is None:
+                raise RequestError(404, f"No such resource: {self.command} {url.path}")
+            with metrics.timed(f"http {self.command} {url.path}"):
+                status, result = route(params, body)
+        except RequestError as e:
+            status, result = e.status, e.body
+        except Exception as e:
+            log.exception("Error in %s %s: %s", self.command, self.path, e)
+            status, result = 500, {"error": str(e)}
+        self._send_json(status, result)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return None
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            raise RequestError(400, "The request body isn't valid JSON")
+
+    def _send_json(self, status, result):
+        payload = json.dumps(result, default=dict).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass  # One line per request would drown the server's own messages
+
+class FIRServer(ThreadingHTTPServer):
+    """HTTP front end of a FIRService; every request runs on its own thread."""
+
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        super().__init__(address, FIRRequestHandler)
+        self.service = service
+        self.write_lock = threading.RLock()  # Changes run one at a time
+        self.get_routes = {"/health": self.health, "/firs": self.search, "/firs/page": self.list_firs,
+                           "/fir": self.get_fir, "/sections": self.sections, "/stats": self.stats,
+                           "/date-counts": self.date_counts, "/metrics": self.show_metrics}
+        self.post_routes = {"/firs": self.register}
+        self.put_routes = {"/fir": self.update}
+        self.delete_routes = {"/fir": self.delete}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def health(self, params, body):
+        return 200, {"status": "ok", "firs": self.service.count()}
+
+    def search(self, params, body):
+        names = {field.name for field in dataclasses.fields(SearchQuery)}
+        criteria = {name: value for name, value in params.items() if name in names}
+        criteria["fuzzy"] = params.get("fuzzy", "").lower() in ("1", "true", "yes")
+        limit = _int_param(params, "limit", SEARCH_LIMIT)
+        try:
+            found_firs = self.service.search(SearchQuery(**criteria))
+        except ValidationError as e:
+            raise RequestError(400, str(e), errors=e.errors)
+        return 200, {"total": len(found_firs), "firs": found_firs[:limit] if limit > 0 else found_firs}
+
+    def list_firs(self, params, body):
+        cursor = _int_param(params, "cursor", 0) or None
+        page = self.service.list_firs(cursor, _int_param(params, "limit", 50))
+        return 200, {"firs": page.firs, "next_cursor": page.next_cursor}
+
+    def get_fir(self, params, body):
+        fir = self.service.get_fir(params.get("cnic", ""), params.get("fir_number", ""))
+        if fir is None:
+            raise RequestError(404, "FIR not found")
+        return 200, fir
+
+    def register(self, params, body):
+        fir_input = dataclasses.replace(_fir_input(body), fir_number="")
+        return 201, self._save(fir_input)
+
+    def update(self, params, body):
+        fir_input = _fir_input(body)
+        with self.write_lock:
+            if not fir_input.fir_number or self.service.get_fir(fir_input.cnic, fir_input.fir_number) is None:
+                raise RequestError(404, "FIR not found")
+            return 200, self._save(fir_input)
+
+    def _save(self, fir_input):
+        try:
+            with self.write_lock:
+                return dataclasses.asdict(self.service.save_fir(fir_input))
+        except ValidationError as e:
+            raise RequestError(422, str(e), errors=e.errors)
+
+    def delete(self, params, body):
+        with self.write_lock:
+            result = self.service.delete_fir(params.get("cnic", ""), params.get("fir_number", ""))
+        return 200 if result.status == "deleted" else 404, dataclasses.asdict(result)
+
+    def sections(self, params, body):
+        return 200, self.service.sections(params.get("act", ""), params.get("q", ""))
+
+    def stats(self, params, body):
+        return 200, self.service.stats(_int_param(params, "top", 10))
+
+    def show_metrics(self, params, body):
+        return 200, metrics.snapshot()
+
+    def date_counts(self, params, body):
+        period = params.get("period", "day")
+        if period not in ("day", "month", "year"):
+            raise RequestError(400, "period must be day, month or year")
+        try:
+            return 200, self.service.date_counts(period, params.get("date_from", ""), params.get("date_to", ""))
+        except ValidationError as e:
+            raise RequestError(400, str(e), errors=e.errors)
+
+# --- Load Test ---
+# Several clients, each on its own keep-alive connection, send a mix of searches, lookups and
+# (with --write-ratio) register/delete pairs as fast as the server answers them.
+
+class FIRClient:
+    """Minimal JSON client of a FIRServer over one keep-alive connection."""
+
+    def __init__(self, url, timeout=30):
+        parts = urllib.parse.urlsplit(url)
+        self.conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+
+    def request(self, method, path, params=None, body=None):
+        """Returns (status, decoded JSON body)."""
+        if params:
+            path += "?" + urllib.parse.urlencode(params)
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        self.conn.request(method, path, payload, headers)
+        response = self.conn.getresponse()
+        return response.status, json.loads(response.read())
+
+    def close(self):
+        self.conn.close()
+
+def _read_requests(rng, sample):
+    fir = rng.choice(sample)
+    name = (fir.get("accused_name") or "a").split()[0]
+    choices = [
+        ("search_cnic", "GET", "/firs", {"cnic": fir["cnic"]}),
+        ("get_fir", "GET", "/fir", {"cnic": fir["cnic"], "fir_number": fir["fir_number"]}),
+        ("search_accused_name", "GET", "/firs", {"accused_name": name[:rng.randint(3, 6)], "limit": 20}),
+        ("search_accused_name_fuzzy", "GET", "/firs", {"accused_name": name, "fuzzy": 1, "limit": 20}),
+    ]
+    if fir.get("sections"):
+        choices.append(("search_section", "GET", "/firs", {"section": rng.choice(fir["sections"]), "limit": 20}))
+    return rng.choice(choices)
+
+def _client_run(url, sample, requests, write_ratio, seed):
+    """Sends requests from one client; returns {operation: [seconds, ...]} and the failed request count."""
+    rng = random.Random(seed)
+    client = FIRClient(url)
+    timings, failures = {}, 0
+
+    def timed(operation, method, path, params=None, body=None):
+        nonlocal failures
+        started = time.perf_counter()
+        status, result = client.request(method, path, params, body)
+        timings.setdefault(operation, []).append(time.perf_counter() - started)
+        if status >= 400:
+            failures += 1
+        return status, result
+
+    try:
+        sent = 0
+        while sent < requests:
+            if rng.random() < write_ratio:
+                template = rng.choice(sample)
+                fir_input = {name: template.get(name) or "" for name in ("complainant_name", "accused_name", "reason", "bail_status")}
+                fir_input.update(cnic=f"{rng.randint(10000, 99999)}-{rng.randint(1000000, 9999999)}-{rng.randint(0, 9)}",
+                                 sections=template.get("sections") or [], fir_date=template.get("fir_date") or "")
+                status, result = timed("register", "POST", "/firs", body=fir_input)
+                if status == 201:
+                    timed("delete", "DELETE", "/fir", {"cnic": result["cnic"], "fir_number": result["fir_number"]})
+                sent += 2
+            else:
+                timed(*_read_requests(rng, sample))
+                sent += 1
+    finally:
+        client.close()
+    return timings, failures
+
+def run_load_test(url, clients=8, requests=200, write_ratio=0.1, seed=0):
+    """Runs requests requests from each of clients concurrent clients against the server at url.
+
+    Queries are built from a sample of the server's own FIRs. Returns the throughput and the
+    latency summary (see fir_bench.py) of each operation.
+    """
+    client = FIRClient(url)
+    try:
+        status, page = client.request("GET", "/firs/page", {"limit": 500})
+    finally:
+        client.close()
+    sample = page["firs"]
+    if not sample:
+        raise ValueError("The server has no FIRs to build queries from")
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=clients) as pool:
+        runs = list(pool.map(lambda i: _client_run(url, sample, requests, write_ratio, seed + i), range(clients)))
+    elapsed = time.perf_counter() - started
+    timings = {}
+    for client_timings, _ in runs:
+        for operation, samples in client_timings.items():
+            timings.setdefault(operation, []).extend(samples)
+    total = sum(len(samples) for samples in timings.values())
+    return {
+        "clients": clients,
+        "requests": total,
+        "failed": sum(failures for _, failures in runs),
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(total / elapsed, 1),
+        "operations": {operation: summarize_timings(samples) for operation, samples in sorted(timings.items())},
+    }
+
+def serve(args):
+    store = open_store(args, args.read_connections)
+    store.load()
+    store.watch(args.watch_interval, lambda: None) # Picks up changes made by GUI instances sharing the files
+    server = FIRServer((args.host, args.port), FIRService(store, args.district))
+    log.info("Serving %s FIRs on %s", store.count(), server.url)
+    return store, server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve FIRs over HTTP/JSON on this machine, or load-test such a server.")
+    add_storage_arguments(parser)
+    add_logging_arguments(parser)
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8765, help="0: any free port")
+    parser.add_argument('--read-connections', type=int, default=4, help="pooled SQLite connections for reads (sqlite backend)")
+    parser.add_argument('--watch-interval', type=float, default=2.0, help="seconds between checks for changes by other processes")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('serve', help="serve until interrupted")
+    loadtest = commands.add_parser('loadtest', help="run concurrent clients against --url, or against a server started here")
+    loadtest.add_argument('--url', help="server to test (default: serve the storage options on --host/--port while testing)")
+    loadtest.add_argument('--clients', type=int, default=8)
+    loadtest.add_argument('--requests', type=int, default=200, help="requests per client")
+    loadtest.add_argument('--write-ratio', type=float, default=0.1, help="share of register/delete pairs")
+    loadtest.add_argument('--seed', type=int, default=0)
+    loadtest.add_argument('--output', help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+    configure_logging(args.log_level, args.log_file)
+
+    if args.command == 'serve':
+        store, server = serve(args)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            store.close()
+        return 0
+
+    store = server = None
+    url = args.url
+    if not url:
+        store, server = serve(args)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = server.url
+    try:
+        results = run_load_test(url, args.clients, args.requests, args.write_ratio, args.seed)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            store.close()
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    print(f"{results['clients']} clients, {results['requests']} requests ({results['failed']} failed) "
+          f"in {results['seconds']:.2f}s: {results['requests_per_second']} requests/s")
+    for operation, summary in results["operations"].items():
+        print(f"{operation:28} {summary['runs']:>7} median {summary['median_ms']:10.3f} ms   p95 {summary['p95_ms']:10.3f} ms")
+    return 1 if results["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
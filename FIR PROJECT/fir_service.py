@@ -0,0 +1,202 @@
+import datetime
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from fir_bulk import export_firs, import_firs
+from fir_laws import laws
+from fir_logging import operation
+from fir_records import FIR_FIELDS
+from fir_validation import canonical_section, fir_entry_errors, is_valid_fir_date, is_valid_fir_number
+
+# --- FIR Service ---
+# The operations the GUI offers (register/update, delete, search, listing, statistics, bulk
+# import/export), with typed inputs and results and no Tk in sight, so the same logic can run
+# from the GUI, the command line (fir_cli.py), scripts and benchmarks. It works on a FIRStore
+# and leaves threading to the caller; the GUI runs these calls on its background lanes.
+
+@dataclass(frozen=True)
+class FIRInput:
+    """An FIR as entered on the registration form; empty fields are filled in by save_fir()."""
+    cnic: str
+    complainant_name: str
+    accused_name: str
+    reason: str
+    fir_number: str = ""                 # Empty (or not a valid FIR number) to register a new FIR
+    complainant_father_name: str = ""
+    accused_father_name: str = ""
+    fir_date: str = ""                   # YYYY-MM-DD; empty for today
+    sections: Tuple[str, ...] = ()
+    bail_status: str = ""
+    punishment: str = ""
+
+    def to_entry(self) -> Dict[str, Any]:
+        fir_entry = asdict(self)
+        fir_entry["sections"] = list(self.sections)
+        return {name: fir_entry[name] for name in FIR_FIELDS}
+
+@dataclass(frozen=True)
+class SearchQuery:
+    """Search criteria; empty ones are ignored (see FIRIndex.search for how each one matches)."""
+    cnic: str = ""
+    fir_number: str = ""
+    accused_name: str = ""
+    accused_father_name: str = ""
+    complainant_name: str = ""
+    complainant_father_name: str = ""
+    section: str = ""
+    act: str = ""
+    bail_status: str = ""
+    date_from: str = ""
+    date_to: str = ""
+    fuzzy: bool = False
+
+    def is_empty(self) -> bool:
+        return not any(value for name, value in asdict(self).items() if name != "fuzzy")
+
+@dataclass(frozen=True)
+class SaveResult:
+    operation: str                       # 'registered' or 'updated'
+    cnic: str
+    fir_number: str
+    notice: Optional[str] = None         # e.g. why a new number was assigned
+
+@dataclass(frozen=True)
+class DeleteResult:
+    status: str                          # 'deleted', 'not_found' (no such FIR number) or 'no_cnic'
+    cnic: str
+    fir_number: str
+
+@dataclass(frozen=True)
+class FIRPage:
+    firs: List[Dict[str, Any]]
+    next_cursor: Any = None              # Pass back to list_firs() for the next page; None after the last
+
+@dataclass(frozen=True)
+class TransferResult:
+    transferred: int                     # FIRs imported or exported
+    rejected: int = 0
+    rejects_file: Optional[str] = None
+
+class ValidationError(ValueError):
+    """Raised for an FIRInput that can't be stored; errors maps each bad field to a message."""
+
+    def __init__(self, errors: Dict[str, str]):
+        super().__init__("; ".join(errors.values()))
+        self.errors = errors
+
+def _date_range_errors(date_from: str, date_to: str) -> Dict[str, str]:
+    """Returns {field: message} for the non-empty bounds of a date range that aren't real dates."""
+    dates = {"date_from": date_from, "date_to": date_to}
+    return {name: f"Invalid FIR Date: {value}. Format: YYYY-MM-DD"
+            for name, value in dates.items() if value and not is_valid_fir_date(value)}
+
+class FIRService:
+    """Typed, display-free access to the FIR operations of a FIRStore."""
+
+    def __init__(self, store, district_code: str = "LHR"):
+        self.store = store
+        self.district_code = district_code  # District of the FIR numbers assigned to new FIRs
+
+    def validate(self, fir_input: FIRInput) -> Dict[str, str]:
+        """Returns {field: message} for the problems with fir_input, in form order; empty if it can be saved."""
+        fir_entry = fir_input.to_entry()
+        fir_entry["fir_number"] = ""  # An unusable number just means a new FIR
+        fir_entry["fir_date"] = fir_entry["fir_date"] or datetime.date.today().isoformat()
+        errors = fir_entry_errors(fir_entry)
+        form_order = ["cnic", "complainant_name", "accused_name", "fir_date", "reason", "sections"]
+        return {name: errors[name] for name in form_order if name in errors}
+
+    def save_fir(self, fir_input: FIRInput) -> SaveResult:
+        """Registers a new FIR, or updates the one with fir_input's number for that CNIC.
+
+        A FIR number that isn't valid, or that this CNIC has no FIR under, gets a newly
+        assigned number instead. Raises ValidationError if fir_input can't be stored.
+        """
+        with operation('save_fir', cnic=fir_input.cnic) as fields:
+            errors = self.validate(fir_input)
+            if errors:
+                raise ValidationError(errors)
+            fir_entry = fir_input.to_entry()
+            fir_entry["fir_date"] = fir_entry["fir_date"] or datetime.date.today().isoformat()
+            notice = None
+            fir_number = fir_input.fir_number
+            if fir_number and is_valid_fir_number(fir_number):
+                if self.store.get_fir(fir_input.cnic, fir_number) is None:
+                    notice = f"FIR Number '{fir_number}' not found for CNIC '{fir_input.cnic}'. A new FIR will be registered."
+                    fir_number = ""
+            else:
+                fir_number = ""
+            if not fir_number:
+                fir_number = self.store.next_fir_number(datetime.date.today().year, self.district_code)
+            fir_entry["fir_number"] = fields["fir_number"] = fir_number
+            fields["result"] = self.store.put_fir(fir_input.cnic, fir_entry)
+        return SaveResult(fields["result"], fir_input.cnic, fir_number, notice)
+
+    def delete_fir(self, cnic: str, fir_number: str) -> DeleteResult:
+        with operation('delete_fir', cnic=cnic, fir_number=fir_number) as fields:
+            if not self.store.get_firs(cnic):
+                fields["result"] = "no_cnic"
+            elif self.store.delete_fir(cnic, fir_number):
+                fields["result"] = "deleted"
+            else:
+                fields["result"] = "not_found"
+        return DeleteResult(fields["result"], cnic, fir_number)
+
+    def get_fir(self, cnic: str, fir_number: str) -> Optional[Dict[str, Any]]:
+        return self.store.get_fir(cnic, fir_number)
+
+    def search(self, query: SearchQuery) -> List[Dict[str, Any]]:
+        """Returns the FIRs matching query; an empty query matches nothing.
+
+        The section is matched in any case (e.g. '295c' finds 295C). Raises ValidationError
+        for an unknown section or a date that isn't a real YYYY-MM-DD date.
+        """
+        if query.is_empty():
+            return []
+        criteria = asdict(query)
+        errors = {}
+        if query.section:
+            criteria["section"] = canonical_section(query.section)
+            if criteria["section"] is None:
+                errors["section"] = f"Invalid Law Section: {query.section}."
+        errors.update(_date_range_errors(query.date_from, query.date_to))
+        if errors:
+            raise ValidationError(errors)
+        return self.store.search(**criteria)
+
+    def count(self) -> int:
+        return self.store.count()
+
+    def list_firs(self, cursor: Any = None, limit: int = 50) -> FIRPage:
+        firs, next_cursor = self.store.fetch_page(cursor, limit)
+        return FIRPage(firs, next_cursor)
+
+    def stats(self, top: int = 10) -> Dict[str, Any]:
+        return self.store.fir_stats(top)
+
+    def date_counts(self, period: str = "day", date_from: str = "", date_to: str = "") -> Dict[str, int]:
+        """Counts the FIRs per day, month or year; raises ValidationError for a date that isn't a real YYYY-MM-DD date."""
+        errors = _date_range_errors(date_from, date_to)
+        if errors:
+            raise ValidationError(errors)
+        return self.store.date_counts(period, date_from, date_to)
+
+    def sections(self, act: str = "", text: str = "") -> List[Dict[str, str]]:
+        """Looks up law sections: those of act (any case), whose code or title contains text."""
+        text = text.lower()
+        return [{"section": code, **info} for code, info in laws.items()
+                if (not act or info["act"].lower() == act.lower())
+                and (text in code.lower() or text in info["title"].lower())]
+
+    def import_file(self, path: str, fmt: Optional[str] = None, rejects_file: Optional[str] = None,
+                    replace: bool = False) -> TransferResult:
+        """Imports FIRs from a CSV or JSON Lines file (see fir_bulk.py)."""
+        rejects_file = rejects_file or path + ".rejects.jsonl"
+        with operation('import_file', path=path) as fields:
+            imported, rejected = import_firs(self.store, path, fmt, rejects_file=rejects_file,
+                                             district_code=self.district_code, replace=replace)
+            fields.update(imported=imported, rejected=rejected)
+        return TransferResult(imported, rejected, rejects_file if rejected else None)
+
+    def export_file(self, path: str, fmt: Optional[str] = None) -> TransferResult:
+        return TransferResult(export_firs(self.store, path, fmt))
@@ -0,0 +1,93 @@
+import csv
+import heapq
+import json
+import os
+from collections import Counter
+
+from fir_laws import laws
+
+# --- FIR Statistics ---
+# Counters over all FIRs, kept up to date as FIRs are added, changed and removed, so reports
+# never have to go through the FIRs themselves. Reading them costs time in the number of
+# distinct acts, sections, months etc., not in the number of FIRs.
+
+UNKNOWN = "Unknown"  # Counted under this when a field is empty
+
+class FIRStats:
+    """Incrementally maintained FIR counts per act, section, bail status, punishment, month and CNIC."""
+
+    def __init__(self):
+        self.total = 0
+        self.by_act = Counter()
+        self.by_section = Counter()
+        self.by_bail_status = Counter()
+        self.by_punishment = Counter()
+        self.by_month = Counter()          # 'YYYY-MM' -> FIRs dated in that month
+        self.firs_per_cnic = Counter()
+        self.repeat_offenders = {}         # cnic -> FIR count, for CNICs with more than one FIR
+
+    def add(self, cnic, fir_detail):
+        """Counts a newly stored FIR; an updated one is removed with its old values first."""
+        self._count(cnic, fir_detail, 1)
+
+    def remove(self, cnic, fir_detail):
+        self._count(cnic, fir_detail, -1)
+
+    def _count(self, cnic, fir_detail, delta):
+        self.total += delta
+        sections = set(fir_detail.get('sections') or ())
+        for section in sections:
+            _bump(self.by_section, section, delta)
+        for act in {laws[section]['act'] for section in sections if section in laws}:
+            _bump(self.by_act, act, delta)
+        _bump(self.by_bail_status, fir_detail.get('bail_status') or UNKNOWN, delta)
+        _bump(self.by_punishment, fir_detail.get('punishment') or UNKNOWN, delta)
+        _bump(self.by_month, (fir_detail.get('fir_date') or '')[:7] or UNKNOWN, delta)
+        count = _bump(self.firs_per_cnic, cnic, delta)
+        if count > 1:
+            self.repeat_offenders[cnic] = count
+        else:
+            self.repeat_offenders.pop(cnic, None)
+
+    def summary(self, top=10):
+        """Returns the counters as plain, JSON-ready dicts (largest counts first, months in date order)."""
+        return {
+            "total_firs": self.total,
+            "distinct_cnics": len(self.firs_per_cnic),
+            "repeat_offender_cnics": len(self.repeat_offenders),
+            "by_act": dict(self.by_act.most_common()),
+            "by_section": dict(self.by_section.most_common()),
+            "by_bail_status": dict(self.by_bail_status.most_common()),
+            "by_punishment": dict(self.by_punishment.most_common()),
+            "by_month": dict(sorted(self.by_month.items())),
+            "top_repeat_offenders": dict(heapq.nlargest(top, self.repeat_offenders.items(), key=lambda item: item[1])),
+        }
+
+def _bump(counter, key, delta):
+    """Adds delta to counter[key], dropping keys that reach zero; returns the new count.
+
+    Removing a key the counter never held (the counters are off, e.g. after a FIR was changed
+    in place) just leaves it out rather than failing the change being counted.
+    """
+    count = counter[key] + delta
+    if count > 0:
+        counter[key] = count
+    else:
+        counter.pop(key, None)
+    return count
+
+# --- Export ---
+def export_stats(summary, path):
+    """Writes a summary() to path: as CSV rows (group, value, count) for .csv files, otherwise as JSON."""
+    if os.path.splitext(path)[1].lower() != '.csv':
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        return
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["group", "value", "count"])
+        for group, counts in summary.items():
+            if isinstance(counts, dict):
+                writer.writerows((group, value, count) for value, count in counts.items())
+            else:
+                writer.writerow((group, "", counts))
@@ -0,0 +1,603 @@
+import array
+import bz2
+import codecs
+import gzip
+import io
+import itertools
+import json
+import lzma
+import os
+import re
+import datetime
+import shutil
+import struct
+import sys
+import threading
+import zlib
+from collections.abc import Mapping
+
+from fir_logging import get_logger
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+log = get_logger(__name__)
+
+# --- Crash-safe Snapshots ---
+# A snapshot is written to a temporary file, fsynced and atomically renamed over the current one.
+# The previous snapshots are kept as numbered generations (fir_data.json.1 is the newest of them),
+# so a damaged current file can always fall back to an older, complete copy.
+
+def snapshot_generations(snapshot_file, generations):
+    """Returns the snapshot file followed by its older generations, newest first."""
+    return [snapshot_file] + [f"{snapshot_file}.{n}" for n in range(1, generations + 1)]
+
+def _fsync_directory(path):
+    """Makes a rename inside the directory of path durable (no-op where unsupported)."""
+    if os.name != 'posix':
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)) or '.', os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def write_snapshot(snapshot_file, data, generations=0, fmt='pretty'):
+    """Atomically replaces the snapshot, keeping up to `generations` previous copies.
+
+    fmt is one of SNAPSHOT_FORMATS. Returns the number of bytes written. FIRs may be any
+    Mapping (e.g. compact records).
+    """
+    if fmt not in SNAPSHOT_FORMATS:
+        raise ValueError(f"Unknown snapshot format: {fmt}")
+    tmp_file = snapshot_file + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        if fmt in COMPRESSED_FORMATS:
+            with COMPRESSED_FORMATS[fmt][1](f, 'wb') as out:
+                _write_json(out, data, None)
+        elif fmt == 'binary':
+            _write_binary(f, data)
+        else:
+            _write_json(f, data, 4 if fmt == 'pretty' else None)
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+    if generations > 0 and os.path.exists(snapshot_file):
+        names = snapshot_generations(snapshot_file, generations)
+        for older, newer in zip(reversed(names[1:]), reversed(names[:-1])):
+            if os.path.exists(newer):
+                os.replace(newer, older)
+    os.replace(tmp_file, snapshot_file)
+    _fsync_directory(snapshot_file)
+    return size
+
+# --- Snapshot Formats ---
+# 'pretty' is indented JSON, the original fir_data.json layout; 'compact' is the same JSON
+# without the whitespace; 'gzip', 'bz2' and 'xz' are compact JSON compressed with the standard
+# library's codecs; 'binary' stores every distinct value once (below). Loading recognises the
+# format by the file's first bytes, whatever its name, so the format can be changed at any
+# time: the next save converts the file.
+#
+# A binary snapshot is BINARY_MAGIC followed by blocks of up to 1000 CNICs. Each block is a
+# header (table bytes, CNICs, code bytes, CRC-32 of both), a JSON array of the values first
+# used in the block, and little-endian uint32 codes: the CNICs' codes, their FIR counts, then
+# per FIR the code of its field names followed by one code per field. Values are numbered in
+# order of appearance across blocks, so each field name list, string and combination of
+# sections is stored once. A block without CNICs ends the file.
+
+SNAPSHOT_FORMATS = ('pretty', 'compact', 'gzip', 'bz2', 'xz', 'binary')
+COMPRESSED_FORMATS = {  # format -> (magic bytes, opener of a compressed stream over a binary file)
+    'gzip': (b'\x1f\x8b', lambda f, mode: gzip.GzipFile(filename='', fileobj=f, mode=mode, compresslevel=6)),
+    'bz2': (b'BZh', lambda f, mode: bz2.BZ2File(f, mode)),
+    'xz': (b'\xfd7zXZ\x00', lambda f, mode: lzma.LZMAFile(f, mode, preset=3 if 'w' in mode else None)), # Higher presets take several times longer
+}
+BINARY_MAGIC = b'FIRSNAP\x01'
+_BLOCK_HEADER = struct.Struct('<IIII')
+_CODE_TYPE = 'I' if array.array('I').itemsize == 4 else 'L'
+
+def detect_snapshot_format(head):
+    """Returns the format of a snapshot from its first bytes: 'json' (pretty or compact), a compressed format or 'binary'."""
+    if head.startswith(BINARY_MAGIC):
+        return 'binary'
+    for fmt, (magic, _) in COMPRESSED_FORMATS.items():
+        if head.startswith(magic):
+            return fmt
+    return 'json'
+
+def _write_json(out, data, indent):
+    """Writes data as JSON to a binary stream.
+
+    Compact JSON is encoded a batch of CNICs at a time by the C encoder, which json.dump
+    (writing piece by piece) doesn't use; indented JSON is left to json.dump.
+    """
+    if indent is not None:
+        text = io.TextIOWrapper(out, encoding='utf-8')
+        json.dump(data, text, indent=indent, default=dict)
+        text.flush()
+        text.detach()
+        return
+    out.write(b'{')
+    items = iter(data.items())
+    separator = b''
+    while True:
+        batch = dict(itertools.islice(items, 1000))
+        if not batch:
+            break
+        out.write(separator + json.dumps(batch, separators=(',', ':'), default=dict)[1:-1].encode('utf-8'))
+        separator = b','
+    out.write(b'}')
+
+def _write_binary(f, data, batch_size=1000):
+    values = []        # Every value written so far; a value's code is its position
+    string_codes = {}  # str -> code
+    section_codes = {} # tuple of an FIR's sections -> code of their list
+    shape_codes = {}   # tuple of field names -> code of their list
+    f.write(BINARY_MAGIC)
+    items = iter(data.items())
+    while True:
+        batch = list(itertools.islice(items, batch_size))
+        if not batch:
+            break
+        table_start = len(values)
+        cnic_codes, fir_counts, codes = array.array(_CODE_TYPE), array.array(_CODE_TYPE), array.array(_CODE_TYPE)
+        for cnic, fir_list in batch:
+            code = string_codes.get(cnic)
+            if code is None:
+                code = string_codes[cnic] = len(values)
+                values.append(cnic)
+            cnic_codes.append(code)
+            fir_counts.append(len(fir_list))
+            for fir in fir_list:
+                shape = tuple(fir)
+                code = shape_codes.get(shape)
+                if code is None:
+                    code = shape_codes[shape] = len(values)
+                    values.append(list(shape))
+                codes.append(code)
+                for field, value in fir.items():
+                    if type(value) is str:
+                        code = string_codes.get(value)
+                        if code is None:
+                            code = string_codes[value] = len(values)
+                            values.append(value)
+                    elif field == 'sections' and type(value) is list and all(type(section) is str for section in value):
+                        key = tuple(value)
+                        code = section_codes.get(key)
+                        if code is None:
+                            code = section_codes[key] = len(values)
+                            values.append(value)
+                    else: # Anything else is stored as is, and never shared
+                        code = len(values)
+                        values.append(value)
+                    codes.append(code)
+        table = json.dumps(values[table_start:], separators=(',', ':'), ensure_ascii=False, default=dict).encode('utf-8')
+        codes = cnic_codes + fir_counts + codes
+        if sys.byteorder == 'big':
+            codes.byteswap()
+        code_bytes = codes.tobytes()
+        f.write(_BLOCK_HEADER.pack(len(table), len(batch), len(code_bytes), zlib.crc32(code_bytes, zlib.crc32(table))))
+        f.write(table)
+        f.write(code_bytes)
+    f.write(_BLOCK_HEADER.pack(0, 0, 0, 0))
+
+def _iter_binary(f, object_hook):
+    """iter_snapshot() for a binary snapshot, positioned after its magic bytes."""
+    values = []
+    while True:
+        header = f.read(_BLOCK_HEADER.size)
+        if len(header) < _BLOCK_HEADER.size:
+            raise ValueError(f"Binary snapshot cut off near byte {f.tell()}")
+        table_size, cnic_count, codes_size, checksum = _BLOCK_HEADER.unpack(header)
+        if not cnic_count:
+            break
+        block = f.read(table_size + codes_size)
+        if len(block) < table_size + codes_size or zlib.crc32(block) != checksum:
+            raise ValueError(f"Damaged binary snapshot block near byte {f.tell()}")
+        values.extend(json.loads(block[:table_size], object_hook=object_hook))
+        codes = array.array(_CODE_TYPE)
+        codes.frombytes(block[table_size:])
+        if sys.byteorder == 'big':
+            codes.byteswap()
+        try:
+            entries = _decode_block(values, codes, cnic_count, object_hook)
+        except (IndexError, TypeError, ValueError) as e:
+            raise ValueError(f"Damaged binary snapshot block near byte {f.tell()}: {e}") from None
+        bytes_read = f.tell()
+        for cnic, fir_list in entries:
+            yield cnic, fir_list, bytes_read
+    if f.read(1):
+        raise ValueError("Extra data after the snapshot")
+
+def _decode_block(values, codes, cnic_count, object_hook):
+    """Returns the [(cnic, fir_list), ...] encoded by one block's codes."""
+    cnics = list(map(values.__getitem__, codes[:cnic_count]))
+    fir_counts = codes[cnic_count:2 * cnic_count]
+    decoded = list(map(values.__getitem__, codes[2 * cnic_count:])) # Field names lists and field values
+    entries = []
+    i = 0
+    for cnic, count in zip(cnics, fir_counts):
+        fir_list = []
+        for _ in range(count):
+            fields = decoded[i]
+            start, i = i + 1, i + 1 + len(fields)
+            fir = dict(zip(fields, decoded[start:i]))
+            sections = fir.get('sections')
+            if type(sections) is list: # Shared by every FIR with these sections; each gets its own copy
+                fir['sections'] = sections.copy()
+            fir_list.append(object_hook(fir) if object_hook else fir)
+        if not isinstance(cnic, str) or len(fir_list) != count:
+            raise ValueError("invalid CNIC entry")
+        entries.append((cnic, fir_list))
+    if i != len(decoded):
+        raise ValueError("codes left over")
+    return entries
+
+def is_valid_fir_list(fir_list):
+    """Checks that one CNIC's entry has the expected structure (a list of FIR mappings)."""
+    return isinstance(fir_list, list) and all(type(item) is dict or isinstance(item, Mapping) for item in fir_list)
+
+class _SnapshotReader:
+    """Reads a JSON snapshot in chunks, decoding JSON values from a sliding text buffer."""
+
+    WHITESPACE = re.compile(r'[ \t\n\r]*')
+    ENTRY_KEY = re.compile(r'[ \t\n\r]*"([^"\\]*)"[ \t\n\r]*:[ \t\n\r]*')  # A plain "cnic": prefix
+    SEPARATOR = re.compile(r'[ \t\n\r]*([,}])')
+    OPEN = re.compile(r'[ \t\n\r]*\{')
+    CLOSE = re.compile(r'[ \t\n\r]*\}')
+    COLON = re.compile(r'[ \t\n\r]*:')
+    ENTRY_BOUNDARY = re.compile(r'\][ \t\n\r]*,[ \t\n\r]*"[^"\\]*"[ \t\n\r]*:[ \t\n\r]*\[')  # ], "cnic": [
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.bytes_read = 0
+        self.eof = False
+
+    def more(self):
+        """Appends the next chunk to the buffer; returns False at the end of the file."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        self.bytes_read += len(chunk)
+        self.eof = not chunk
+        self.buf = self.buf[self.pos:] + self.utf8.decode(chunk, final=self.eof)
+        self.pos = 0
+        return True
+
+    def error(self, message):
+        return ValueError(f"{message} near byte {self.bytes_read - len(self.buf.encode('utf-8')) + len(self.buf[:self.pos].encode('utf-8'))}")
+
+    def match(self, pattern):
+        """Matches pattern at the current position and moves past it; returns None if it doesn't match."""
+        while True:
+            match = pattern.match(self.buf, self.pos)
+            # A match (or mismatch) running into the end of the buffer may change with more input
+            if (match is None or match.end() == len(self.buf)) and len(self.buf) - self.pos < 4096 and self.more():
+                continue
+            if match is not None:
+                self.pos = match.end()
+            return match
+
+    def decode(self, decoder):
+        """Decodes the JSON value starting at the current position, reading more as needed."""
+        self.match(self.WHITESPACE)
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                # Only an error at the end of the buffer can be a value cut off by the chunk boundary
+                truncated = e.pos >= len(self.buf) - 6 or e.msg.startswith("Unterminated string")
+                if truncated and self.more():
+                    continue
+                self.pos = e.pos
+                raise self.error(e.msg) from None
+            if end == len(self.buf) and self.more():
+                continue # The value may continue in the next chunk
+            self.pos = end
+            return value
+
+    def decode_entries(self, decoder):
+        """Decodes every complete CNIC entry in the buffer with one decoder call.
+
+        Besides saving calls, this lets the decoder share one copy of each field name
+        among all the FIRs of the batch. Returns None if no batch could be cut out.
+        """
+        boundary = None
+        for boundary in self.ENTRY_BOUNDARY.finditer(self.buf, max(self.pos, len(self.buf) - 65536)):
+            pass
+        if boundary is None:
+            return None
+        end = boundary.start() + 1
+        text = '{' + self.buf[self.pos:end] + '}'
+        try:
+            entries, consumed = decoder.raw_decode(text)
+        except json.JSONDecodeError:
+            return None # The boundary was inside a string or a nested list
+        if consumed != len(text):
+            return None
+        self.pos = end
+        return entries
+
+def iter_snapshot(snapshot_file, object_hook=None, chunk_size=1 << 20):
+    """Parses a CNIC-keyed snapshot, in any of the SNAPSHOT_FORMATS, one CNIC at a time.
+
+    Yields (cnic, fir_list, bytes_read) as each entry is decoded, so the data can be used
+    before the whole file has been read; bytes_read counts bytes of the file, compressed or
+    not. Raises ValueError on a damaged file or an entry without the expected structure,
+    possibly after earlier entries have been yielded. object_hook is passed on to the JSON
+    decoder (for a binary snapshot, it is called on every FIR).
+    """
+    with open(snapshot_file, 'rb') as raw:
+        fmt = detect_snapshot_format(raw.read(len(BINARY_MAGIC)))
+        if fmt == 'binary':
+            yield from _iter_binary(raw, object_hook)
+            return
+        raw.seek(0)
+        if fmt not in COMPRESSED_FORMATS:
+            yield from _iter_json(raw, raw, object_hook, chunk_size)
+            return
+        try:
+            with COMPRESSED_FORMATS[fmt][1](raw, 'rb') as f:
+                yield from _iter_json(f, raw, object_hook, chunk_size)
+        except (EOFError, zlib.error, lzma.LZMAError) as e: # A cut-off or corrupt stream
+            raise ValueError(f"Damaged {fmt} snapshot: {e}") from None
+
+def _iter_json(f, raw, object_hook, chunk_size):
+    """iter_snapshot() for JSON read from f; raw is the file underneath, for bytes_read."""
+    decoder = json.JSONDecoder(object_hook=object_hook)
+    reader = _SnapshotReader(f, chunk_size)
+    if not reader.match(reader.OPEN):
+        raise reader.error("invalid or old format")
+    if not reader.match(reader.CLOSE):
+        while True:
+            entries = reader.decode_entries(decoder)
+            if entries is None: # Decode a single entry, e.g. one running past the buffer
+                match = reader.match(reader.ENTRY_KEY)
+                if match:
+                    cnic = match.group(1)
+                else: # Escaped characters in the key; let the decoder handle it
+                    cnic = reader.decode(decoder)
+                    if not isinstance(cnic, str) or not reader.match(reader.COLON):
+                        raise reader.error("invalid or old format")
+                entries = {cnic: reader.decode(decoder)}
+            for cnic, fir_list in entries.items():
+                if not is_valid_fir_list(fir_list):
+                    raise reader.error(f"invalid or old format (entry for {cnic})")
+                yield cnic, fir_list, raw.tell()
+            match = reader.match(reader.SEPARATOR)
+            if not match:
+                raise reader.error("Expecting ',' delimiter")
+            if match.group(1) == '}':
+                break
+    if reader.match(reader.WHITESPACE) and reader.pos < len(reader.buf):
+        raise reader.error("Extra data after the snapshot")
+
+def quarantine_file(path):
+    """Moves a damaged file aside so that nothing overwrites it, returning the new name."""
+    quarantined = f"{path}.corrupt-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    os.replace(path, quarantined)
+    return quarantined
+
+# --- Append-only FIR Journal ---
+# Every mutation is written as one JSON object per line. The journal is replayed on top of
+# the last snapshot at startup and emptied whenever the data is compacted into a new snapshot.
+# Replaying is idempotent: a 'put' replaces the FIR with the same number, a 'delete' removes it.
+# Emptied journals are kept like the snapshot generations: fir_data.journal.n holds the changes
+# from snapshot generation n to the next newer one, so a load that has to fall back to
+# generation n replays fir_data.journal.n ... .1 and then the journal, and loses nothing.
+
+def journal_put_record(cnic, fir_entry):
+    """Builds the journal record for registering or updating an FIR."""
+    return {"op": "put", "cnic": cnic, "fir": fir_entry}
+
+def journal_delete_record(cnic, fir_number):
+    """Builds the journal record for deleting an FIR."""
+    return {"op": "delete", "cnic": cnic, "fir_number": fir_number}
+
+def append_journal_records(journal_file, records, sync=True):
+    """Appends records to the journal in a single write and returns the number of bytes written."""
+    payload = "".join(json.dumps(record, separators=(',', ':'), default=dict) + "\n" for record in records)
+    with open(journal_file, 'a', encoding='utf-8') as f:
+        f.write(payload)
+        f.flush()
+        if sync:
+            os.fsync(f.fileno())
+    return len(payload)
+
+def apply_journal_record(data, record):
+    """Applies one journal record to the CNIC-keyed FIR data in place."""
+    op = record.get("op")
+    cnic = record.get("cnic")
+    if op == "put":
+        fir_entry = record["fir"]
+        fir_list = data.setdefault(cnic, [])
+        for i, fir in enumerate(fir_list):
+            if fir.get('fir_number') == fir_entry.get('fir_number'):
+                fir_list[i] = fir_entry
+                break
+        else:
+            fir_list.append(fir_entry)
+    elif op == "delete":
+        if cnic in data:
+            data[cnic] = [fir for fir in data[cnic] if fir.get('fir_number') != record.get("fir_number")]
+            if not data[cnic]:
+                del data[cnic]
+    else:
+        raise ValueError(f"Unknown journal operation: {op!r}")
+
+def replay_journal(journal_file, data, apply=apply_journal_record):
+    """Replays the journal on top of data and returns the number of records applied.
+
+    Each record is passed to apply(data, record), which by default just updates data.
+
+    A torn last line (e.g. from a crash in the middle of an append) is discarded and
+    truncated away, so the next append starts on a clean line.
+    """
+    if not os.path.exists(journal_file):
+        return 0
+    applied = 0
+    good_end = 0
+    with open(journal_file, 'rb') as f:
+        lines = f.readlines()
+    for line_no, line in enumerate(lines, start=1):
+        is_last = line_no == len(lines)
+        try:
+            if not line.endswith(b"\n"):
+                raise ValueError("incomplete record")
+            record = json.loads(line)
+            apply(data, record)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            if is_last:
+                log.warning("Discarding torn last record in %s: %s", journal_file, e)
+                break
+            log.warning("Skipping corrupt record on line %s of %s: %s", line_no, journal_file, e)
+            good_end += len(line)
+            continue
+        applied += 1
+        good_end += len(line)
+    if good_end < sum(len(line) for line in lines):
+        with open(journal_file, 'r+b') as f:
+            f.truncate(good_end)
+    return applied
+
+def truncate_journal(journal_file):
+    """Empties the journal after its records have been folded into a snapshot."""
+    if os.path.exists(journal_file):
+        with open(journal_file, 'w', encoding='utf-8'):
+            pass
+
+def rotate_journal(journal_file, generations, snapshot_rotated):
+    """Empties the journal after a snapshot write, keeping its records as journal_file.1.
+
+    Mirrors write_snapshot: if it moved the previous snapshot to generation 1
+    (snapshot_rotated), the kept journals move up a generation too; otherwise the records are
+    appended to journal_file.1, which then leads from generation 1 to the new snapshot.
+    """
+    if generations <= 0:
+        truncate_journal(journal_file)
+        return
+    kept = snapshot_generations(journal_file, generations)
+    if snapshot_rotated:
+        open(journal_file, 'a').close() # An empty journal still takes its place as .1
+        for older, newer in zip(reversed(kept[1:]), reversed(kept[:-1])):
+            if os.path.exists(newer):
+                os.replace(newer, older)
+        _fsync_directory(journal_file)
+    elif os.path.exists(journal_file):
+        with open(journal_file, 'rb') as f, open(kept[1], 'ab') as out:
+            shutil.copyfileobj(f, out)
+            out.flush()
+            os.fsync(out.fileno())
+        truncate_journal(journal_file)
+
+def read_journal_tail(journal_file, offset):
+    """Reads the complete records appended to the journal after byte offset.
+
+    Returns (records, new_offset). A last line that is still being written is left for the
+    next call; corrupt lines are skipped.
+    """
+    try:
+        with open(journal_file, 'rb') as f:
+            f.seek(offset)
+            chunk = f.read()
+    except FileNotFoundError:
+        return [], 0
+    end = chunk.rfind(b"\n") + 1
+    records = []
+    for line in chunk[:end].splitlines():
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError as e:
+            log.warning("Skipping corrupt record in %s: %s", journal_file, e)
+    return records, offset + end
+
+# --- Sharing the Files between Processes ---
+# Several processes (GUI instances on a shared folder, the FIR server, bulk imports) may use the
+# same data files. Every change is made while holding an exclusive advisory lock on a lock file
+# next to the data, so journal appends, snapshots and FIR number allocations never interleave.
+# The files' stamps tell a process cheaply whether anyone else changed them since it last looked.
+
+def file_stamp(path):
+    """Identifies the current version of a file, or None if it doesn't exist; replacing or rewriting the file changes it."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+def file_size(path):
+    """Size of the file in bytes, 0 if it doesn't exist."""
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+class FileLock:
+    """Exclusive advisory lock on a lock file (fcntl.flock, or msvcrt.locking on Windows).
+
+    Re-entrant for the thread holding it, and exclusive between the threads of one process too.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._depth = 0
+        self._thread_lock = threading.RLock()
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                f = open(self.path, 'a+b')
+                try:
+                    _lock_file(f)
+                except BaseException:
+                    f.close()
+                    raise
+            except BaseException:
+                self._thread_lock.release()
+                raise
+            self._file = f
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                _unlock_file(self._file)
+            finally:
+                self._file.close()
+                self._file = None
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+def _lock_file(f):
+    if os.name == 'nt':
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError: # LK_LOCK gives up after 10 seconds; keep waiting
+                continue
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+def _unlock_file(f):
+    if os.name == 'nt':
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,249 @@
+import threading
+from collections import OrderedDict
+
+from fir_fuzzy import NAME_FIELDS
+from fir_logging import get_logger, operation
+from fir_metrics import metrics
+
+log = get_logger(__name__)
+
+# --- Application Store ---
+class FIRStore:
+    """Owns the storage backend and loads it on first use.
+
+    Creating a store does no I/O. The backend is opened and loaded the first time any
+    method needs it (or when load() is called, e.g. from a background job), and seeded
+    through the optional seed callback if it turns out to be empty. Reads that race the
+    initial load see the FIRs loaded so far; changes wait for the load to finish.
+
+    Recent search results are kept in an LRU cache that every change through the store
+    clears. A search that refines a cached one (the same criteria, with longer name
+    substrings) filters the cached results instead of searching the backend again.
+
+    When other processes share the data files, watch() polls for their changes and merges
+    them in as they appear.
+    """
+
+    def __init__(self, backend_factory, seed=None, search_cache_size=64):
+        self._backend_factory = backend_factory
+        self._seed = seed
+        self._backend = None
+        self._loading = None  # The backend while its first load is in progress
+        self._load_lock = threading.Lock()
+        self._search_cache = OrderedDict()  # criteria key -> results, most recently used last
+        self._search_cache_size = search_cache_size
+        self._cache_lock = threading.Lock()
+        self._generation = 0  # Bumped by every change; results searched before one aren't cached
+        self._watch_stop = None  # threading.Event that ends the watch() thread
+
+    @property
+    def loaded(self):
+        return self._backend is not None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self.load()
+        return self._backend
+
+    @property
+    def reader(self):
+        """The backend for read-only operations, usable while the first load is still running."""
+        loading = self._loading
+        return loading if loading is not None else self.backend
+
+    def load(self, on_progress=None):
+        """Opens and loads the backend if that hasn't happened yet; returns the FIR count.
+
+        on_progress(bytes_read, total_bytes, fir_count) is passed on to the backend's load.
+        """
+        with self._load_lock:
+            if self._backend is None:
+                backend = self._backend_factory()
+
+                def progress(*args):
+                    self._loading = backend # Readable from the first loaded batch on
+                    if on_progress:
+                        on_progress(*args)
+
+                try:
+                    with metrics.timed('load') as counts:
+                        backend.load(progress)
+                        counts['firs'] = backend.count()
+                    # Never seed over a damaged data file: its contents may still be recoverable by hand.
+                    if self._seed and not backend.count() and not backend.recovery_failed:
+                        self._seed(backend)
+                    self._backend = backend
+                finally:
+                    self._loading = None
+        return self._backend.count()
+
+    def close(self):
+        if self._watch_stop is not None:
+            self._watch_stop.set()
+        with self._load_lock:
+            if self._backend is not None:
+                self._backend.close()
+
+    # --- Backend operations (see fir_backends.py); each one loads on first use ---
+    # Reads go through self.reader, changes through self.backend.
+    # Each operation is timed under its name in fir_metrics.metrics; changes are also logged as
+    # operations (fir_logging.py), so the backend's messages about them carry their op_id.
+    def save(self):
+        with operation('save'), metrics.timed('save'):
+            self.backend.save()
+
+    def put_fir(self, cnic, fir_entry):
+        try:
+            with operation('put_fir', cnic=cnic, fir_number=fir_entry.get('fir_number')) as fields, metrics.timed('put_fir'):
+                fields['result'] = self.backend.put_fir(cnic, fir_entry)
+                return fields['result']
+        finally:
+            self.invalidate_searches()
+
+    def put_many(self, entries):
+        try:
+            with operation('put_many') as fields, metrics.timed('put_many') as counts:
+                counts['firs'] = fields['firs'] = self.backend.put_many(entries)
+                return counts['firs']
+        finally:
+            self.invalidate_searches()
+
+    def delete_fir(self, cnic, fir_number):
+        try:
+            with operation('delete_fir', cnic=cnic, fir_number=fir_number) as fields, metrics.timed('delete') as counts:
+                deleted = fields['deleted'] = self.backend.delete_fir(cnic, fir_number)
+                counts['deleted'] = int(deleted)
+                return deleted
+        finally:
+            self.invalidate_searches()
+
+    def get_fir(self, cnic, fir_number):
+        return self.reader.get_fir(cnic, fir_number)
+
+    def get_firs(self, cnic):
+        return self.reader.get_firs(cnic)
+
+    def search(self, cnic='', fir_number='', accused_name='', accused_father_name='', **criteria):
+        criteria.update(cnic=cnic, fir_number=fir_number, accused_name=accused_name, accused_father_name=accused_father_name)
+        key = tuple(sorted((name, value) for name, value in criteria.items() if value))
+        with metrics.timed('search') as counts:
+            with self._cache_lock:
+                complete = self._backend is not None # Not cached while the data is still loading
+                generation = self._generation
+                found_firs = self._search_cache.get(key)
+                if found_firs is not None:
+                    self._search_cache.move_to_end(key)
+                    counts.update(cache_hits=1, matched=len(found_firs))
+                    return list(found_firs)
+                if complete:
+                    found_firs = self._narrow_cached_search(dict(key))
+                    if found_firs is not None:
+                        counts['narrowed'] = 1
+            if found_firs is None:
+                found_firs = self.reader.search(**criteria) # The backend counts the FIRs it scans as search.scanned
+            with self._cache_lock:
+                if complete and generation == self._generation:
+                    self._search_cache[key] = found_firs
+                    if len(self._search_cache) > self._search_cache_size:
+                        self._search_cache.popitem(last=False)
+            counts['matched'] = len(found_firs)
+        return list(found_firs)
+
+    def _narrow_cached_search(self, criteria):
+        """Filters the smallest cached result set that criteria refines, or returns None if there is none.
+
+        criteria refines a cached search if it has the same criteria except for substring
+        name criteria, each containing the cached one (case-insensitively).
+        """
+        if criteria.get('fuzzy'):
+            return None
+        narrowest, narrowed_names = None, None
+        for key, found_firs in self._search_cache.items():
+            cached = dict(key)
+            if not key or cached.get('fuzzy') or (narrowest is not None and len(found_firs) >= len(narrowest)):
+                continue
+            names = []
+            for name in criteria.keys() | cached.keys():
+                if name in NAME_FIELDS and cached.get(name, '').lower() in criteria.get(name, '').lower():
+                    if criteria.get(name, '').lower() != cached.get(name, '').lower():
+                        names.append(name)
+                elif criteria.get(name) != cached.get(name):
+                    break
+            else:
+                narrowest, narrowed_names = found_firs, names
+        if narrowest is None:
+            return None
+        queries = [(name, criteria[name].lower()) for name in narrowed_names]
+        return [fir for fir in narrowest if all(query in (fir.get(name) or '').lower() for name, query in queries)]
+
+    def invalidate_searches(self):
+        """Forgets the cached search results; called after every change."""
+        with self._cache_lock:
+            self._generation += 1
+            self._search_cache.clear()
+
+    # --- Changes made by other processes ---
+    def refresh(self):
+        """Merges in the changes other processes made to the shared data; returns True if there were any."""
+        if self._backend is None:
+            return False # The first load will see them
+        with metrics.timed('refresh') as counts:
+            changed = self._backend.refresh()
+            counts['changed'] = int(changed)
+        if changed:
+            self.invalidate_searches()
+        return changed
+
+    def watch(self, interval, on_change):
+        """Calls refresh() every interval seconds on a background thread until close().
+
+        on_change() is called (on that thread) after every refresh that merged changes.
+        """
+        if self._watch_stop is not None:
+            return
+        stop = self._watch_stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                try:
+                    changed = self.refresh()
+                except Exception as e:
+                    log.exception("Error checking for changes by other processes: %s", e)
+                    continue
+                if changed:
+                    on_change()
+
+        threading.Thread(target=run, name="fir-watch", daemon=True).start()
+
+    def fetch_page(self, cursor=None, limit=50):
+        with metrics.timed('fetch_page') as counts:
+            firs, next_cursor = self.reader.fetch_page(cursor, limit)
+            counts['firs'] = len(firs)
+        return firs, next_cursor
+
+    def iter_firs(self):
+        return self.reader.iter_firs()
+
+    def date_counts(self, period='day', date_from='', date_to=''):
+        with metrics.timed('date_counts'):
+            return self.reader.date_counts(period, date_from, date_to)
+
+    def fir_stats(self, top=10):
+        with metrics.timed('fir_stats'):
+            return self.reader.fir_stats(top)
+
+    def count(self):
+        return self.reader.count()
+
+    def next_fir_number(self, year, district_code):
+        with metrics.timed('next_fir_number'):
+            return self.backend.next_fir_number(year, district_code)
+
+    def reserve_fir_numbers(self, year, district_code, count):
+        with metrics.timed('reserve_fir_numbers') as counts:
+            counts['numbers'] = count
+            return self.backend.reserve_fir_numbers(year, district_code, count)
+
+    def bulk_load(self):
+        return self.backend.bulk_load()
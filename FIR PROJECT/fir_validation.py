@@ -0,0 +1,127 @@
+import datetime
+import re
+
+from fir_laws import laws
+
+# --- Validation Patterns ---
+CNIC_PATTERN = re.compile(r'\d{5}-\d{7}-\d{1}')            # XXXXX-XXXXXXX-X
+FIR_NUMBER_PATTERN = re.compile(r'\d{4}/[A-Z]{3}/\d{4,}')  # YYYY/DDD/NNNN; allows for more than 4 digits for sequence
+FIR_DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')        # YYYY-MM-DD
+
+CNIC_ERROR = "Invalid or missing Accused CNIC. Format: XXXXX-XXXXXXX-X"
+FIR_DATE_ERROR = "Invalid FIR Date. Format: YYYY-MM-DD"
+REQUIRED_FIELDS = {
+    "complainant_name": "Complainant Name is required.",
+    "accused_name": "Accused Name is required.",
+    "reason": "Reason for FIR is required.",
+}
+
+# --- Validation Functions ---
+def is_valid_cnic(cnic):
+    """Checks if the CNIC format is valid (XXXXX-XXXXXXX-X)."""
+    return CNIC_PATTERN.fullmatch(cnic)
+
+def is_valid_fir_number(fir_num):
+    """Checks if the FIR number format is valid (YYYY/DDD/NNNN)."""
+    return FIR_NUMBER_PATTERN.fullmatch(fir_num)
+
+def is_valid_fir_date(fir_date):
+    """Checks that the FIR date is a real calendar date in YYYY-MM-DD format."""
+    if not FIR_DATE_PATTERN.fullmatch(fir_date):
+        return False
+    try:
+        datetime.date.fromisoformat(fir_date)
+    except ValueError: # e.g., 2024-02-30
+        return False
+    return True
+
+_SECTIONS_BY_LOWER = {code.lower(): code for code in laws}
+
+def canonical_section(section):
+    """Returns the laws key for a section code typed in any case (e.g. '6ata' -> '6ATA'), or None if unknown."""
+    return _SECTIONS_BY_LOWER.get(section.strip().lower())
+
+def invalid_sections(sections):
+    """Returns the sections that aren't in the laws dictionary."""
+    return [section for section in sections if section not in laws]
+
+# --- Batch Validation ---
+# Checking a column one value at a time costs a Python-level call per value. Instead the column
+# is joined into one newline-separated text and a single MULTILINE scan finds the lines that
+# don't match; only those rows are looked at individually.
+
+def _line_mismatch_pattern(pattern):
+    return re.compile(r'^(?!(?:%s)$).*$' % pattern.pattern, re.MULTILINE)
+
+_MISMATCHES = {pattern: _line_mismatch_pattern(pattern) for pattern in (CNIC_PATTERN, FIR_NUMBER_PATTERN, FIR_DATE_PATTERN)}
+
+def invalid_rows(pattern, values):
+    """Returns the indexes of the values that don't fully match pattern, in order."""
+    if not values:
+        return []
+    try:
+        text = "\n".join(values)
+    except TypeError: # Not all strings; check one by one
+        text = None
+    if text is None or text.count("\n") != len(values) - 1: # A value spans lines
+        return [row for row, value in enumerate(values) if not isinstance(value, str) or not pattern.fullmatch(value)]
+    mismatch = _MISMATCHES.get(pattern) or _line_mismatch_pattern(pattern)
+    rows = []
+    row = last = 0
+    for match in mismatch.finditer(text):
+        row += text.count("\n", last, match.start())
+        last = match.start()
+        rows.append(row)
+    return rows
+
+def validate_columns(cnics=None, fir_numbers=None, fir_dates=None, sections=None):
+    """Validates whole columns of FIR fields in one call.
+
+    Each argument is a list with one value per row (sections: one list of codes per row);
+    columns left as None aren't checked. Empty FIR numbers are allowed, since one is assigned
+    when the FIR is stored. Returns {row: {field: message}} for the rows with problems.
+    """
+    errors = {}
+    if cnics is not None:
+        for row in invalid_rows(CNIC_PATTERN, cnics):
+            errors.setdefault(row, {})['cnic'] = CNIC_ERROR
+    if fir_numbers is not None:
+        for row in invalid_rows(FIR_NUMBER_PATTERN, fir_numbers):
+            if fir_numbers[row]:
+                errors.setdefault(row, {})['fir_number'] = f"Invalid FIR Number: {fir_numbers[row]}. Format: YYYY/DDD/NNNN"
+    if fir_dates is not None:
+        bad_dates = set(invalid_rows(FIR_DATE_PATTERN, fir_dates))
+        # The pattern only checks the shape; each distinct date is parsed once to reject e.g. 2024-02-30
+        for fir_date in set(fir_dates) - {fir_dates[row] for row in bad_dates}:
+            if not is_valid_fir_date(fir_date):
+                bad_dates.update(row for row, value in enumerate(fir_dates) if value == fir_date)
+        for row in sorted(bad_dates):
+            errors.setdefault(row, {})['fir_date'] = FIR_DATE_ERROR
+    if sections is not None:
+        unknown = set().union(*sections) - laws.keys()
+        if unknown: # Only rows using an unknown code need a closer look
+            for row, row_sections in enumerate(sections):
+                bad = [section for section in row_sections if section in unknown]
+                if bad:
+                    errors.setdefault(row, {})['sections'] = f"Invalid Law Section: {', '.join(bad)}."
+    return errors
+
+def validate_fir_entries(fir_entries):
+    """Applies the registration form's rules to a batch of FIR entries.
+
+    Returns {row: {field: message}} for the entries that can't be stored.
+    """
+    errors = validate_columns(
+        cnics=[fir_entry.get('cnic', '') for fir_entry in fir_entries],
+        fir_numbers=[fir_entry.get('fir_number', '') for fir_entry in fir_entries],
+        fir_dates=[fir_entry.get('fir_date', '') for fir_entry in fir_entries],
+        sections=[fir_entry.get('sections', []) for fir_entry in fir_entries])
+    for field, message in REQUIRED_FIELDS.items():
+        for row, fir_entry in enumerate(fir_entries):
+            if not fir_entry.get(field):
+                errors.setdefault(row, {})[field] = message
+    return errors
+
+def fir_entry_errors(fir_entry):
+    """Returns {field: message} for the problems with one FIR entry, empty if it can be stored."""
+    return validate_fir_entries([fir_entry]).get(0, {})
@@ -0,0 +1,82 @@
+import pytest
+
+from fir_datagen import FIRGenerator
+
+# --- Backend Parity Tests ---
+# The JSON and SQLite backends must give the same answers: both are loaded with the same
+# generated FIRs, changed the same way, and asked the same questions.
+
+@pytest.fixture(scope='module')
+def backends(tmp_path_factory, open_backend):
+    firs = list(FIRGenerator(seed=7).iter_firs(600))
+    opened = []
+    for name in ('json', 'sqlite'):
+        backend = open_backend(name, tmp_path_factory.mktemp(name))
+        backend.load()
+        backend.put_many(firs)
+        for cnic, fir in firs[::50]:  # Deletions and updates, so the indexes have to keep up
+            backend.delete_fir(cnic, fir['fir_number'])
+        for cnic, fir in firs[1::50]:
+            backend.put_fir(cnic, dict(fir, accused_name="Zubair Qureshi", bail_status="Refused"))
+        opened.append(backend)
+    yield opened
+    for backend in opened:
+        backend.close()
+
+def keys(firs):
+    return [(fir['cnic'], fir['fir_number']) for fir in firs]
+
+def queries(backend):
+    """Search criteria built from the stored FIRs, so that most of them match something."""
+    sample = list(backend.iter_firs())[::40]
+    for fir in sample:
+        yield {'cnic': fir['cnic']}
+        yield {'fir_number': fir['fir_number'].lower()}
+        yield {'accused_name': fir['accused_name'][1:4]}
+        yield {'accused_father_name': fir['accused_father_name'][-4:].upper()}
+        yield {'complainant_name': fir['complainant_name'][:3]}
+        yield {'complainant_father_name': fir['complainant_father_name'][2:5]}
+        yield {'bail_status': fir['bail_status'].upper()}
+        if fir['sections']:
+            yield {'section': fir['sections'][0], 'date_from': fir['fir_date']}
+        yield {'date_from': fir['fir_date'], 'date_to': fir['fir_date']}
+    yield {'act': 'PPC', 'bail_status': 'refused'}
+    yield {'accused_name': 'Zubair'}
+
+def test_search_parity(backends):
+    json_backend, sqlite_backend = backends
+    checked = 0
+    for criteria in queries(json_backend):
+        assert keys(json_backend.search(**criteria)) == keys(sqlite_backend.search(**criteria)), criteria
+        checked += 1
+    assert checked > 50
+
+@pytest.mark.parametrize('field', ['accused_name', 'complainant_name'])
+def test_fuzzy_search_parity(backends, field):
+    json_backend, sqlite_backend = backends
+    for fir in list(json_backend.iter_firs())[::60]:
+        name = fir[field].split()[0]
+        misspelt = name[:2] + name[3:] if len(name) > 4 else name  # One letter dropped
+        json_found = keys(json_backend.search(**{field: misspelt, 'fuzzy': True}))
+        assert (fir['cnic'], fir['fir_number']) in json_found
+        assert sorted(json_found) == sorted(keys(sqlite_backend.search(**{field: misspelt, 'fuzzy': True})))
+
+def test_counts_and_stats_parity(backends):
+    json_backend, sqlite_backend = backends
+    assert json_backend.count() == sqlite_backend.count()
+    for period in ('day', 'month', 'year'):
+        assert json_backend.date_counts(period) == sqlite_backend.date_counts(period)
+    assert json_backend.fir_stats() == sqlite_backend.fir_stats()
+
+def test_paging_parity(backends):
+    pages = []
+    for backend in backends:
+        cursor, listed = None, []
+        while True:
+            firs, cursor = backend.fetch_page(cursor, 37)
+            listed += keys(firs)
+            if cursor is None:
+                break
+        pages.append(listed)
+    assert pages[0] == pages[1]
+    assert len(pages[0]) == backends[0].count()
@@ -0,0 +1,138 @@
+import csv
+import json
+
+import pytest
+
+import fir_cli
+from fir_bulk import check_firs, export_firs, import_firs
+
+# --- Bulk Import / Export Tests ---
+
+CNIC = "35202-1234567-1"
+OTHER_CNIC = "35202-7654321-1"
+
+def make_row(seq, **fields):
+    row = {"cnic": CNIC, "fir_number": f"2025/LHR/{seq:04d}" if seq else "", "complainant_name": "Ali",
+           "complainant_father_name": "Raza", "accused_name": "Bilal", "accused_father_name": "Khan",
+           "reason": "Theft", "fir_date": "2025-03-01", "sections": ["302"], "bail_status": "N/A", "punishment": ""}
+    row.update(fields)
+    return row
+
+def write_jsonl(path, rows):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(row if isinstance(row, str) else json.dumps(row) + "\n" for row in rows)
+    return str(path)
+
+def read_rejects(path):
+    with open(str(path) + '.rejects.jsonl', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+def test_import_rejects_bad_rows_with_their_line(backend, tmp_path):
+    path = write_jsonl(tmp_path / 'firs.jsonl', [
+        make_row(1),
+        "{not json\n",
+        "[1, 2]\n",
+        json.dumps(dict(make_row(2), station="Model Town")) + "\n",  # Not an FIR field
+        make_row(3, reason=5),
+        make_row(4, sections="302"),
+        make_row(5, cnic="12345", fir_date="2025-02-30"),
+        "\n",
+        make_row(6, sections=["302", "999Z"]),
+        make_row(7, accused_name=""),
+    ])
+    assert import_firs(backend, path) == (1, 8)
+    rejects = read_rejects(path)
+    assert [reject["line"] for reject in rejects] == [2, 3, 4, 5, 6, 7, 9, 10]
+    assert set(rejects[3]["errors"]) == {"reason"}
+    assert set(rejects[4]["errors"]) == {"sections"}
+    assert set(rejects[5]["errors"]) == {"cnic", "fir_date"}
+    assert "999Z" in rejects[6]["errors"]["sections"]
+    assert set(rejects[7]["errors"]) == {"accused_name"}
+    assert backend.count() == 1
+
+def test_import_rejects_duplicate_fir_numbers(backend, tmp_path):
+    backend.put_fir(CNIC, make_row(1))
+    path = write_jsonl(tmp_path / 'firs.jsonl', [
+        make_row(1, reason="Overwritten"),  # Already stored for this CNIC
+        make_row(1, cnic=OTHER_CNIC),       # Already stored for another CNIC
+        make_row(2),
+        make_row(2, cnic=OTHER_CNIC),       # Used on an earlier line
+        make_row(0, cnic=OTHER_CNIC),       # Numbered on import
+    ])
+    assert import_firs(backend, path) == (2, 3)
+    rejects = read_rejects(path)
+    assert [reject["line"] for reject in rejects] == [1, 2, 4]
+    assert "--replace" in rejects[0]["errors"]["fir_number"]
+    assert "another CNIC" in rejects[1]["errors"]["fir_number"]
+    assert "line 3" in rejects[2]["errors"]["fir_number"]
+    assert backend.get_fir(CNIC, "2025/LHR/0001")["reason"] == "Theft"
+    assert backend.count() == 3
+    assert len(backend.search(fir_number="2025/LHR/0002")) == 1
+
+def test_import_with_replace_overwrites_only_the_same_cnic(backend, tmp_path):
+    backend.put_fir(CNIC, make_row(1))
+    path = write_jsonl(tmp_path / 'firs.jsonl', [make_row(1, reason="Overwritten"), make_row(1, cnic=OTHER_CNIC)])
+    assert import_firs(backend, path, replace=True) == (1, 1)
+    assert backend.get_fir(CNIC, "2025/LHR/0001")["reason"] == "Overwritten"
+    assert backend.get_fir(OTHER_CNIC, "2025/LHR/0001") is None
+    assert backend.count() == 1
+
+def test_duplicates_are_found_across_batches(backend, tmp_path):
+    path = write_jsonl(tmp_path / 'firs.jsonl', [make_row(1), make_row(2), make_row(1, cnic=OTHER_CNIC)])
+    assert import_firs(backend, path, batch_size=2) == (2, 1)
+    assert read_rejects(path)[0]["line"] == 3
+
+def test_numbers_assigned_on_import_skip_the_file_s_own(backend, tmp_path):
+    path = write_jsonl(tmp_path / 'firs.jsonl', [make_row(2), make_row(0), make_row(0), make_row(0, fir_date="2024-06-01")])
+    assert import_firs(backend, path, district_code="LHR") == (4, 0)
+    assert sorted(fir["fir_number"] for fir in backend.iter_firs()) == [
+        "2024/LHR/0001", "2025/LHR/0001", "2025/LHR/0002", "2025/LHR/0003"]
+
+def test_csv_import(backend, tmp_path):
+    path = tmp_path / 'firs.csv'
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["cnic", "complainant_name", "accused_name", "reason", "fir_date", "sections"])
+        writer.writerow([CNIC, "Ali", "Bilal", "Theft", "2025-03-01", "302; 6ATA,"])
+    assert import_firs(backend, str(path)) == (1, 0)
+    fir = next(backend.iter_firs())
+    assert fir["sections"] == ["302", "6ATA"]
+    assert fir["bail_status"] == "N/A"
+
+def test_unknown_csv_header_is_reported_before_anything_is_stored(backend, tmp_path):
+    path = tmp_path / 'firs.csv'
+    path.write_text("cnic,fir_numbr\n1,2\n", encoding='utf-8')
+    with pytest.raises(ValueError, match="fir_numbr"):
+        import_firs(backend, str(path))
+    assert backend.count() == 0
+
+def test_cli_reports_an_unknown_csv_header(tmp_path, capsys):
+    path = tmp_path / 'firs.csv'
+    path.write_text("cnic,fir_numbr\n1,2\n", encoding='utf-8')
+    data = ['--data', str(tmp_path / 'fir_data.json'), '--journal', str(tmp_path / 'fir_data.journal'),
+            '--sequence', str(tmp_path / 'fir_sequence.json'), '--log-level', 'ERROR']
+    assert fir_cli.main(data + ['import', str(path)]) == 2
+    assert "fir_numbr" in json.loads(capsys.readouterr().out)["errors"]["file"]
+    assert fir_cli.main(data + ['import', str(tmp_path / 'missing.jsonl')]) == 2
+
+@pytest.mark.parametrize('fmt', ['csv', 'jsonl'])
+def test_export_then_import_round_trip(backend, open_backend, tmp_path, fmt):
+    rows = [make_row(1, sections=["302", "6ATA"]), make_row(2, cnic=OTHER_CNIC, accused_name="Kashif")]
+    backend.put_many([(row["cnic"], row) for row in rows])
+    path = str(tmp_path / f'firs.{fmt}')
+    assert export_firs(backend, path) == 2
+    (tmp_path / 'copy').mkdir()
+    copy = open_backend('json', tmp_path / 'copy')
+    copy.load()
+    assert import_firs(copy, path) == (2, 0)
+    assert sorted(map(dict, copy.iter_firs()), key=lambda fir: fir["fir_number"]) == rows
+    copy.close()
+
+def test_check_reports_invalid_stored_firs(backend, tmp_path):
+    backend.put_many([(CNIC, make_row(1)), (CNIC, make_row(2, fir_date="yesterday")),
+                      (OTHER_CNIC, make_row(3, cnic=OTHER_CNIC, sections=["999Z"]))])
+    report = str(tmp_path / 'report.jsonl')
+    assert check_firs(backend, report, batch_size=2) == (3, 2)
+    with open(report, encoding='utf-8') as f:
+        problems = {entry["fir_number"]: set(entry["errors"]) for entry in map(json.loads, f)}
+    assert problems == {"2025/LHR/0002": {"fir_date"}, "2025/LHR/0003": {"sections"}}
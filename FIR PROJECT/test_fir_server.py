@@ -0,0 +1,133 @@
+import threading
+
+import pytest
+
+from fir_backends import JsonFileBackend
+from fir_server import FIRClient, FIRServer
+from fir_service import FIRService
+from fir_store import FIRStore
+
+# --- HTTP Server Tests ---
+# Each test runs a FIRServer on a free local port, over a JSON store in its own temporary directory.
+
+CNIC = "35202-1234567-1"
+
+def fir_body(**fields):
+    """A registration form body, as POST /firs expects it."""
+    body = {"cnic": CNIC, "complainant_name": "Ali", "complainant_father_name": "Raza", "accused_name": "Bilal",
+            "accused_father_name": "Khan", "reason": "Theft", "fir_date": "2025-03-01", "sections": ["302"]}
+    body.update(fields)
+    return body
+
+@pytest.fixture
+def client(tmp_path):
+    store = FIRStore(lambda: JsonFileBackend(str(tmp_path / 'fir_data.json'), str(tmp_path / 'fir_data.journal'),
+                                             str(tmp_path / 'fir_sequence.json')))
+    store.load()
+    server = FIRServer(("127.0.0.1", 0), FIRService(store))
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    client = FIRClient(server.url)
+    yield client
+    client.close()
+    server.shutdown()
+    server.server_close()
+    store.close()
+
+def test_date_counts(client):
+    register(client)
+    register(client, fir_date="2025-04-02")
+    assert client.request("GET", "/date-counts", {"period": "month"}) == (200, {"2025-03": 1, "2025-04": 1})
+    assert client.request("GET", "/date-counts", {"date_from": "2025-04-01"}) == (200, {"2025-04-02": 1})
+
+def test_date_counts_rejects_invalid_dates(client):
+    status, result = client.request("GET", "/date-counts", {"date_from": "2024-13-45", "date_to": "2025-02-30"})
+    assert status == 400
+    assert set(result["errors"]) == {"date_from", "date_to"}
+    assert client.request("GET", "/date-counts", {"period": "week"})[0] == 400
+
+@pytest.mark.parametrize('fields', [{"reason": 5}, {"accused_name": ["x"]}, {"fir_date": None}, {"sections": "302"}])
+def test_register_rejects_fields_of_the_wrong_type(client, fields):
+    assert client.request("POST", "/firs", body=fir_body(**fields))[0] == 400
+    assert client.request("GET", "/health")[1]["firs"] == 0
+
+def register(client, **fields):
+    status, result = client.request("POST", "/firs", body=fir_body(**fields))
+    assert status == 201
+    return result["fir_number"]
+
+def test_register_get_update_delete(client):
+    fir_number = register(client, fir_number="2020/LHR/0001")  # Ignored: POST always registers
+    assert fir_number.endswith("/LHR/0001") and not fir_number.startswith("2020")
+    status, fir = client.request("GET", "/fir", {"cnic": CNIC, "fir_number": fir_number})
+    assert status == 200 and fir["accused_name"] == "Bilal"
+    status, result = client.request("PUT", "/fir", body=fir_body(fir_number=fir_number, reason="Robbery"))
+    assert (status, result["operation"]) == (200, "updated")
+    assert client.request("GET", "/fir", {"cnic": CNIC, "fir_number": fir_number})[1]["reason"] == "Robbery"
+    assert client.request("DELETE", "/fir", {"cnic": CNIC, "fir_number": fir_number}) == (
+        200, {"status": "deleted", "cnic": CNIC, "fir_number": fir_number})
+    assert client.request("GET", "/fir", {"cnic": CNIC, "fir_number": fir_number})[0] == 404
+    assert client.request("DELETE", "/fir", {"cnic": CNIC, "fir_number": fir_number})[0] == 404
+
+def test_update_of_a_missing_fir_is_404(client):
+    assert client.request("PUT", "/fir", body=fir_body(fir_number="2025/LHR/0009"))[0] == 404
+    assert client.request("PUT", "/fir", body=fir_body())[0] == 404
+
+def test_invalid_fir_is_422_with_field_errors(client):
+    status, result = client.request("POST", "/firs", body=fir_body(cnic="123", sections=["999Z"]))
+    assert status == 422
+    assert set(result["errors"]) == {"cnic", "sections"}
+
+@pytest.mark.parametrize('body', [[1, 2], {"station": "Model Town"}])
+def test_malformed_bodies_are_400(client, body):
+    assert client.request("POST", "/firs", body=body)[0] == 400
+
+def test_body_that_is_not_json_is_400(client):
+    client.conn.request("POST", "/firs", b"{not json", {"Content-Type": "application/json"})
+    response = client.conn.getresponse()
+    response.read()
+    assert response.status == 400
+
+def test_search(client):
+    register(client)
+    register(client, accused_name="Kashif", sections=["6ATA"])
+    status, result = client.request("GET", "/firs", {"accused_name": "kash"})
+    assert (status, result["total"]) == (200, 1)
+    assert client.request("GET", "/firs", {"section": "6ata"})[1]["total"] == 1
+    assert client.request("GET", "/firs", {"accused_name": "Kashf", "fuzzy": "1"})[1]["total"] == 1
+    status, result = client.request("GET", "/firs", {"section": "302", "limit": 0})
+    assert (result["total"], len(result["firs"])) == (1, 1)
+    assert client.request("GET", "/firs", {"cnic": CNIC, "limit": 1})[1] == {"total": 2, "firs": result["firs"]}
+
+@pytest.mark.parametrize('params', [{"date_from": "2025-13-01"}, {"section": "999Z"}, {"cnic": CNIC, "limit": "ten"}])
+def test_invalid_search_is_400(client, params):
+    status, result = client.request("GET", "/firs", params)
+    assert status == 400
+    assert result["error"]
+
+def test_paging(client):
+    registered = [register(client) for _ in range(5)]
+    listed, cursor = [], None
+    while True:
+        status, page = client.request("GET", "/firs/page", {"limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert status == 200
+        listed += [fir["fir_number"] for fir in page["firs"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert listed == registered
+    assert client.request("GET", "/firs/page", {"cursor": "x"})[0] == 400
+
+def test_health_stats_sections_and_metrics(client):
+    register(client)
+    assert client.request("GET", "/health") == (200, {"status": "ok", "firs": 1})
+    status, stats = client.request("GET", "/stats", {"top": 1})
+    assert (status, stats["total_firs"]) == (200, 1)
+    status, sections = client.request("GET", "/sections", {"q": "295c"})
+    assert (status, [section["section"] for section in sections]) == (200, ["295C"])
+    status, metrics = client.request("GET", "/metrics")
+    assert status == 200 and isinstance(metrics, dict)
+
+def test_unknown_route_is_404(client):
+    assert client.request("GET", "/nothing")[0] == 404
+    assert client.request("DELETE", "/firs")[0] == 404
@@ -0,0 +1,112 @@
+import dataclasses
+import datetime
+import json
+
+import pytest
+
+from fir_service import FIRInput, FIRService, SearchQuery, ValidationError
+
+# --- FIR Service Tests ---
+# The outcomes the GUI, the command line and the server report to their users.
+
+CNIC = "35202-1234567-1"
+THIS_YEAR = datetime.date.today().year
+
+def make_input(**fields):
+    values = dict(cnic=CNIC, complainant_name="Ali", accused_name="Bilal", reason="Theft",
+                  fir_date="2025-03-01", sections=("302",))
+    values.update(fields)
+    return FIRInput(**values)
+
+@pytest.fixture
+def service(backend):
+    return FIRService(backend, district_code="ISB")
+
+def test_register_assigns_a_number_and_today_s_date(service):
+    result = service.save_fir(make_input(fir_date=""))
+    assert (result.operation, result.fir_number, result.notice) == ("registered", f"{THIS_YEAR}/ISB/0001", None)
+    fir = service.get_fir(CNIC, result.fir_number)
+    assert fir["fir_date"] == datetime.date.today().isoformat()
+    assert fir["sections"] == ["302"]
+    assert service.save_fir(make_input()).fir_number == f"{THIS_YEAR}/ISB/0002"
+
+def test_update_keeps_the_number(service):
+    fir_number = service.save_fir(make_input()).fir_number
+    result = service.save_fir(make_input(fir_number=fir_number, reason="Robbery"))
+    assert (result.operation, result.fir_number) == ("updated", fir_number)
+    assert service.get_fir(CNIC, fir_number)["reason"] == "Robbery"
+    assert service.count() == 1
+
+def test_unknown_or_invalid_numbers_register_a_new_fir(service):
+    result = service.save_fir(make_input(fir_number="2020/LHR/0042"))
+    assert result.operation == "registered"
+    assert result.fir_number == f"{THIS_YEAR}/ISB/0001"
+    assert "2020/LHR/0042" in result.notice
+    result = service.save_fir(make_input(fir_number="not a number"))
+    assert (result.fir_number, result.notice) == (f"{THIS_YEAR}/ISB/0002", None)
+
+def test_invalid_input_is_reported_in_form_order(service):
+    fir_input = make_input(cnic="123", accused_name="", fir_date="2025-02-30", sections=("302", "999Z"))
+    assert list(service.validate(fir_input)) == ["cnic", "accused_name", "fir_date", "sections"]
+    with pytest.raises(ValidationError) as raised:
+        service.save_fir(fir_input)
+    assert list(raised.value.errors) == ["cnic", "accused_name", "fir_date", "sections"]
+    assert service.count() == 0
+
+def test_delete_outcomes(service):
+    fir_number = service.save_fir(make_input()).fir_number
+    assert service.delete_fir("35202-0000000-1", fir_number).status == "no_cnic"
+    assert service.delete_fir(CNIC, "2025/ISB/9999").status == "not_found"
+    assert service.delete_fir(CNIC, fir_number).status == "deleted"
+    assert service.get_fir(CNIC, fir_number) is None
+
+def test_search(service):
+    service.save_fir(make_input(sections=("6ATA",)))
+    service.save_fir(make_input(accused_name="Kashif"))
+    assert service.search(SearchQuery()) == []
+    assert [fir["accused_name"] for fir in service.search(SearchQuery(section="6ata"))] == ["Bilal"]
+    assert [fir["accused_name"] for fir in service.search(SearchQuery(accused_name="kash"))] == ["Kashif"]
+    with pytest.raises(ValidationError) as raised:
+        service.search(SearchQuery(section="999Z", date_to="2025-1-1"))
+    assert set(raised.value.errors) == {"section", "date_to"}
+
+def test_date_counts(service):
+    service.save_fir(make_input())
+    service.save_fir(make_input(fir_date="2025-04-02"))
+    assert service.date_counts("month") == {"2025-03": 1, "2025-04": 1}
+    assert service.date_counts("day", date_to="2025-03-31") == {"2025-03-01": 1}
+    with pytest.raises(ValidationError) as raised:
+        service.date_counts("day", "2024-13-45")
+    assert set(raised.value.errors) == {"date_from"}
+
+def test_list_firs_pages_through_everything(service):
+    registered = [service.save_fir(make_input()).fir_number for _ in range(5)]
+    page = service.list_firs(limit=2)
+    listed = [fir["fir_number"] for fir in page.firs]
+    while page.next_cursor is not None:
+        page = service.list_firs(page.next_cursor, 2)
+        listed += [fir["fir_number"] for fir in page.firs]
+    assert listed == registered
+
+def test_stats(service):
+    service.save_fir(make_input())
+    service.save_fir(make_input(sections=("302", "6ATA")))
+    stats = service.stats()
+    assert stats["total_firs"] == 2
+    assert stats["by_section"] == {"302": 2, "6ATA": 1}
+    assert stats["top_repeat_offenders"] == {CNIC: 2}
+
+def test_sections_lookup(service):
+    assert {section["section"] for section in service.sections(act="ata")} >= {"6ATA", "7ATA"}
+    assert all(section["act"] == "ATA" for section in service.sections(act="ATA"))
+    assert "302" in [section["section"] for section in service.sections(text="MURDER")]
+    assert [section["section"] for section in service.sections(text="295c")] == ["295C"]
+
+def test_import_and_export_results(service, tmp_path):
+    rows = [make_input(), make_input(cnic="bad")]
+    path = tmp_path / 'firs.jsonl'
+    path.write_text("".join(json.dumps(dataclasses.asdict(row)) + "\n" for row in rows), encoding='utf-8')
+    result = service.import_file(str(path))
+    assert (result.transferred, result.rejected, result.rejects_file) == (1, 1, str(path) + ".rejects.jsonl")
+    assert service.export_file(str(tmp_path / 'out.csv')).transferred == 1
+    assert service.import_file(str(tmp_path / 'out.csv'), replace=True).rejects_file is None
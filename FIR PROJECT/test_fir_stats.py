@@ -0,0 +1,77 @@
+import csv
+import json
+
+from fir_stats import UNKNOWN, FIRStats, export_stats
+
+# --- Statistics Tests ---
+
+CNIC = "35202-1234567-1"
+OTHER_CNIC = "35202-7654321-1"
+
+def make_fir(seq, **fields):
+    fir = {"fir_number": f"2025/LHR/{seq:04d}", "fir_date": "2025-03-01", "sections": ["302"],
+           "bail_status": "Granted", "punishment": ""}
+    fir.update(fields)
+    return fir
+
+def test_remove_of_uncounted_values_does_not_fail():
+    stats = FIRStats()
+    stats.add(CNIC, make_fir(1))
+    stats.remove(CNIC, make_fir(1, sections=["6ATA"], bail_status="Refused", fir_date="2024-01-01"))
+    summary = stats.summary()
+    assert summary["total_firs"] == 0
+    assert summary["by_section"] == {"302": 1}
+    assert "Refused" not in summary["by_bail_status"]
+
+def test_counts_follow_adds_and_removes():
+    stats = FIRStats()
+    stats.add(CNIC, make_fir(1, sections=["302", "6ATA"]))
+    stats.add(CNIC, make_fir(2, fir_date="2025-04-10", bail_status="", punishment="Death"))
+    stats.add(OTHER_CNIC, make_fir(3, sections=[]))
+    summary = stats.summary()
+    assert summary["total_firs"] == 3
+    assert summary["distinct_cnics"] == 2
+    assert summary["by_section"] == {"302": 2, "6ATA": 1}
+    assert summary["by_act"] == {"PPC": 2, "ATA": 1}
+    assert summary["by_bail_status"] == {"Granted": 2, UNKNOWN: 1}
+    assert summary["by_punishment"] == {UNKNOWN: 2, "Death": 1}
+    assert summary["by_month"] == {"2025-03": 2, "2025-04": 1}
+    assert summary["top_repeat_offenders"] == {CNIC: 2}
+
+    stats.remove(CNIC, make_fir(1, sections=["302", "6ATA"]))  # Back to one FIR: no longer a repeat offender
+    summary = stats.summary()
+    assert summary["total_firs"] == 2
+    assert summary["by_section"] == {"302": 1}
+    assert summary["by_act"] == {"PPC": 1}
+    assert summary["repeat_offender_cnics"] == 0
+    assert summary["top_repeat_offenders"] == {}
+
+def test_update_moves_the_counts(backend):
+    backend.put_fir(CNIC, make_fir(1))
+    backend.put_fir(CNIC, make_fir(1, bail_status="Refused", sections=["6ATA"]))
+    summary = backend.fir_stats()
+    assert summary["total_firs"] == 1
+    assert summary["by_bail_status"] == {"Refused": 1}
+    assert summary["by_section"] == {"6ATA": 1}
+    backend.delete_fir(CNIC, "2025/LHR/0001")
+    assert backend.fir_stats()["by_section"] == {}
+
+def test_top_repeat_offenders_are_the_largest():
+    stats = FIRStats()
+    for cnic, firs in (("1", 4), ("2", 2), ("3", 3), ("4", 1)):
+        for seq in range(firs):
+            stats.add(cnic, make_fir(seq))
+    assert stats.summary(top=2)["top_repeat_offenders"] == {"1": 4, "3": 3}
+    assert stats.summary()["repeat_offender_cnics"] == 3
+
+def test_export_stats(tmp_path):
+    stats = FIRStats()
+    stats.add(CNIC, make_fir(1))
+    export_stats(stats.summary(), str(tmp_path / 'stats.json'))
+    with open(tmp_path / 'stats.json', encoding='utf-8') as f:
+        assert json.load(f)["by_section"] == {"302": 1}
+    export_stats(stats.summary(), str(tmp_path / 'stats.csv'))
+    with open(tmp_path / 'stats.csv', encoding='utf-8', newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["group", "value", "count"]
+    assert ["total_firs", "", "1"] in rows and ["by_section", "302", "1"] in rows
@@ -0,0 +1,106 @@
+import pytest
+
+from fir_backends import JsonFileBackend
+from fir_index import FIRIndex
+from fir_service import FIRService, SearchQuery, ValidationError
+from fir_storage import SNAPSHOT_FORMATS, append_journal_records, iter_snapshot, journal_put_record, replay_journal, write_snapshot
+from fir_validation import validate_fir_entries
+
+# --- Storage, Index and Validation Tests ---
+# Run with `python -m pytest` from this folder. Every test works on files in its own
+# temporary directory; the backend fixture (conftest.py) runs a test once per backend.
+
+CNIC = "35202-1234567-1"
+OTHER_CNIC = "35202-7654321-1"
+
+def make_fir(seq, **fields):
+    fir = {"fir_number": f"2025/LHR/{seq:04d}", "complainant_name": "Ali", "complainant_father_name": "Raza",
+           "accused_name": "Bilal", "accused_father_name": "Khan", "reason": "Theft", "fir_date": "2025-03-01",
+           "sections": ["302"], "bail_status": "N/A", "punishment": ""}
+    fir.update(fields)
+    return fir
+
+def fir_numbers(firs):
+    return [fir['fir_number'] for fir in firs]
+
+# --- Storage ---
+
+def test_journal_replay_discards_torn_last_line(tmp_path):
+    journal = str(tmp_path / 'fir_data.journal')
+    append_journal_records(journal, [journal_put_record(CNIC, make_fir(1)), journal_put_record(CNIC, make_fir(2))])
+    with open(journal, 'a', encoding='utf-8') as f:
+        f.write('{"op": "put", "cnic": "35202-')  # A crash in the middle of an append
+    data = {}
+    assert replay_journal(journal, data) == 2
+    assert fir_numbers(data[CNIC]) == ["2025/LHR/0001", "2025/LHR/0002"]
+    # The torn line is truncated away, so the next append starts on a clean line
+    append_journal_records(journal, [journal_put_record(CNIC, make_fir(3))])
+    data = {}
+    assert replay_journal(journal, data) == 3
+
+@pytest.mark.parametrize('fmt', SNAPSHOT_FORMATS)
+def test_snapshot_round_trip(tmp_path, fmt):
+    data = {CNIC: [make_fir(1), make_fir(2, sections=["6ATA", "302"])], OTHER_CNIC: [make_fir(3, accused_name="")]}
+    snapshot = str(tmp_path / 'fir_data.json')
+    write_snapshot(snapshot, data, fmt=fmt)
+    assert {cnic: fir_list for cnic, fir_list, _ in iter_snapshot(snapshot)} == data
+
+def test_fallback_to_older_snapshot_keeps_journaled_changes(tmp_path):
+    files = [str(tmp_path / name) for name in ('fir_data.json', 'fir_data.journal', 'fir_sequence.json')]
+    store = JsonFileBackend(*files, generations=2)
+    store.load()
+    for seq in range(1, 4):
+        store.put_fir(CNIC, make_fir(seq))
+        store.save()
+    store.delete_fir(CNIC, "2025/LHR/0001")
+    with open(files[0], 'r+b') as f:  # Damage the newest snapshot
+        f.write(b'garbage')
+    reloaded = JsonFileBackend(*files, generations=2)
+    reloaded.load()
+    assert sorted(fir_numbers(reloaded.iter_firs())) == ["2025/LHR/0002", "2025/LHR/0003"]
+
+def test_paging_survives_a_delete(backend):
+    backend.put_many([(CNIC, make_fir(seq)) for seq in range(1, 8)])
+    firs, cursor = backend.fetch_page(limit=3)
+    assert fir_numbers(firs) == ["2025/LHR/0001", "2025/LHR/0002", "2025/LHR/0003"]
+    backend.delete_fir(CNIC, "2025/LHR/0002")
+    seen = fir_numbers(firs)
+    while cursor is not None:
+        firs, cursor = backend.fetch_page(cursor, limit=3)
+        seen += fir_numbers(firs)
+    assert seen == [f"2025/LHR/{seq:04d}" for seq in range(1, 8)]
+
+# --- Index ---
+
+def test_index_search():
+    index = FIRIndex()
+    index.add(CNIC, make_fir(1, accused_name="Bilal Ahmed", sections=["302"], fir_date="2025-01-10"))
+    index.add(CNIC, make_fir(2, accused_name="Kashif", sections=["6ATA"], fir_date="2025-02-10"))
+    index.add(OTHER_CNIC, make_fir(3, accused_name="Ahmed Ali", sections=["302", "6ATA"], fir_date="2025-03-10"))
+    assert fir_numbers(index.search(cnic=CNIC)) == ["2025/LHR/0001", "2025/LHR/0002"]
+    assert fir_numbers(index.search(fir_number="2025/lhr/0003")) == ["2025/LHR/0003"]
+    assert fir_numbers(index.search(accused_name="ahmed")) == ["2025/LHR/0001", "2025/LHR/0003"]
+    assert fir_numbers(index.search(section="6ATA", date_from="2025-03-01")) == ["2025/LHR/0003"]
+    assert fir_numbers(index.search(accused_name="Kashf", fuzzy=True)) == ["2025/LHR/0002"]
+    index.remove(OTHER_CNIC, "2025/LHR/0003")
+    assert index.search(section="302", accused_name="ahmed") == [index.records[(CNIC, "2025/LHR/0001")]]
+
+# --- Validation ---
+
+def test_batch_validation():
+    entries = [dict(make_fir(1), cnic=CNIC),
+               dict(make_fir(2), cnic="12345"),
+               dict(make_fir(3, fir_date="2025-02-30", sections=["302", "999Z"]), cnic=CNIC),
+               dict(make_fir(4, complainant_name=""), cnic=CNIC)]
+    errors = validate_fir_entries(entries)
+    assert sorted(errors) == [1, 2, 3]
+    assert set(errors[1]) == {"cnic"}
+    assert set(errors[2]) == {"fir_date", "sections"}
+    assert "999Z" in errors[2]["sections"]
+    assert set(errors[3]) == {"complainant_name"}
+
+def test_search_rejects_invalid_dates(backend):
+    service = FIRService(backend)
+    with pytest.raises(ValidationError) as raised:
+        service.search(SearchQuery(accused_name="Bilal", date_from="2025-13-01", date_to="2025-02-30"))
+    assert set(raised.value.errors) == {"date_from", "date_to"}
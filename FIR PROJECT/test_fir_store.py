@@ -0,0 +1,88 @@
+from fir_backends import JsonFileBackend
+from fir_store import FIRStore
+
+# --- Application Store Tests ---
+# The backend counts the searches that reach it, to tell cache hits and narrowed searches
+# from real ones.
+
+CNIC = "35202-1234567-1"
+
+class CountingBackend(JsonFileBackend):
+    searches = 0
+
+    def search(self, *args, **criteria):
+        self.searches += 1
+        return super().search(*args, **criteria)
+
+def make_fir(seq, accused_name, **fields):
+    fir = {"fir_number": f"2025/LHR/{seq:04d}", "accused_name": accused_name, "accused_father_name": "Khan",
+           "complainant_name": "Ali", "fir_date": "2025-03-01", "sections": ["302"], "bail_status": "N/A"}
+    fir.update(fields)
+    return fir
+
+def open_store(tmp_path, seed=None):
+    """A store over files in tmp_path; not loaded yet, so nothing is read until first use."""
+    return FIRStore(lambda: CountingBackend(str(tmp_path / 'fir_data.json'), str(tmp_path / 'fir_data.journal'),
+                                            str(tmp_path / 'fir_sequence.json')), seed=seed)
+
+def loaded_store(tmp_path):
+    """A seeded, loaded store (searches racing the first load aren't cached)."""
+    store = open_store(tmp_path, seed)
+    store.load()
+    return store
+
+def seed(backend):
+    backend.put_many([(CNIC, make_fir(1, "Bilal Ahmed")), (CNIC, make_fir(2, "Bilal Akram")),
+                      (CNIC, make_fir(3, "Kashif Ahmed", sections=["6ATA"]))])
+
+def numbers(firs):
+    return [fir['fir_number'] for fir in firs]
+
+def test_loads_and_seeds_on_first_use(tmp_path):
+    store = open_store(tmp_path, seed)
+    assert not store.loaded
+    assert store.count() == 3
+    assert store.loaded
+    store.close()
+    reopened = open_store(tmp_path, lambda backend: backend.put_fir(CNIC, make_fir(9, "Seeded again")))
+    assert reopened.count() == 3  # Not empty, so not seeded
+    reopened.close()
+
+def test_repeated_search_is_cached(tmp_path):
+    store = loaded_store(tmp_path)
+    assert numbers(store.search(accused_name="bil")) == ["2025/LHR/0001", "2025/LHR/0002"]
+    found = store.search(accused_name="bil")
+    found.clear()  # Callers get their own list
+    assert numbers(store.search(accused_name="bil")) == ["2025/LHR/0001", "2025/LHR/0002"]
+    assert store.backend.searches == 1
+
+def test_refined_search_narrows_the_cached_results(tmp_path):
+    store = loaded_store(tmp_path)
+    store.search(accused_name="ahm")
+    assert numbers(store.search(accused_name="AHMED")) == ["2025/LHR/0001", "2025/LHR/0003"]
+    assert numbers(store.search(accused_name="ahmed", accused_father_name="kh")) == ["2025/LHR/0001", "2025/LHR/0003"]
+    assert store.backend.searches == 1
+    # Other criteria, or fuzzy matching, can't be answered from the cached results
+    store.search(accused_name="ahmed", cnic=CNIC)
+    store.search(accused_name="ahmed", fuzzy=True)
+    store.search(accused_name="hm")  # Wider, not narrower
+    assert store.backend.searches == 4
+
+def test_changes_invalidate_cached_searches(tmp_path):
+    store = loaded_store(tmp_path)
+    assert numbers(store.search(accused_name="bilal")) == ["2025/LHR/0001", "2025/LHR/0002"]
+    store.put_fir(CNIC, make_fir(4, "Bilal Hussain"))
+    assert numbers(store.search(accused_name="bilal")) == ["2025/LHR/0001", "2025/LHR/0002", "2025/LHR/0004"]
+    store.delete_fir(CNIC, "2025/LHR/0001")
+    assert numbers(store.search(accused_name="bilal hu")) == ["2025/LHR/0004"]
+    store.put_many([(CNIC, make_fir(2, "Zubair"))])
+    assert numbers(store.search(accused_name="bilal")) == ["2025/LHR/0004"]
+    assert store.backend.searches == 4
+
+def test_refresh_picks_up_other_processes_changes(tmp_path):
+    store, other = loaded_store(tmp_path), open_store(tmp_path)
+    assert numbers(store.search(accused_name="kashif")) == ["2025/LHR/0003"]
+    other.put_fir(CNIC, make_fir(5, "Kashif Ali"))
+    assert store.refresh()
+    assert numbers(store.search(accused_name="kashif")) == ["2025/LHR/0003", "2025/LHR/0005"]
+    assert not store.refresh()